@@ -0,0 +1,227 @@
+# audit_log.py
+
+"""
+Audit Log
+---------
+Structured record of every mutation (catalog edits, stock changes, orders,
+status changes, logins) that never puts file I/O on the caller's path.
+
+- The log subscribes to the EventBus. Delivering an event only appends it
+  (with the current actor) to an in-memory deque, which is thread-safe
+  without taking a lock; when the queue bound is reached new records are
+  dropped and counted rather than blocking checkout.
+- A background writer thread wakes when a batch is ready or once per flush
+  interval, formats the records as JSON lines and appends them to the
+  current file as one gzip member per batch, so everything up to the last
+  written batch survives a crash.
+- Files are named audit-<first record time in ms>.jsonl.gz and rotate at a
+  size limit, optionally keeping only the newest max_files. Queries skip
+  files that end before the requested time range.
+
+    python cli.py audit LOG_DIR [--since 2025-01-01] [--until ...] [--user alice] [--entity P001] [--type order.placed]
+"""
+
+import os
+import gzip
+import json
+import time
+import datetime
+import threading
+from collections import deque
+
+from exceptions import InvalidInputError
+
+AUDIT_DIR_ENV_VAR = "ECOMMERCE_AUDIT_DIR"  # Where the application writes its audit log, if set
+
+# Records formatted between GIL hand-offs on the writer thread
+_YIELD_EVERY = 16
+
+_PREFIX = "audit-"
+_SUFFIX = ".jsonl.gz"
+
+# Data keys that identify the entity an event is about, in priority order
+ENTITY_KEYS = ("order_id", "product_id", "username")
+
+
+def _entity(data):
+    for key in ENTITY_KEYS:
+        if key in data:
+            return data[key]
+    return None
+
+
+class AuditStats:
+    """Counters for the audit queue and writer."""
+    def __init__(self):
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.files = 0
+        self.last_error = None
+
+    def __repr__(self):
+        return (f"AuditStats(dropped={self.dropped}, written={self.written}, "
+                f"batches={self.batches}, files={self.files})")
+
+
+class AuditLog:
+    """Non-blocking, batched, compressed and rotating audit trail of published events."""
+    def __init__(self, directory, max_queue=100000, batch_size=500, flush_interval=1.0,
+                 max_file_bytes=16 * 1024 * 1024, max_files=None):
+        if max_queue <= 0 or batch_size <= 0 or flush_interval <= 0 or max_file_bytes <= 0:
+            raise InvalidInputError("Audit queue, batch, interval and file sizes must be positive.")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.actor = None  # User the next records are attributed to (e.g. the logged-in admin)
+        self.stats = AuditStats()
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._busy = False
+        self._path = None
+        self._subscription = None
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    # --- Producer Side (runs on the publisher's thread) ---
+    def attach(self, event_bus):
+        """Records every event published on an EventBus."""
+        self._subscription = event_bus.subscribe(self.handle_events, None, batch_size=1)
+        return self._subscription
+
+    def handle_events(self, events):
+        actor = self.actor
+        for event in events:
+            self.enqueue(event.type, event.timestamp, event.data, actor)
+
+    def enqueue(self, event_type, timestamp, data, actor=None):
+        if len(self._queue) >= self.max_queue:
+            self.stats.dropped += 1
+            return
+        self._queue.append((event_type, timestamp, data, actor))
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    # --- Writer Side ---
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            self._busy = True
+            try:
+                while self._queue:
+                    self._write_batch()
+            except Exception as e:
+                # Keep the writer alive; a failing disk must not stop later batches
+                self.stats.last_error = e
+            finally:
+                self._busy = False
+            if stopping:
+                return
+
+    def _write_batch(self):
+        lines = []
+        first_timestamp = self._queue[0][1]
+        while self._queue and len(lines) < self.batch_size:
+            event_type, timestamp, data, actor = self._queue.popleft()
+            actor = actor or data.get("customer_id") or data.get("user_id") or data.get("username")
+            lines.append(json.dumps({"ts": timestamp, "type": event_type, "actor": actor,
+                                     "entity": _entity(data), "data": data},
+                                    separators=(",", ":"), default=str))
+            if len(lines) % _YIELD_EVERY == 0:
+                time.sleep(0)  # Hand the GIL back so a checkout never waits out a whole batch
+        if self._path is None or os.path.getsize(self._path) >= self.max_file_bytes:
+            self._rotate(first_timestamp)
+        with gzip.open(self._path, "ab") as f:
+            f.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self.stats.written += len(lines)
+        self.stats.batches += 1
+
+    def _rotate(self, first_timestamp):
+        millis = int(first_timestamp * 1000)
+        # Never reuse an older file name, even if the clock went backwards
+        existing = list_audit_files(self.directory)
+        if existing:
+            millis = max(millis, existing[-1][0] + 1)
+        self._path = os.path.join(self.directory, f"{_PREFIX}{millis:013d}{_SUFFIX}")
+        self.stats.files += 1
+        if self.max_files is not None:
+            for _, path in existing[:max(len(existing) + 1 - self.max_files, 0)]:
+                os.remove(path)
+
+    def flush(self, timeout=5.0):
+        """Waits until everything enqueued so far is written (for tests and shutdown)."""
+        deadline = time.monotonic() + timeout
+        while (self._queue or self._busy) and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.005)
+
+    def close(self, event_bus=None):
+        if event_bus is not None and self._subscription is not None:
+            event_bus.unsubscribe(self._subscription)
+        self._stopping = True
+        self._wake.set()
+        self._writer.join()
+
+
+def list_audit_files(directory):
+    """[(first record time in ms, path)] for a log directory, oldest first."""
+    files = []
+    for name in os.listdir(directory):
+        if name.startswith(_PREFIX) and name.endswith(_SUFFIX):
+            try:
+                files.append((int(name[len(_PREFIX):-len(_SUFFIX)]), os.path.join(directory, name)))
+            except ValueError:
+                continue
+    return sorted(files)
+
+
+def _epoch(moment):
+    if moment is None or isinstance(moment, (int, float)):
+        return moment
+    if isinstance(moment, str):
+        moment = datetime.datetime.fromisoformat(moment)
+    return moment.timestamp()
+
+
+def query_audit_log(directory, since=None, until=None, actor=None, entity=None, event_type=None):
+    """
+    Yields audit records, oldest file first, matching every given filter.
+
+    Args:
+        since, until: datetime, ISO string or epoch seconds (since inclusive, until exclusive)
+        actor (str): User who made the change
+        entity (str): Order, product or user ID the change was about
+        event_type (str): e.g. "order.placed"
+    """
+    since, until = _epoch(since), _epoch(until)
+    files = list_audit_files(directory)
+    for i, (first_ms, path) in enumerate(files):
+        next_ms = files[i + 1][0] if i + 1 < len(files) else None
+        if since is not None and next_ms is not None and next_ms / 1000 <= since:
+            continue  # The whole file is older than the range
+        if until is not None and first_ms / 1000 >= until:
+            break
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if since is not None and record["ts"] < since:
+                        continue
+                    if until is not None and record["ts"] >= until:
+                        continue
+                    if actor is not None and record["actor"] != actor:
+                        continue
+                    if entity is not None and record["entity"] != entity:
+                        continue
+                    if event_type is not None and record["type"] != event_type:
+                        continue
+                    yield record
+        except EOFError:
+            continue  # File still being written (or cut short by a crash): keep what was readable
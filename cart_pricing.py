@@ -0,0 +1,144 @@
+# cart_pricing.py
+
+"""
+Cart Pricing
+------------
+Keeps the totals of a ShoppingCart (subtotal, promotions, tax, total) up to
+date as the cart changes, independently of any GUI.
+
+The cart maintains its own running subtotal; CartPricing moves its lines to
+the products' current prices before pricing it, listens to cart changes, re-evaluates promotions (memoized per cart version by the
+promotion engine), caches tax rates per state and notifies its own
+listeners with exactly what changed:
+
+    listener("row", product_id)      - a cart line was added or changed
+    listener("row_removed", product_id)
+    listener("cleared", None)
+    listener("totals", CartTotals)   - totals changed
+
+The same object drives the GUI cart tab and headless checkout.
+"""
+
+from exceptions import InvalidInputError
+from state_tax_rates import get_tax_rate, is_valid_state
+
+
+class CartTotals:
+    """Priced snapshot of a cart."""
+    def __init__(self, subtotal, discount, applied, state_code, tax_rate, tax):
+        self.subtotal = subtotal
+        self.discount = discount
+        self.applied = applied  # [(promo_id, name, amount)]
+        self.discounted_subtotal = subtotal - discount
+        self.state_code = state_code
+        self.tax_rate = tax_rate
+        self.tax = tax
+        self.total = self.discounted_subtotal + tax
+
+
+class CartPricing:
+    """Incremental pricing engine bound to one cart."""
+    def __init__(self, cart, order_manager):
+        self.cart = cart
+        self.order_manager = order_manager
+        self.state_code = None
+        self.codes = set()
+        self._tax_rates = {}
+        self._totals = None
+        self._totals_key = None
+        self._listeners = []
+        cart.subscribe(self._on_cart_event)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _notify(self, event, payload=None):
+        for listener in list(self._listeners):
+            listener(event, payload)
+
+    def _on_cart_event(self, event, product_id):
+        if event == "item_changed":
+            self._notify("row", product_id)
+        elif event == "item_removed":
+            self._notify("row_removed", product_id)
+        else:
+            self._notify("cleared")
+        self._notify("totals", self.totals())
+
+    def tax_rate(self, state_code):
+        """Tax rate for a state, cached after the first lookup."""
+        if not state_code:
+            return 0.0
+        rate = self._tax_rates.get(state_code)
+        if rate is None:
+            if not is_valid_state(state_code):
+                raise InvalidInputError(f"Invalid state code: '{state_code}'")
+            rate = self._tax_rates[state_code] = get_tax_rate(state_code)
+        return rate
+
+    def set_state(self, state_code):
+        state_code = state_code.strip().upper() if state_code else None
+        self.tax_rate(state_code)  # Validate before changing anything
+        if state_code != self.state_code:
+            self.state_code = state_code
+            self._notify("totals", self.totals())
+
+    def apply_code(self, code):
+        """
+        Adds a discount code to the cart.
+
+        Returns:
+            Promotion: The promotion behind the code
+
+        Raises:
+            InvalidInputError: If the code is unknown, inactive or already applied
+        """
+        code = (code or "").strip().upper()
+        promotion = self.order_manager.promotion_engine.get_code_promotion(code)
+        if promotion is None:
+            raise InvalidInputError("Invalid discount code.")
+        if code in self.codes:
+            raise InvalidInputError("Discount already applied.")
+        self.codes.add(code)
+        self._notify("totals", self.totals())
+        return promotion
+
+    def totals(self):
+        """Current CartTotals; recomputed only when the cart, prices, state, codes or rules changed."""
+        # Lines, promotions and the placed order must all use the same prices
+        self.cart.reprice(self.order_manager.product_manager.products)
+        key = (self.cart.version, self.state_code, frozenset(self.codes),
+               self.order_manager.promotion_engine.version)
+        if key != self._totals_key:
+            promotions = self.order_manager.evaluate_promotions(self.cart, self.state_code, self.codes)
+            rate = self.tax_rate(self.state_code)
+            discounted = self.cart.subtotal - promotions.discount
+            self._totals = CartTotals(self.cart.subtotal, promotions.discount, promotions.applied,
+                                      self.state_code, rate, discounted * rate)
+            self._totals_key = key
+        return self._totals
+
+    def checkout(self, address):
+        """
+        Places the order for the cart at its current totals, then empties the cart.
+
+        Returns:
+            Order: The placed order
+        """
+        if not self.state_code:
+            raise InvalidInputError("State must be selected.")
+        totals = self.totals()
+        order = self.order_manager.place_order(self.cart, totals.discounted_subtotal, totals.tax,
+                                               totals.total, address, self.state_code)
+        self.reset()
+        return order
+
+    def reset(self):
+        """Empties the cart and forgets the state and discount codes."""
+        self.state_code = None
+        self.codes.clear()
+        self.cart.clear()
+
+    def close(self):
+        self.cart.unsubscribe(self._on_cart_event)
+        self._listeners = []
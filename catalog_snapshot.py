@@ -0,0 +1,272 @@
+# catalog_snapshot.py
+
+"""
+Shared-Memory Catalog Snapshots
+-------------------------------
+Publishes an immutable, versioned copy of the product catalog into a
+multiprocessing.shared_memory segment so that read-only worker processes can
+serve browse, search and sort without copying or unpickling the catalog.
+
+Segment layout (all integers little-endian):
+
+    header   : magic, format version, snapshot version, record count,
+               offsets/sizes of the string table and the search blob
+    records  : one fixed-width record per product (string offsets and
+               lengths, price, qty)
+    by_price : u32 record indexes in ascending price order
+    starts   : u32 offset of each record's name in the search blob
+    strings  : UTF-8 ids, names and categories
+    search   : lower-cased names separated by newlines, in record order
+
+Search hits are mapped to records through the stored start offsets rather
+than by counting separators, so names may themselves contain newlines.
+
+Every publish writes a brand new data segment ("<name>_v<version>") and then
+flips the version number in a small control segment ("<name>") using a
+sequence counter, so readers never observe a half-written catalog.
+"""
+
+import re
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+from multiprocessing import shared_memory, resource_tracker
+
+from exceptions import InvalidInputError
+
+MAGIC = b"CATS"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<4sHHQIIIIII")  # magic, fmt, pad, version, count, by_price, starts, strings, search, search_len
+_RECORD = struct.Struct("<IIIIIIdq")     # id off/len, name off/len, category off/len, price, quantity
+_CONTROL = struct.Struct("<QQ")          # sequence, current version
+_INDEX = struct.Struct("<I")
+
+ProductView = namedtuple("ProductView", ["product_id", "name", "category", "price", "quantity"])
+
+# Segments created by publishers in this process (already tracked for cleanup)
+_OWNED_SEGMENTS = set()
+
+
+def _attach(name):
+    """Attach to an existing segment without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers attached segments with the tracker
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _OWNED_SEGMENTS:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def encode_catalog(products, version):
+    """
+    Serialize products into the snapshot binary layout.
+
+    Args:
+        products (iterable): Product objects
+        version (int): Snapshot version stamped into the header
+
+    Returns:
+        bytes: The complete segment payload
+    """
+    products = list(products)
+    strings = bytearray()
+    records = bytearray()
+    search_parts = []
+    search_starts = bytearray()
+    search_len = 0
+
+    def put(text):
+        data = (text or "").encode("utf-8")
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    for p in products:
+        id_off, id_len = put(p.product_id)
+        name_off, name_len = put(p.name)
+        cat_off, cat_len = put(p.category)
+        records += _RECORD.pack(id_off, id_len, name_off, name_len, cat_off, cat_len,
+                                float(p.price), int(p.quantity))
+        name = p.name.lower().encode("utf-8")
+        search_starts += _INDEX.pack(search_len)
+        search_parts.append(name)
+        search_len += len(name) + 1
+
+    order = sorted(range(len(products)), key=lambda i: products[i].price)
+    by_price = b"".join(_INDEX.pack(i) for i in order)
+    search = b"\n".join(search_parts)
+
+    by_price_off = _HEADER.size + len(records)
+    starts_off = by_price_off + len(by_price)
+    strings_off = starts_off + len(search_starts)
+    search_off = strings_off + len(strings)
+    if search_off + len(search) > 0xFFFFFFFF:
+        raise InvalidInputError("Catalog is too large for a snapshot (over 4 GiB).")
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, version, len(products),
+                          by_price_off, starts_off, strings_off, search_off, len(search))
+    return header + bytes(records) + by_price + bytes(search_starts) + bytes(strings) + search
+
+
+class CatalogSnapshotPublisher:
+    """Writer side: publishes new catalog versions for readers to attach to."""
+    def __init__(self, name):
+        if not name or not isinstance(name, str):
+            raise InvalidInputError("Snapshot name must be a non-empty string.")
+        self.name = name
+        self.version = 0
+        self._control = shared_memory.SharedMemory(name=name, create=True, size=_CONTROL.size)
+        _OWNED_SEGMENTS.add(name)
+        _CONTROL.pack_into(self._control.buf, 0, 0, 0)
+        self._sequence = 0
+        self._segments = []  # oldest first; the last one is current
+
+    def publish(self, products):
+        """Write a new snapshot of `products` and make it the current version."""
+        version = self.version + 1
+        payload = encode_catalog(products, version)
+        segment = shared_memory.SharedMemory(name=f"{self.name}_v{version}", create=True,
+                                             size=max(len(payload), 1))
+        segment.buf[:len(payload)] = payload
+        _OWNED_SEGMENTS.add(segment.name)
+
+        # Seqlock flip: odd sequence means "writer in progress"
+        self._sequence += 1
+        _CONTROL.pack_into(self._control.buf, 0, self._sequence, self.version)
+        self._sequence += 1
+        _CONTROL.pack_into(self._control.buf, 0, self._sequence, version)
+        self.version = version
+
+        self._segments.append(segment)
+        # Keep the previous version alive for readers that are mid-attach;
+        # readers that already mapped an older segment keep their mapping.
+        while len(self._segments) > 2:
+            old = self._segments.pop(0)
+            old.close()
+            old.unlink()
+            _OWNED_SEGMENTS.discard(old.name)
+        return version
+
+    def close(self):
+        """Unlink every segment owned by this publisher."""
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+            _OWNED_SEGMENTS.discard(segment.name)
+        self._segments = []
+        self._control.close()
+        self._control.unlink()
+        _OWNED_SEGMENTS.discard(self.name)
+
+
+class CatalogSnapshotReader:
+    """Reader side: zero-copy browse, search and sort over the current snapshot."""
+    def __init__(self, name):
+        self.name = name
+        self._control = _attach(name)
+        self._segment = None
+        self.version = 0
+        self.refresh()
+
+    def _current_version(self):
+        while True:
+            seq1, version = _CONTROL.unpack_from(self._control.buf, 0)
+            seq2, _ = _CONTROL.unpack_from(self._control.buf, 0)
+            if seq1 == seq2 and seq1 % 2 == 0:
+                return version
+
+    def refresh(self):
+        """
+        Switch to the newest published version if it changed.
+
+        Returns:
+            bool: True if a new version was attached
+        """
+        version = self._current_version()
+        if version == self.version or version == 0:
+            return False
+        segment = _attach(f"{self.name}_v{version}")
+        magic, fmt, _, stamped, count, by_price, starts, strings, search, search_len = \
+            _HEADER.unpack_from(segment.buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or stamped != version:
+            segment.close()
+            raise InvalidInputError(f"Segment '{self.name}_v{version}' is not a catalog snapshot.")
+        self._release_segment()
+        self._segment = segment
+        self._count = count
+        self._by_price = by_price
+        self._starts = starts
+        self._strings = strings
+        self._search = search
+        self._search_len = search_len
+        self.version = version
+        return True
+
+    def __len__(self):
+        return self._count if self._segment else 0
+
+    def _record(self, index):
+        return _RECORD.unpack_from(self._segment.buf, _HEADER.size + index * _RECORD.size)
+
+    def _text(self, offset, length):
+        start = self._strings + offset
+        return str(self._segment.buf[start:start + length], "utf-8")
+
+    def product(self, index):
+        """Decode a single record into a ProductView."""
+        id_off, id_len, name_off, name_len, cat_off, cat_len, price, qty = self._record(index)
+        return ProductView(self._text(id_off, id_len), self._text(name_off, name_len),
+                           self._text(cat_off, cat_len), price, qty)
+
+    def get_all_products(self):
+        return [self.product(i) for i in range(len(self))]
+
+    def get_products_sorted_by_price(self, limit=None):
+        """Products in ascending price order, using the precomputed permutation."""
+        count = len(self) if limit is None else min(limit, len(self))
+        buf = self._segment.buf if self._segment else None
+        return [self.product(_INDEX.unpack_from(buf, self._by_price + i * _INDEX.size)[0])
+                for i in range(count)]
+
+    def search_product_by_name(self, query):
+        """Case-insensitive substring search directly over the shared search blob."""
+        if not self._segment:
+            return []
+        needle = query.lower().encode("utf-8")
+        if not needle:
+            return self.get_all_products()
+        blob = self._segment.buf[self._search:self._search + self._search_len]
+        starts = self._line_starts()
+        hits = []
+        seen = set()
+        for match in re.finditer(re.escape(needle), blob):
+            index = bisect_right(starts, match.start()) - 1
+            end = starts[index + 1] - 1 if index + 1 < len(starts) else self._search_len
+            if match.end() > end:
+                continue  # Spans the separator into the next name
+            if index not in seen:
+                seen.add(index)
+                hits.append(index)
+        blob.release()
+        return [self.product(i) for i in hits]
+
+    def _line_starts(self):
+        # Start offset of every record's name in the search blob; cached per version.
+        cached = getattr(self, "_starts_cache", None)
+        if cached and cached[0] == self.version:
+            return cached[1]
+        starts = list(struct.unpack_from(f"<{self._count}I", self._segment.buf, self._starts))
+        self._starts_cache = (self.version, starts)
+        return starts
+
+    def _release_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def close(self):
+        self._release_segment()
+        self._control.close()
+
@@ -0,0 +1,373 @@
+# cli.py
+
+"""
+Command-Line Administration
+---------------------------
+Headless entry point for scripted, high-volume admin tasks, without the
+Tkinter application:
+
+    python cli.py export-catalog --catalog products.csv [--out-of-stock] [-o out.csv]
+    python cli.py adjust-stock   --catalog products.csv adjustments.csv [-o new.csv]
+    python cli.py set-status     --orders orders.jsonl transitions.csv -o new.jsonl [--catalog products.csv]
+    python cli.py report {revenue,tax} --orders orders.jsonl [--by day|month|state] [-o out.csv]
+    python cli.py sketch [--orders orders.jsonl ...] [--merge sketch.json ...] [--save sketch.json]
+    python cli.py audit LOG_DIR [--since TIME] [--until TIME] [--user ID] [--entity ID] [--type TYPE]
+
+Data files:
+    catalog      CSV with product_id,name,category,price,quantity
+    orders       JSON lines, one order per line (order_archive.order_to_dict)
+    adjustments  CSV with product_id and either delta (relative) or quantity (absolute)
+    transitions  CSV with order_id,status (checked against the order lifecycle;
+                 cancellations restock the --catalog when one is given)
+    sketch       JSON from sketches.OrderSketches; sketches built from different
+                 order files (or machines) can be merged and queried later
+
+The catalog is loaded into a ProductManager so every change goes through the
+same validation as the GUI. Order files are streamed one line at a time and
+reports keep only one running total per group, so they handle far more
+orders than fit in memory. "-" (the default for -o) means stdout.
+
+Exit codes: 0 on success, 1 if some rows were rejected (each is reported on
+stderr and the rest are still applied), 2 for usage or file errors,
+including order files with malformed or incomplete records.
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+import datetime
+from collections import defaultdict
+
+from models import Product, ORDER_STATUSES, STATUS_CANCELLED, can_transition
+from managers import ProductManager
+from exceptions import ECommerceError, InvalidInputError
+from state_tax_rates import get_tax_rate, is_valid_state
+from sketches import OrderSketches
+from audit_log import query_audit_log
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_ERROR = 2
+
+CATALOG_FIELDS = ["product_id", "name", "category", "price", "quantity"]
+
+# Fields every order record needs -> accepted types (the commands read them directly)
+ORDER_RECORD_FIELDS = {
+    "order_id": str,
+    "customer_id": str,
+    "status": str,
+    "state_code": (str, type(None)),
+    "timestamp": (int, float),
+    "total_price": (int, float),
+    "tax": (int, float),
+}
+
+
+class _Output:
+    """Context manager for an output path, where "-" is stdout."""
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        if self.path == "-":
+            self.file = sys.stdout
+        else:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+        return self.file
+
+    def __exit__(self, *exc):
+        if self.file is not sys.stdout:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+def load_catalog(path, product_manager=None):
+    """Reads a catalog CSV into a ProductManager (a new one by default)."""
+    product_manager = product_manager or ProductManager()
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                product_manager.add_product(Product(row["product_id"], row["name"], row["category"],
+                                                    row["price"], row["quantity"]))
+            except (KeyError, ECommerceError) as e:
+                raise InvalidInputError(f"{path}:{line}: {e}")
+    return product_manager
+
+
+def write_catalog(products, out):
+    writer = csv.writer(out)
+    writer.writerow(CATALOG_FIELDS)
+    for p in products:
+        writer.writerow([p.product_id, p.name, p.category, f"{p.price:.2f}", p.quantity])
+
+
+def _check_order_record(record):
+    """Reason an order record cannot be used, or None."""
+    if not isinstance(record, dict):
+        return "order record is not a JSON object"
+    for field, types in ORDER_RECORD_FIELDS.items():
+        if field not in record:
+            return f"order record has no '{field}'"
+        if not isinstance(record[field], types) or isinstance(record[field], bool):
+            return f"order record has an invalid '{field}'"
+    if not isinstance(record.get("stock_allocations", {}), dict):
+        return "order record has an invalid 'stock_allocations'"
+    return None
+
+
+def iter_order_records(path):
+    """Yields order dicts from a JSON-lines orders file, one line at a time."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise InvalidInputError(f"{path}:{line_number}: malformed order record")
+            if problem := _check_order_record(record):
+                raise InvalidInputError(f"{path}:{line_number}: {problem}")
+            yield record
+
+
+def write_order_records(records, out):
+    for record in records:
+        out.write(json.dumps(record, separators=(",", ":")))
+        out.write("\n")
+
+
+def _reject(path, line, message):
+    print(f"{path}:{line}: {message}", file=sys.stderr)
+
+
+# --- Commands ---
+def cmd_export_catalog(args):
+    product_manager = load_catalog(args.catalog)
+    if args.out_of_stock:
+        products = product_manager.get_out_of_stock_products()
+    else:
+        products = product_manager.get_all_products()
+    if args.category:
+        products = [p for p in products if p.category == args.category]
+    with _Output(args.output) as out:
+        write_catalog(products, out)
+    return EXIT_OK
+
+
+def cmd_adjust_stock(args):
+    product_manager = load_catalog(args.catalog)
+    rejected = applied = 0
+    with open(args.adjustments, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        if "product_id" not in fields or ("delta" not in fields and "quantity" not in fields):
+            raise InvalidInputError(f"{args.adjustments}: needs product_id and delta or quantity columns")
+        for line, row in enumerate(reader, start=2):
+            try:
+                product = product_manager.get_product(row.get("product_id"))
+                if row.get("delta") not in (None, ""):
+                    product_manager.adjust_stock(product.product_id, int(row["delta"]))
+                elif row.get("quantity") not in (None, ""):
+                    product_manager.update_product(product.product_id, product.name, product.category,
+                                                   product.price, int(row["quantity"]))
+                else:
+                    raise InvalidInputError("Row has neither a delta nor a quantity.")
+                applied += 1
+            except (ValueError, TypeError):
+                rejected += 1
+                _reject(args.adjustments, line, "Quantity must be a valid integer.")
+            except ECommerceError as e:
+                rejected += 1
+                _reject(args.adjustments, line, e)
+    with _Output(args.output or args.catalog) as out:
+        write_catalog(product_manager.get_all_products(), out)
+    print(f"Adjusted {applied} product(s), rejected {rejected}.", file=sys.stderr)
+    return EXIT_PARTIAL if rejected else EXIT_OK
+
+
+def cmd_set_status(args):
+    if args.output is None or args.output == args.orders:
+        raise InvalidInputError("set-status streams the orders file and needs a different -o/--output path")
+    transitions = {}
+    rejected = 0
+    with open(args.transitions, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            status = (row.get("status") or "").strip().title()
+            if status not in ORDER_STATUSES:
+                rejected += 1
+                _reject(args.transitions, line, f"Invalid status '{row.get('status')}'")
+                continue
+            transitions[(row.get("order_id") or "").strip()] = status
+
+    product_manager = load_catalog(args.catalog) if args.catalog else None
+    restock = defaultdict(int)
+    updated = 0
+
+    def apply(records):
+        nonlocal updated, rejected
+        for record in records:
+            status = transitions.pop(record["order_id"], None)
+            if status is None:
+                pass
+            elif not can_transition(record["status"], status):
+                rejected += 1
+                _reject(args.transitions, "-", f"Order '{record['order_id']}' cannot move from {record['status']} to {status}.")
+            else:
+                record["status"] = status
+                updated += 1
+                if status == STATUS_CANCELLED:
+                    for product_id, quantity in record.get("stock_allocations", {}).items():
+                        restock[product_id] += quantity
+            yield record
+
+    with _Output(args.output) as out:
+        write_order_records(apply(iter_order_records(args.orders)), out)
+    for order_id in transitions:
+        rejected += 1
+        _reject(args.transitions, "-", f"Order with ID '{order_id}' not found.")
+    if product_manager is not None and restock:
+        for product_id, quantity in restock.items():
+            if product_id in product_manager.products:
+                product_manager.adjust_stock(product_id, quantity, "cancel")
+        with _Output(args.catalog) as out:
+            write_catalog(product_manager.get_all_products(), out)
+    print(f"Updated {updated} order(s), rejected {rejected}.", file=sys.stderr)
+    return EXIT_PARTIAL if rejected else EXIT_OK
+
+
+def _group_key(record, by):
+    if by == "state":
+        return record["state_code"] or ""
+    moment = datetime.datetime.fromtimestamp(record["timestamp"])
+    return moment.strftime("%Y-%m" if by == "month" else "%Y-%m-%d")
+
+
+def cmd_report(args):
+    totals = defaultdict(lambda: [0, 0.0, 0.0])  # group -> [orders, revenue, tax]
+    by = args.by or ("state" if args.kind == "tax" else "day")
+    for record in iter_order_records(args.orders):
+        group = totals[_group_key(record, by)]
+        group[0] += 1
+        group[1] += record["total_price"]
+        group[2] += record["tax"]
+    with _Output(args.output) as out:
+        writer = csv.writer(out)
+        if args.kind == "tax":
+            writer.writerow([by, "orders", "taxable", "tax", "tax_rate"])
+            for key in sorted(totals):
+                orders, revenue, tax = totals[key]
+                rate = get_tax_rate(key) if by == "state" and is_valid_state(key) else ""
+                writer.writerow([key, orders, f"{revenue - tax:.2f}", f"{tax:.2f}", rate])
+        else:
+            writer.writerow([by, "orders", "revenue", "tax"])
+            for key in sorted(totals):
+                orders, revenue, tax = totals[key]
+                writer.writerow([key, orders, f"{revenue:.2f}", f"{tax:.2f}"])
+    return EXIT_OK
+
+
+def cmd_sketch(args):
+    if not args.orders and not args.merge:
+        raise InvalidInputError("sketch needs at least one --orders or --merge file")
+    sketches = OrderSketches()
+    for path in args.merge or []:
+        sketches.merge(OrderSketches.load(path))
+    for path in args.orders or []:
+        for record in iter_order_records(path):
+            sketches.record(record["customer_id"], record["state_code"], record["total_price"],
+                            record.get("stock_allocations", {}).items())
+    if args.save:
+        sketches.save(args.save)
+    summary = {
+        "orders": sketches.orders,
+        "distinct_customers": sketches.distinct_customers(),
+        "distinct_customers_by_state": {s: sketches.distinct_customers(s) for s in sorted(sketches.customers_by_state)},
+        "order_value_percentiles": {f"p{p}": sketches.order_value_percentile(p) for p in (50, 90, 99)},
+        "heavy_hitters": sketches.heavy_hitters(args.top),
+        "error_bounds": sketches.error_bounds(),
+    }
+    with _Output(args.output) as out:
+        json.dump(summary, out, indent=2)
+        out.write("\n")
+    return EXIT_OK
+
+
+def cmd_audit(args):
+    if not os.path.isdir(args.directory):
+        raise InvalidInputError(f"'{args.directory}' is not an audit log directory")
+    try:
+        records = query_audit_log(args.directory, args.since, args.until, args.user, args.entity, args.type)
+        with _Output(args.output) as out:
+            write_order_records(records, out)
+    except ValueError as e:
+        raise InvalidInputError(f"Invalid time filter: {e}")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless catalog and order administration.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export-catalog", help="Write the catalog as CSV")
+    export.add_argument("--catalog", required=True)
+    export.add_argument("--category")
+    export.add_argument("--out-of-stock", action="store_true")
+    export.add_argument("-o", "--output", default="-")
+    export.set_defaults(func=cmd_export_catalog)
+
+    adjust = commands.add_parser("adjust-stock", help="Apply stock adjustments from a CSV")
+    adjust.add_argument("--catalog", required=True)
+    adjust.add_argument("adjustments")
+    adjust.add_argument("-o", "--output", help="Updated catalog (default: overwrite --catalog)")
+    adjust.set_defaults(func=cmd_adjust_stock)
+
+    status = commands.add_parser("set-status", help="Change the status of many orders")
+    status.add_argument("--orders", required=True)
+    status.add_argument("transitions")
+    status.add_argument("-o", "--output")
+    status.add_argument("--catalog", help="Catalog to restock for cancelled orders")
+    status.set_defaults(func=cmd_set_status)
+
+    report = commands.add_parser("report", help="Revenue or tax report as CSV")
+    report.add_argument("kind", choices=["revenue", "tax"])
+    report.add_argument("--orders", required=True)
+    report.add_argument("--by", choices=["day", "month", "state"])
+    report.add_argument("-o", "--output", default="-")
+    report.set_defaults(func=cmd_report)
+
+    sketch = commands.add_parser("sketch", help="Approximate distinct customers, heavy hitters and order value percentiles")
+    sketch.add_argument("--orders", action="append", help="Orders file to add (repeatable)")
+    sketch.add_argument("--merge", action="append", help="Saved sketch to merge in (repeatable)")
+    sketch.add_argument("--save", help="Write the combined sketch here")
+    sketch.add_argument("--top", type=int, default=10, help="Number of heavy hitters to show")
+    sketch.add_argument("-o", "--output", default="-")
+    sketch.set_defaults(func=cmd_sketch)
+
+    audit = commands.add_parser("audit", help="Search the audit log (JSON lines)")
+    audit.add_argument("directory")
+    audit.add_argument("--since", help="ISO date/time, inclusive")
+    audit.add_argument("--until", help="ISO date/time, exclusive")
+    audit.add_argument("--user", help="Actor user ID")
+    audit.add_argument("--entity", help="Order, product or user the change was about")
+    audit.add_argument("--type", help="Event type, e.g. order.placed")
+    audit.add_argument("-o", "--output", default="-")
+    audit.set_defaults(func=cmd_audit)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except OSError as e:
+        print(f"File Error: {e}", file=sys.stderr)
+    except ECommerceError as e:
+        print(f"Error: {e}", file=sys.stderr)
+    return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+# datagen.py
+
+"""
+Synthetic Data and Workload Replay
+----------------------------------
+Generates realistic test data at any scale and replays recorded workloads
+against the managers, for capacity planning.
+
+- Product popularity follows a Zipf distribution (a few best sellers, a
+  long tail), and customers' shipping states are weighted by population.
+- Orders arrive as a Poisson process over a time range, so histories have
+  realistic gaps and bursts; their status depends on their age.
+- A workload is a JSON-lines file of timestamped operations ("order",
+  "review", "restock") that WorkloadReplayer runs against ProductManager and
+  OrderManager, either as fast as possible, at a fixed rate, or at the
+  recorded pace sped up by a factor, and reports latency percentiles.
+
+    python datagen.py generate DIR --products 5000 --users 1000 --orders 100000 --days 90
+    python datagen.py replay DIR --rate 500
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from models import (
+    User,
+    Product,
+    ShoppingCart,
+    Order,
+    LineItem,
+    ProductSnapshots,
+    STATUS_PLACED,
+    STATUS_PROCESSING,
+    STATUS_SHIPPED,
+    STATUS_DELIVERED,
+    STATUS_CANCELLED
+)
+from managers import ProductManager, OrderManager
+from events import EventBus
+from audit_log import AuditLog
+from exceptions import ECommerceError, InvalidInputError
+from state_tax_rates import calculate_tax
+from order_archive import order_to_dict
+from cli import load_catalog, write_catalog, write_order_records
+
+# 2020 census populations in thousands, used to weight shipping states
+STATE_POPULATIONS = {
+    "AK": 733, "AL": 5024, "AR": 3012, "AZ": 7152, "CA": 39538, "CO": 5774, "CT": 3606, "DC": 690,
+    "DE": 990, "FL": 21538, "GA": 10712, "HI": 1455, "IA": 3190, "ID": 1839, "IL": 12813, "IN": 6786,
+    "KS": 2938, "KY": 4506, "LA": 4658, "MA": 7030, "MD": 6177, "ME": 1362, "MI": 10077, "MN": 5706,
+    "MO": 6155, "MS": 2961, "MT": 1084, "NC": 10439, "ND": 779, "NE": 1962, "NH": 1378, "NJ": 9289,
+    "NM": 2118, "NV": 3105, "NY": 20201, "OH": 11799, "OK": 3959, "OR": 4237, "PA": 13003, "RI": 1097,
+    "SC": 5119, "SD": 887, "TN": 6911, "TX": 29146, "UT": 3272, "VA": 8631, "VT": 643, "WA": 7705,
+    "WI": 5894, "WV": 1794, "WY": 577,
+}
+
+# Category -> (median price, product name nouns)
+CATEGORIES = {
+    "Electronics": (120.0, ["Laptop", "Phone", "Headphones", "Monitor", "Keyboard", "Mouse", "Speaker", "Tablet"]),
+    "Appliances": (80.0, ["Blender", "Toaster", "Kettle", "Coffee Maker", "Microwave", "Air Fryer"]),
+    "Furniture": (200.0, ["Desk", "Chair", "Bookshelf", "Lamp", "Sofa", "Table"]),
+    "Clothing": (35.0, ["Jacket", "Shirt", "Sneakers", "Hat", "Scarf", "Jeans"]),
+    "Books": (18.0, ["Novel", "Cookbook", "Atlas", "Guide", "Biography"]),
+    "Sports": (45.0, ["Yoga Mat", "Dumbbell", "Bicycle Helmet", "Tennis Racket", "Water Bottle"]),
+}
+ADJECTIVES = ["Classic", "Pro", "Ultra", "Compact", "Deluxe", "Eco", "Smart", "Premium", "Basic", "Travel"]
+STREETS = ["Main St", "Oak Ave", "Maple Dr", "Cedar Ln", "Park Rd", "Elm St", "Lake View Blvd", "Hill St"]
+REVIEW_WORDS = {
+    5: ["excellent", "love it", "perfect", "great value", "highly recommend"],
+    4: ["very good", "works well", "solid", "happy with it"],
+    3: ["okay", "average", "does the job", "could be better"],
+    2: ["disappointing", "flimsy", "not as described"],
+    1: ["broke quickly", "terrible", "waste of money"],
+}
+RATING_WEIGHTS = [(5, 45), (4, 30), (3, 12), (2, 6), (1, 7)]  # Reviews skew positive
+
+OP_ORDER = "order"
+OP_REVIEW = "review"
+OP_RESTOCK = "restock"
+
+
+class ZipfSampler:
+    """Draws items with probability proportional to 1 / rank ** exponent (rank 1 = first item)."""
+    def __init__(self, items, exponent=1.1, rng=None):
+        if not items:
+            raise InvalidInputError("Cannot sample from an empty list.")
+        self.items = list(items)
+        self.rng = rng or random.Random()
+        self._cumulative = list(accumulate(1.0 / rank ** exponent for rank in range(1, len(self.items) + 1)))
+
+    def sample(self):
+        return self.items[bisect_left(self._cumulative, self.rng.random() * self._cumulative[-1])]
+
+
+class DataGenerator:
+    """Generates catalogs, users, reviews and order workloads from one seed."""
+    def __init__(self, seed=None, zipf_exponent=1.1):
+        self.rng = random.Random(seed)
+        # Order IDs and statuses for histories come from their own stream, so the
+        # same workload can be regenerated while a history is being built from it
+        self.history_rng = random.Random(self.rng.random())
+        self.zipf_exponent = zipf_exponent
+        self._states = list(STATE_POPULATIONS)
+        self._state_weights = list(accumulate(STATE_POPULATIONS[s] for s in self._states))
+        self._ratings = [rating for rating, _ in RATING_WEIGHTS]
+        self._rating_weights = list(accumulate(weight for _, weight in RATING_WEIGHTS))
+
+    def generate_products(self, count):
+        products = []
+        categories = list(CATEGORIES)
+        for i in range(count):
+            category = self.rng.choice(categories)
+            median, nouns = CATEGORIES[category]
+            name = f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(nouns)} {i + 1}"
+            price = round(median * self.rng.lognormvariate(0, 0.6), 2)
+            quantity = int(self.rng.expovariate(1 / 150))
+            products.append(Product(f"P{i + 1:06d}", name, category, price, quantity))
+        return products
+
+    def generate_users(self, count):
+        return [User(f"cust{i + 1:06d}", f"user{i + 1}", f"pass{i + 1}", "customer") for i in range(count)]
+
+    def random_state(self):
+        return self.rng.choices(self._states, cum_weights=self._state_weights)[0]
+
+    def random_address(self):
+        return f"{self.rng.randint(1, 9999)} {self.rng.choice(STREETS)}"
+
+    def generate_workload(self, products, users, count, start, end, review_rate=0.05, restock_rate=0.01):
+        """
+        Yields timestamped operations in time order.
+
+        Args:
+            products (list): Products to order (list order defines popularity rank)
+            users (list): Customers placing orders
+            count (int): Number of operations
+            start, end (datetime): Time range the operations are spread over
+            review_rate (float): Share of operations that are reviews
+            restock_rate (float): Share of operations that are restocks
+
+        Yields:
+            dict: {"op", "timestamp", ...} operation records
+        """
+        if count <= 0:
+            return
+        if end <= start:
+            raise InvalidInputError("Workload end must be after its start.")
+        popularity = ZipfSampler([p.product_id for p in products], self.zipf_exponent, self.rng)
+        customers = [u.user_id for u in users]
+        usernames = [u.username for u in users]
+        home_states = [self.random_state() for _ in users]
+        span = (end - start).total_seconds()
+        t = start.timestamp()
+        for _ in range(count):
+            # Poisson arrivals: exponential gaps with the mean needed to fill the range
+            t += self.rng.expovariate(count / span)
+            kind = self.rng.random()
+            if kind < restock_rate:
+                yield {"op": OP_RESTOCK, "timestamp": t, "product_id": popularity.sample(),
+                       "quantity": self.rng.randint(20, 200)}
+            elif kind < restock_rate + review_rate:
+                rating = self.rng.choices(self._ratings, cum_weights=self._rating_weights)[0]
+                yield {"op": OP_REVIEW, "timestamp": t, "product_id": popularity.sample(),
+                       "username": self.rng.choice(usernames), "rating": rating,
+                       "text": self.rng.choice(REVIEW_WORDS[rating]).capitalize() + "."}
+            else:
+                customer = self.rng.randrange(len(customers))
+                lines = defaultdict(int)
+                for _ in range(min(1 + int(self.rng.expovariate(1.0)), 8)):
+                    lines[popularity.sample()] += 1 if self.rng.random() < 0.85 else self.rng.randint(2, 4)
+                yield {"op": OP_ORDER, "timestamp": t, "customer_id": customers[customer],
+                       "state_code": home_states[customer], "address": self.random_address(),
+                       "lines": [[pid, qty] for pid, qty in sorted(lines.items())]}
+
+    def status_for_age(self, age_days):
+        """A plausible status for an order placed age_days ago."""
+        if self.history_rng.random() < 0.03:
+            return STATUS_CANCELLED
+        if age_days > 7:
+            return STATUS_DELIVERED
+        if age_days > 2:
+            return STATUS_SHIPPED
+        return STATUS_PROCESSING if age_days > 0.5 else STATUS_PLACED
+
+    def orders_from_workload(self, operations, products, now=None, snapshots=None):
+        """Turns the order operations of a workload into finished Order history (stock is untouched)."""
+        now = (now or datetime.datetime.now()).timestamp()
+        snapshots = snapshots if snapshots is not None else ProductSnapshots()
+        by_id = {p.product_id: p for p in products}
+        for op in operations:
+            if op["op"] != OP_ORDER:
+                continue
+            lines = [(by_id[pid], qty) for pid, qty in op["lines"] if pid in by_id]
+            subtotal = sum(p.price * qty for p, qty in lines)
+            tax, total = calculate_tax(subtotal, op["state_code"])
+            yield Order.restore(
+                f"{self.history_rng.getrandbits(32):08x}", op["customer_id"],
+                [LineItem.for_product(p, qty, snapshots) for p, qty in lines],
+                total, tax, op["address"], op["state_code"], datetime.datetime.fromtimestamp(op["timestamp"]),
+                self.status_for_age((now - op["timestamp"]) / 86400), {p.product_id: qty for p, qty in lines})
+
+
+# --- Dataset Files ---
+def write_dataset(directory, products, users, operations, orders=()):
+    """
+    Writes products.csv, users.csv, workload.jsonl and orders.jsonl (the
+    formats read by cli.py) to a directory. Operations and orders are
+    written as they are generated, so neither is held in memory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "products.csv"), "w", newline="", encoding="utf-8") as f:
+        write_catalog(products, f)
+    with open(os.path.join(directory, "users.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["user_id", "username", "password", "role"])
+        writer.writerows((u.user_id, u.username, u.password, u.role) for u in users)
+    with open(os.path.join(directory, "workload.jsonl"), "w", encoding="utf-8") as f:
+        write_order_records(operations, f)
+    with open(os.path.join(directory, "orders.jsonl"), "w", encoding="utf-8") as f:
+        write_order_records(map(order_to_dict, orders), f)
+
+
+def read_workload(path):
+    """Yields operations from a workload.jsonl file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# --- Replay ---
+class ReplayStats:
+    """Throughput, error counts and latency percentiles of a replay."""
+    def __init__(self):
+        self.operations = 0
+        self.elapsed = 0.0
+        self.errors = defaultdict(int)       # exception class name -> count
+        self.latencies = defaultdict(list)   # op type -> [seconds]
+
+    @property
+    def throughput(self):
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, op, fraction):
+        samples = sorted(self.latencies.get(op, ()))
+        if not samples:
+            return 0.0
+        return samples[min(int(fraction * len(samples)), len(samples) - 1)]
+
+    def report(self):
+        lines = [f"{self.operations} operations in {self.elapsed:.2f}s ({self.throughput:.0f} ops/s)"]
+        for op in sorted(self.latencies):
+            lines.append(f"  {op:<8} n={len(self.latencies[op]):<8} p50={self.percentile(op, 0.5) * 1000:.3f}ms "
+                         f"p95={self.percentile(op, 0.95) * 1000:.3f}ms p99={self.percentile(op, 0.99) * 1000:.3f}ms")
+        for error, count in sorted(self.errors.items()):
+            lines.append(f"  {error}: {count}")
+        return "\n".join(lines)
+
+
+class WorkloadReplayer:
+    """Runs workload operations against a ProductManager and OrderManager."""
+    def __init__(self, product_manager, order_manager, clock=time.perf_counter, sleep=time.sleep):
+        self.product_manager = product_manager
+        self.order_manager = order_manager
+        self.clock = clock
+        self.sleep = sleep
+
+    def replay(self, operations, rate=None, speedup=None):
+        """
+        Replays operations and measures each one.
+
+        Args:
+            operations (iterable): Operation dicts, in time order
+            rate (float): Fixed operations per second (overrides speedup)
+            speedup (float): Replay at the recorded pace sped up by this factor
+                (neither: as fast as possible)
+
+        Returns:
+            ReplayStats: Measurements for the replay
+        """
+        if (rate is not None and rate <= 0) or (speedup is not None and speedup <= 0):
+            raise InvalidInputError("Replay rate and speedup must be positive.")
+        stats = ReplayStats()
+        started = self.clock()
+        first_timestamp = None
+        for i, op in enumerate(operations):
+            # Pace against an absolute schedule so sleeps never accumulate drift
+            if rate is not None:
+                due = started + i / rate
+            elif speedup is not None:
+                if first_timestamp is None:
+                    first_timestamp = op["timestamp"]
+                due = started + (op["timestamp"] - first_timestamp) / speedup
+            else:
+                due = None
+            if due is not None and (wait := due - self.clock()) > 0:
+                self.sleep(wait)
+            begin = self.clock()
+            try:
+                self.apply(op)
+            except ECommerceError as e:
+                stats.errors[type(e).__name__] += 1
+            stats.latencies[op["op"]].append(self.clock() - begin)
+            stats.operations += 1
+        stats.elapsed = self.clock() - started
+        return stats
+
+    def apply(self, op):
+        kind = op["op"]
+        if kind == OP_ORDER:
+            cart = ShoppingCart(op["customer_id"])
+            for product_id, quantity in op["lines"]:
+                cart.add_item(self.product_manager.get_product(product_id), quantity)
+            subtotal = self.order_manager.evaluate_promotions(cart, op["state_code"]).discounted_subtotal
+            tax, total = self.order_manager.calculate_order_totals(subtotal, op["state_code"])
+            return self.order_manager.place_order(cart, subtotal, tax, total, op["address"], op["state_code"])
+        if kind == OP_REVIEW:
+            return self.product_manager.add_review_to_product(op["product_id"], op["username"], op["text"], op.get("rating"))
+        if kind == OP_RESTOCK:
+            return self.product_manager.adjust_stock(op["product_id"], op["quantity"], "restock")
+        raise InvalidInputError(f"Unknown workload operation: '{kind}'")
+
+
+# --- Command Line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="datagen.py", description="Generate synthetic data and replay workloads.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Write a synthetic dataset to a directory")
+    generate.add_argument("directory")
+    generate.add_argument("--products", type=int, default=1000)
+    generate.add_argument("--users", type=int, default=200)
+    generate.add_argument("--orders", type=int, default=10000, help="Workload operations to generate")
+    generate.add_argument("--days", type=float, default=30, help="History length, ending now")
+    generate.add_argument("--seed", type=int)
+    replay = commands.add_parser("replay", help="Replay a dataset's workload against fresh managers")
+    replay.add_argument("directory")
+    replay.add_argument("--rate", type=float, help="Operations per second")
+    replay.add_argument("--speedup", type=float, help="Recorded pace multiplier")
+    replay.add_argument("--audit-dir", help="Also write an audit log here (to compare latency with auditing on)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "generate":
+            seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+            generator = DataGenerator(seed)
+            products = generator.generate_products(args.products)
+            users = generator.generate_users(args.users)
+            end = datetime.datetime.now()
+            start = end - datetime.timedelta(days=args.days)
+            # The history is built from a second copy of the workload stream, so
+            # neither has to be held in memory
+            history_source = DataGenerator(seed)
+            history_source.rng.setstate(generator.rng.getstate())
+            operations = generator.generate_workload(products, users, args.orders, start, end)
+            history = history_source.orders_from_workload(
+                history_source.generate_workload(products, users, args.orders, start, end), products, end)
+            write_dataset(args.directory, products, users, operations, history)
+            print(f"Wrote {args.products} products, {args.users} users and {args.orders} operations to {args.directory}")
+        else:
+            event_bus = EventBus() if args.audit_dir else None
+            product_manager = load_catalog(os.path.join(args.directory, "products.csv"), ProductManager(event_bus))
+            audit_log = None
+            if args.audit_dir:
+                audit_log = AuditLog(args.audit_dir)
+                audit_log.attach(event_bus)
+            stats = WorkloadReplayer(product_manager, OrderManager(product_manager)).replay(
+                read_workload(os.path.join(args.directory, "workload.jsonl")), args.rate, args.speedup)
+            print(stats.report())
+            if audit_log is not None:
+                audit_log.close()
+                print(f"Audit log: {audit_log.stats}")
+    except OSError as e:
+        print(f"File Error: {e}", file=sys.stderr)
+        return 2
+    except ECommerceError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# events.py
+
+"""
+Event Bus
+---------
+In-process publish/subscribe for inventory and order changes, so that
+indexes, caches, reports and GUI views can update incrementally instead of
+rescanning the managers.
+
+- Every published Event gets a sequence number and a timestamp.
+- Each subscriber has its own bounded queue; when it is full the oldest
+  event is dropped and counted in Subscription.dropped.
+- Events are delivered to handlers in batches (a list of events) as soon as
+  a subscriber's queue reaches its batch size, or when flush() is called.
+  Subscribers without a batch size are only delivered to on flush(), e.g.
+  from a timer, which is when the queue bound matters.
+- An optional EventLog appends every event as a JSON line to a local file,
+  which read_event_log can replay later.
+"""
+
+import json
+import time
+import threading
+from collections import deque
+
+from exceptions import InvalidInputError
+
+# --- Event Types ---
+PRODUCT_ADDED = "product.added"
+PRODUCT_UPDATED = "product.updated"
+PRODUCT_DELETED = "product.deleted"
+STOCK_CHANGED = "stock.changed"
+ORDER_PLACED = "order.placed"
+ORDER_STATUS_CHANGED = "order.status_changed"
+USER_LOGGED_IN = "user.logged_in"
+USER_LOGIN_FAILED = "user.login_failed"
+
+ALL_EVENT_TYPES = (PRODUCT_ADDED, PRODUCT_UPDATED, PRODUCT_DELETED,
+                   STOCK_CHANGED, ORDER_PLACED, ORDER_STATUS_CHANGED,
+                   USER_LOGGED_IN, USER_LOGIN_FAILED)
+
+
+class Event:
+    """An immutable record of one change."""
+    __slots__ = ("sequence", "type", "timestamp", "data")
+
+    def __init__(self, sequence, event_type, timestamp, data):
+        self.sequence = sequence
+        self.type = event_type
+        self.timestamp = timestamp
+        self.data = data
+
+    def to_dict(self):
+        return {"sequence": self.sequence, "type": self.type, "timestamp": self.timestamp, "data": self.data}
+
+    def __repr__(self):
+        return f"Event({self.sequence}, {self.type!r}, {self.data!r})"
+
+
+class Subscription:
+    """A subscriber's handler, filter and bounded queue."""
+    def __init__(self, handler, event_types, max_queue, batch_size):
+        self.handler = handler
+        self.event_types = frozenset(event_types) if event_types else None
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.queue = deque()
+        self.dropped = 0
+        self.delivered = 0
+        self.last_error = None
+
+    def accepts(self, event_type):
+        return self.event_types is None or event_type in self.event_types
+
+
+class EventLog:
+    """Durable, append-only JSON-lines tail of published events."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, events):
+        for event in events:
+            self._file.write(json.dumps(event.to_dict(), separators=(",", ":"), default=str))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_event_log(path, since_sequence=0):
+    """Yields events from an EventLog file with a sequence above since_sequence."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["sequence"] > since_sequence:
+                yield Event(record["sequence"], record["type"], record["timestamp"], record["data"])
+
+
+class EventBus:
+    """Publishes typed events to subscribers with bounded, batched queues."""
+    def __init__(self, log=None):
+        self.log = log
+        self._subscriptions = []
+        self._sequence = 0
+        self._lock = threading.RLock()
+
+    def subscribe(self, handler, event_types=None, max_queue=10000, batch_size=100):
+        """
+        Registers a handler that receives lists of events.
+
+        Args:
+            handler (callable): Called as handler(events)
+            event_types (iterable): Event types to receive (None for all)
+            max_queue (int): Queue bound; the oldest events are dropped beyond it
+            batch_size (int): Deliver automatically once this many events are queued
+                (None to deliver only when flush() is called)
+
+        Returns:
+            Subscription: Handle used to unsubscribe and inspect queue stats
+        """
+        if max_queue <= 0 or (batch_size is not None and batch_size <= 0):
+            raise InvalidInputError("Queue and batch sizes must be positive.")
+        if batch_size is not None:
+            batch_size = min(batch_size, max_queue)
+        subscription = Subscription(handler, event_types, max_queue, batch_size)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event_type, **data):
+        """Publishes one event and delivers any batches that became full."""
+        with self._lock:
+            self._sequence += 1
+            event = Event(self._sequence, event_type, time.time(), data)
+            if self.log is not None:
+                self.log.append([event])
+            ready = []
+            for subscription in self._subscriptions:
+                if not subscription.accepts(event_type):
+                    continue
+                if len(subscription.queue) >= subscription.max_queue:
+                    subscription.queue.popleft()
+                    subscription.dropped += 1
+                subscription.queue.append(event)
+                if subscription.batch_size is not None and len(subscription.queue) >= subscription.batch_size:
+                    ready.append(subscription)
+        for subscription in ready:
+            self._deliver(subscription)
+        return event
+
+    def flush(self):
+        """Delivers everything still queued to every subscriber."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            self._deliver(subscription)
+
+    def _deliver(self, subscription):
+        with self._lock:
+            batch = list(subscription.queue)
+            subscription.queue.clear()
+        if not batch:
+            return
+        try:
+            subscription.handler(batch)
+            subscription.delivered += len(batch)
+        except Exception as e:
+            # A failing subscriber must never break the publisher (e.g. checkout)
+            subscription.last_error = e
@@ -18,4 +18,12 @@ class ProductNotFoundError(ECommerceError):
 
 class InvalidInputError(ECommerceError):
     """Raised when input data (like price or quantity) is invalid."""
-    pass
\ No newline at end of file
+    pass
+
+class InvalidStatusTransitionError(ECommerceError):
+    """Raised when an order status change is not allowed by the order lifecycle."""
+    pass
+
+class ConcurrentModificationError(ECommerceError):
+    """Raised when a conditional update finds the record changed since it was read."""
+    pass
@@ -0,0 +1,221 @@
+# facets.py
+
+"""
+Facet Index
+-----------
+Bitmap indexes behind faceted browsing (category, price band, in-stock
+status) and the live counts shown next to each facet value.
+
+- Every product gets a small integer slot; slots of deleted products are
+  reused, so slots stay dense. Each facet value keeps a Bitmap of the slots
+  of the products that have it.
+- Bitmaps are compressed by splitting slots into 65536-bit chunks stored as
+  Python integers, with empty chunks left out. Intersections, unions and
+  counts work a whole chunk at a time (&, | and int.bit_count run in C), so
+  they cost a few operations per 65536 products instead of one per product.
+- ProductManager updates the index whenever a product is added, edited,
+  deleted or changes stock, so counts are never recomputed from the catalog.
+- Within a facet, selected values are alternatives (Electronics OR
+  Furniture); across facets they must all hold. Each facet's counts apply
+  only the other facets' selections, so they show how many products
+  choosing that value would give.
+"""
+
+from heapq import heappush, heappop
+from bisect import bisect_right
+
+from exceptions import InvalidInputError
+
+FACETS = ("category", "price", "stock")
+
+# (lower bound inclusive, upper bound exclusive or None, label)
+PRICE_BANDS = (
+    (0, 25, "Under $25"),
+    (25, 100, "$25 to $100"),
+    (100, 500, "$100 to $500"),
+    (500, None, "$500 and up"),
+)
+
+IN_STOCK = "In stock"
+OUT_OF_STOCK = "Out of stock"
+
+_CHUNK_BITS = 16
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+class Bitmap:
+    """Set of non-negative integers stored as 65536-bit chunks; empty chunks are not stored."""
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks=None):
+        self.chunks = chunks if chunks is not None else {}  # chunk number -> int with one bit per member
+
+    def add(self, n):
+        key = n >> _CHUNK_BITS
+        self.chunks[key] = self.chunks.get(key, 0) | (1 << (n & _CHUNK_MASK))
+
+    def discard(self, n):
+        key = n >> _CHUNK_BITS
+        bits = self.chunks.get(key, 0) & ~(1 << (n & _CHUNK_MASK))
+        if bits:
+            self.chunks[key] = bits
+        else:
+            self.chunks.pop(key, None)
+
+    def __contains__(self, n):
+        return bool(self.chunks.get(n >> _CHUNK_BITS, 0) >> (n & _CHUNK_MASK) & 1)
+
+    def __and__(self, other):
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        chunks = {}
+        for key, bits in small.items():
+            bits &= large.get(key, 0)
+            if bits:
+                chunks[key] = bits
+        return Bitmap(chunks)
+
+    def __or__(self, other):
+        chunks = dict(self.chunks)
+        for key, bits in other.chunks.items():
+            chunks[key] = chunks.get(key, 0) | bits
+        return Bitmap(chunks)
+
+    def intersection_count(self, other):
+        """len(self & other) without building the intersection."""
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        return sum((bits & large.get(key, 0)).bit_count() for key, bits in small.items())
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __bool__(self):
+        return bool(self.chunks)
+
+    def __iter__(self):
+        """Members in ascending order."""
+        for key in sorted(self.chunks):
+            bits, base = self.chunks[key], key << _CHUNK_BITS
+            while bits:
+                low = bits & -bits
+                yield base + low.bit_length() - 1
+                bits ^= low
+
+
+class FacetIndex:
+    """Per-facet-value bitmaps of a catalog, kept current by ProductManager."""
+    def __init__(self, price_bands=PRICE_BANDS):
+        self.price_bands = price_bands
+        self._band_starts = [low for low, _, _ in price_bands]
+        self.all = Bitmap()          # Slots of every indexed product
+        self._slots = {}             # product_id -> slot
+        self._ids = []               # slot -> product_id (None when free)
+        self._free = []              # Heap of free slots, smallest reused first
+        self._values = {}            # product_id -> indexed (category, band, stock)
+        self._bitmaps = {facet: {} for facet in FACETS}  # facet -> value -> Bitmap
+
+    def price_band(self, price):
+        i = bisect_right(self._band_starts, price) - 1
+        return self.price_bands[max(i, 0)][2]
+
+    def _facet_values(self, product):
+        return (product.category, self.price_band(product.price),
+                IN_STOCK if product.quantity > 0 else OUT_OF_STOCK)
+
+    # --- Maintenance (called by ProductManager) ---
+    def index(self, product):
+        """Adds a product, or moves it to its current facet values."""
+        product_id = product.product_id
+        new = self._facet_values(product)
+        slot = self._slots.get(product_id)
+        if slot is None:
+            slot = heappop(self._free) if self._free else len(self._ids)
+            if slot == len(self._ids):
+                self._ids.append(product_id)
+            else:
+                self._ids[slot] = product_id
+            self._slots[product_id] = slot
+            self.all.add(slot)
+            old = (None,) * len(FACETS)
+        else:
+            old = self._values[product_id]
+            if old == new:
+                return
+        for facet, before, after in zip(FACETS, old, new):
+            if before != after:
+                if before is not None:
+                    self._discard(facet, before, slot)
+                self._bitmaps[facet].setdefault(after, Bitmap()).add(slot)
+        self._values[product_id] = new
+
+    def remove(self, product_id):
+        slot = self._slots.pop(product_id, None)
+        if slot is None:
+            return
+        for facet, value in zip(FACETS, self._values.pop(product_id)):
+            self._discard(facet, value, slot)
+        self.all.discard(slot)
+        self._ids[slot] = None
+        heappush(self._free, slot)
+
+    def _discard(self, facet, value, slot):
+        bitmap = self._bitmaps[facet][value]
+        bitmap.discard(slot)
+        if not bitmap:
+            del self._bitmaps[facet][value]
+
+    # --- Queries ---
+    def values(self, facet):
+        """Facet values currently held by at least one product, in display order."""
+        present = self._bitmaps[self._check(facet)]
+        if facet == "price":
+            return [label for _, _, label in self.price_bands if label in present]
+        if facet == "stock":
+            return [value for value in (IN_STOCK, OUT_OF_STOCK) if value in present]
+        return sorted(present, key=str)
+
+    def _check(self, facet):
+        if facet not in self._bitmaps:
+            raise InvalidInputError(f"Unknown facet '{facet}'. Use one of: {', '.join(FACETS)}")
+        return facet
+
+    def matching(self, selected=None):
+        """
+        Bitmap of the products matching a selection.
+
+        Args:
+            selected (dict): facet -> collection of accepted values; empty or missing facets accept everything
+        """
+        result = self.all
+        for facet, values in (selected or {}).items():
+            if not values:
+                continue
+            bitmaps = self._bitmaps[self._check(facet)]
+            union = Bitmap()
+            for value in values:
+                if value in bitmaps:
+                    union = union | bitmaps[value]
+            result = result & union
+        return result
+
+    def counts(self, selected=None):
+        """{facet: {value: product count}}, each facet counted under the other facets' selections."""
+        selected = {facet: values for facet, values in (selected or {}).items() if values}
+        counts = {}
+        for facet in FACETS:
+            base = self.matching({f: v for f, v in selected.items() if f != facet})
+            bitmaps = self._bitmaps[facet]
+            counts[facet] = {value: base.intersection_count(bitmaps[value]) for value in self.values(facet)}
+        return counts
+
+    def product_ids(self, selected=None):
+        """IDs of the products matching a selection, in slot order."""
+        ids = self._ids
+        return [ids[slot] for slot in self.matching(selected)]
+
+    def contains(self, bitmap, product_id):
+        """Whether a product is in a bitmap returned by matching()."""
+        slot = self._slots.get(product_id)
+        return slot is not None and slot in bitmap
+
+    def __len__(self):
+        return len(self._slots)
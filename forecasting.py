@@ -0,0 +1,136 @@
+# forecasting.py
+
+"""
+Replenishment Forecasting
+-------------------------
+Estimates how fast each product sells and warns before it runs out, rather
+than only after quantity reaches zero.
+
+Sales velocity is an exponentially weighted rate (units/day) that is updated
+in O(1) per sale and decays with a configurable half-life between sales:
+
+    rate(t) = rate(t0) * 0.5 ** ((t - t0) / half_life) + units * ln(2) / half_life
+
+Days to stock-out is quantity / velocity. Alerts live in a heap ordered by
+projected stock-out time; entries are invalidated lazily with a per-product
+version number, so updates never search the heap. Only products that have
+sold are tracked, which keeps memory proportional to active SKUs.
+"""
+
+import math
+import time
+import heapq
+
+from events import ORDER_PLACED, STOCK_CHANGED, PRODUCT_DELETED
+
+SECONDS_PER_DAY = 86400.0
+
+
+class StockAlert:
+    """A product projected to run out within the alert horizon."""
+    def __init__(self, product_id, name, quantity, velocity, days_to_stockout):
+        self.product_id = product_id
+        self.name = name
+        self.quantity = quantity
+        self.velocity = velocity  # Units per day
+        self.days_to_stockout = days_to_stockout
+
+
+class ReplenishmentForecaster:
+    """Tracks per-product sales velocity and raises low-stock alerts by urgency."""
+    def __init__(self, product_manager, half_life_days=7.0, alert_days=14.0):
+        self.product_manager = product_manager
+        self.half_life = half_life_days * SECONDS_PER_DAY
+        self.alert_days = alert_days
+        self._state = {}     # product_id -> (rate per day, last update epoch seconds)
+        self._versions = {}  # product_id -> version of its latest heap entry
+        self._heap = []      # (projected stock-out epoch seconds, product_id, version)
+        self._subscription = None
+
+    def attach(self, event_bus, batch_size=1):
+        """Consumes order and stock events from an EventBus."""
+        self._subscription = event_bus.subscribe(self.handle_events, [ORDER_PLACED, STOCK_CHANGED, PRODUCT_DELETED],
+                                                 batch_size=batch_size)
+        return self._subscription
+
+    def handle_events(self, events):
+        for event in events:
+            if event.type == ORDER_PLACED:
+                for product_id, _, _, quantity in event.data["lines"]:
+                    self.record_sale(product_id, quantity, event.data["timestamp"])
+            elif event.type == STOCK_CHANGED:
+                self._reschedule(event.data["product_id"], event.timestamp)
+            elif event.type == PRODUCT_DELETED:
+                self._state.pop(event.data["product_id"], None)
+                self._versions.pop(event.data["product_id"], None)
+
+    def _decayed_rate(self, product_id, now):
+        state = self._state.get(product_id)
+        if state is None:
+            return 0.0
+        rate, last = state
+        return rate * 0.5 ** (max(now - last, 0.0) / self.half_life)
+
+    def record_sale(self, product_id, quantity, timestamp=None):
+        """Folds a sale into the product's velocity and reschedules its alert."""
+        now = timestamp if timestamp is not None else time.time()
+        rate = self._decayed_rate(product_id, now) + quantity * math.log(2) / (self.half_life / SECONDS_PER_DAY)
+        self._state[product_id] = (rate, now)
+        self._reschedule(product_id, now)
+
+    def velocity(self, product_id, now=None):
+        """Estimated units sold per day."""
+        return self._decayed_rate(product_id, now if now is not None else time.time())
+
+    def days_to_stockout(self, product_id, now=None):
+        now = now if now is not None else time.time()
+        product = self.product_manager.products.get(product_id)
+        velocity = self._decayed_rate(product_id, now)
+        if product is None or velocity <= 0:
+            return math.inf
+        return product.quantity / velocity
+
+    def _reschedule(self, product_id, now):
+        if product_id not in self._state:
+            return
+        days = self.days_to_stockout(product_id, now)
+        version = self._versions.get(product_id, 0) + 1
+        self._versions[product_id] = version
+        if days != math.inf:
+            heapq.heappush(self._heap, (now + days * SECONDS_PER_DAY, product_id, version))
+        if len(self._heap) > 2 * len(self._versions) + 64:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._versions.get(entry[1]) == entry[2]]
+        heapq.heapify(self._heap)
+
+    def get_alerts(self, limit=20, now=None):
+        """
+        Most urgent products first, limited to those within the alert horizon.
+
+        Returns:
+            list: StockAlert objects ordered by days to stock-out
+        """
+        now = now if now is not None else time.time()
+        alerts = []
+        popped = []
+        while self._heap and len(alerts) < limit:
+            entry = heapq.heappop(self._heap)
+            _, product_id, version = entry
+            if self._versions.get(product_id) != version:
+                continue  # Superseded by a newer estimate
+            popped.append(entry)
+            # Velocity decays between sales, so re-check the projection now
+            days = self.days_to_stockout(product_id, now)
+            if days > self.alert_days:
+                if entry[0] - now > self.alert_days * SECONDS_PER_DAY:
+                    break  # Every remaining entry is projected even later
+                continue
+            product = self.product_manager.products[product_id]
+            alerts.append(StockAlert(product_id, product.name, product.quantity,
+                                     self._decayed_rate(product_id, now), days))
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        alerts.sort(key=lambda a: a.days_to_stockout)
+        return alerts
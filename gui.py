@@ -1,16 +1,46 @@
 # gui.py
 
+import time
+import datetime
 import tkinter as tk
+from itertools import islice
 from tkinter import ttk, messagebox, scrolledtext
-from models import ShoppingCart, Product
+from models import ShoppingCart, Product, ORDER_STATUSES, STATUS_PLACED, STATUS_SHIPPED
+from cart_pricing import CartPricing
+from view_cache import ViewCache
+from events import PRODUCT_ADDED, PRODUCT_UPDATED, PRODUCT_DELETED, STOCK_CHANGED, ORDER_PLACED
 from exceptions import (
     ECommerceError,
     AuthenticationError,
     OutOfStockError,
     ProductNotFoundError,
-    InvalidInputError
+    InvalidInputError,
+    ConcurrentModificationError
 )
-from state_tax_rates import STATE_DISPLAY_LIST, STATE_CODES, get_tax_rate, get_state_name
+from state_tax_rates import STATE_DISPLAY_LIST, STATE_CODES, get_state_name
+from startup_timing import StartupTimer
+
+# Number of orders loaded per page in order lists
+ORDER_PAGE_SIZE = 50
+
+# Number of reviews loaded per page in the review window
+REVIEW_PAGE_SIZE = 20
+
+# Rows inserted into a product list per Tk event-loop turn
+TREE_CHUNK_SIZE = 200
+
+# How often due scheduled price changes are applied, in milliseconds
+PRICE_POLL_MS = 1000
+
+# Format of effective times typed into the pricing panel
+PRICE_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Sales trend windows: label -> (window length, bar width) in seconds
+TREND_WINDOWS = {
+    "Last hour (per minute)": (3600, 60),
+    "Last 24 hours (per hour)": (86400, 3600),
+    "Last 30 days (per day)": (30 * 86400, 86400),
+}
 
 # --- NEW: Review Window ---
 class ReviewWindow(tk.Toplevel):
@@ -19,9 +49,10 @@ class ReviewWindow(tk.Toplevel):
         super().__init__(parent)
         self.controller = controller
         self.product = product
+        self.review_cursor = None
         
         self.title(f"Reviews for {self.product.name}")
-        self.geometry("500x500")
+        self.geometry("500x560")
         
         main_frame = ttk.Frame(self, padding=10)
         main_frame.pack(fill="both", expand=True)
@@ -30,8 +61,20 @@ class ReviewWindow(tk.Toplevel):
         review_frame = ttk.LabelFrame(main_frame, text="Existing Reviews", padding=10)
         review_frame.pack(fill="both", expand=True, pady=5)
         
+        search_frame = ttk.Frame(review_frame)
+        search_frame.pack(fill="x", pady=(0, 5))
+        self.summary_label = ttk.Label(search_frame, text="")
+        self.summary_label.pack(side="left")
+        ttk.Button(search_frame, text="Show All", command=self.load_reviews).pack(side="right")
+        ttk.Button(search_frame, text="Search", command=self.search_reviews).pack(side="right", padx=5)
+        self.search_entry = ttk.Entry(search_frame, width=20)
+        self.search_entry.pack(side="right")
+        
         self.review_list = scrolledtext.ScrolledText(review_frame, height=15, wrap=tk.WORD, state="disabled")
         self.review_list.pack(fill="both", expand=True)
+        self.review_list.tag_config("bold", font=("Arial", 10, "bold"))
+        self.more_btn = ttk.Button(review_frame, text="Load More Reviews", command=self.load_more_reviews)
+        self.more_btn.pack(anchor="e", pady=(5, 0))
         
         # --- Add Review ---
         add_frame = ttk.LabelFrame(main_frame, text="Write Your Review", padding=10)
@@ -40,27 +83,67 @@ class ReviewWindow(tk.Toplevel):
         self.review_text = tk.Text(add_frame, height=5, wrap=tk.WORD)
         self.review_text.pack(fill="x", expand=True, pady=(0, 5))
         
+        ttk.Label(add_frame, text="Rating:").pack(side="left")
+        self.rating_combobox = ttk.Combobox(add_frame, values=["No rating", "1", "2", "3", "4", "5"], width=10, state="readonly")
+        self.rating_combobox.set("No rating")
+        self.rating_combobox.pack(side="left", padx=5)
         submit_btn = ttk.Button(add_frame, text="Submit Review", command=self.submit_review)
-        submit_btn.pack(anchor="e")
+        submit_btn.pack(side="right")
         
         self.load_reviews()
 
+    def _write_reviews(self, reviews):
+        self.review_list.config(state="normal")
+        for review in reviews:
+            stars = f" ({review.rating}/5)" if review.rating else ""
+            self.review_list.insert(tk.END, f"From: {review.username}{stars}\n", ("bold",))
+            self.review_list.insert(tk.END, f"{review.text}\n\n")
+        self.review_list.config(state="disabled")
+
     def load_reviews(self):
         self.review_list.config(state="normal")
         self.review_list.delete('1.0', tk.END)
+        self.review_list.config(state="disabled")
+        self.review_cursor = None
         try:
-            reviews = self.controller.product_manager.get_product_reviews(self.product.product_id)
-            if not reviews:
+            count, average = self.controller.product_manager.get_review_summary(self.product.product_id)
+            rating_text = f", average {average:.1f}/5" if average is not None else ""
+            self.summary_label.config(text=f"{count} review(s){rating_text}")
+            if count == 0:
+                self.review_list.config(state="normal")
                 self.review_list.insert(tk.END, "No reviews for this product yet.")
+                self.review_list.config(state="disabled")
+                self.more_btn.config(state="disabled")
             else:
-                for username, text in reviews:
-                    self.review_list.insert(tk.END, f"From: {username}\n", ("bold",))
-                    self.review_list.insert(tk.END, f"{text}\n\n")
+                self.load_more_reviews()
         except ProductNotFoundError as e:
+            self.review_list.config(state="normal")
             self.review_list.insert(tk.END, f"Error: {str(e)}")
-        
-        self.review_list.tag_config("bold", font=("Arial", 10, "bold"))
+            self.review_list.config(state="disabled")
+
+    def load_more_reviews(self):
+        try:
+            reviews, self.review_cursor = self.controller.product_manager.get_review_page(
+                self.product.product_id, self.review_cursor, REVIEW_PAGE_SIZE)
+            self._write_reviews(reviews)
+        except ProductNotFoundError as e:
+            messagebox.showerror("Error", str(e), parent=self)
+            self.review_cursor = None
+        self.more_btn.config(state="normal" if self.review_cursor is not None else "disabled")
+
+    def search_reviews(self):
+        query = self.search_entry.get().strip()
+        if not query:
+            self.load_reviews()
+            return
+        reviews = self.controller.product_manager.search_reviews(query, self.product.product_id)
+        self.review_list.config(state="normal")
+        self.review_list.delete('1.0', tk.END)
+        if not reviews:
+            self.review_list.insert(tk.END, f"No reviews mention '{query}'.")
         self.review_list.config(state="disabled")
+        self._write_reviews(reviews)
+        self.more_btn.config(state="disabled")
 
     def submit_review(self):
         review_text = self.review_text.get("1.0", tk.END).strip()
@@ -68,12 +151,15 @@ class ReviewWindow(tk.Toplevel):
             messagebox.showwarning("Empty Review", "Please write a review before submitting.", parent=self)
             return
         
+        rating = self.rating_combobox.get()
         try:
             username = self.controller.current_user.username
-            self.controller.product_manager.add_review_to_product(self.product.product_id, username, review_text)
+            self.controller.product_manager.add_review_to_product(
+                self.product.product_id, username, review_text, None if rating == "No rating" else int(rating))
             
             messagebox.showinfo("Review Submitted", "Thank you for your review!", parent=self)
             self.review_text.delete("1.0", tk.END)
+            self.rating_combobox.set("No rating")
             self.load_reviews()
         except (ProductNotFoundError, InvalidInputError) as e:
             messagebox.showerror("Error", str(e), parent=self)
@@ -81,7 +167,8 @@ class ReviewWindow(tk.Toplevel):
 
 class Application(tk.Tk):
     """Main application window that manages different frames."""
-    def __init__(self, user_manager, product_manager, order_manager):
+    def __init__(self, user_manager, product_manager, order_manager, forecaster=None, timer=None, rollups=None, audit_log=None,
+                 recommender=None, price_scheduler=None, sketches=None):
         super().__init__()
         self.title("E-Commerce Order and Inventory Manager")
         self.geometry("1000x700")
@@ -89,6 +176,15 @@ class Application(tk.Tk):
         self.user_manager = user_manager
         self.product_manager = product_manager
         self.order_manager = order_manager
+        self.forecaster = forecaster  # Optional ReplenishmentForecaster for low-stock alerts
+        self.rollups = rollups        # Optional SalesRollups for the sales trend dashboard
+        self.sketches = sketches      # Optional OrderSketches for approximate customer and order value figures
+        self.audit_log = audit_log    # Optional AuditLog; changes are attributed to the logged-in user
+        self.recommender = recommender  # Optional CoPurchaseIndex for "customers also bought" suggestions
+        self.price_scheduler = price_scheduler  # Optional PriceScheduler; due changes are applied while the app runs
+        self.failed_price_changes = []  # Scheduled changes that could not be applied, shown to admins
+        self.view_cache = ViewCache(product_manager)  # Rendered product rows and search results
+        self.timer = timer            # Optional StartupTimer; prints a breakdown once the UI is idle
         self.current_user = None
         self.cart = None
 
@@ -104,6 +200,24 @@ class Application(tk.Tk):
         login_frame.grid(row=0, column=0, sticky="nsew")
 
         self.show_frame(LoginFrame)
+        if self.timer is not None:
+            self.timer.mark("login window")
+            self.after_idle(self.report_timing)
+        if self.price_scheduler is not None:
+            self.after(PRICE_POLL_MS, self.apply_due_prices)
+
+    def apply_due_prices(self):
+        applied = self.price_scheduler.run_due()
+        failed = [change for change in applied if change.error is not None]
+        self.failed_price_changes.extend(failed)
+        if applied and self.current_user is not None:
+            self.frames[MainFrame].on_prices_applied(failed)
+        self.after(PRICE_POLL_MS, self.apply_due_prices)
+
+    def report_timing(self):
+        if self.timer is not None:
+            self.timer.mark("first draw")
+            print(self.timer.report())
 
     def show_frame(self, FrameClass):
         if FrameClass == MainFrame:
@@ -117,7 +231,14 @@ class Application(tk.Tk):
     def on_login_success(self, user):
         self.current_user = user
         self.cart = ShoppingCart(user.user_id)
+        if self.audit_log is not None:
+            self.audit_log.actor = user.user_id
+        if self.timer is not None:
+            self.timer = StartupTimer()  # Time login-to-interactive on its own
         self.show_frame(MainFrame)
+        if self.timer is not None:
+            self.timer.mark("main frame")
+            self.after_idle(self.report_timing)
 
 class LoginFrame(tk.Frame):
     """Login and registration screen."""
@@ -154,50 +275,95 @@ class MainFrame(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self.subscriptions = []  # Event bus subscriptions, dropped on logout
+        self.tab_builders = {}   # Tab frame name -> setup method, until the tab is first shown
+        self.tree_fills = {}     # Treeview -> pending chunked-fill callback ID
         
-        self.discount_applied = False
-        
-        notebook = ttk.Notebook(self)
-        notebook.pack(expand=True, fill="both", padx=10, pady=10)
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(expand=True, fill="both", padx=10, pady=10)
 
         if self.controller.current_user.role == 'admin':
-            self.create_admin_ui(notebook)
+            self.create_admin_ui(self.notebook)
         else:
-            self.create_customer_ui(notebook)
+            self.create_customer_ui(self.notebook)
+        # Tabs are built (and load their data) the first time they are selected
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.build_selected_tab())
+        self.build_selected_tab()
 
         logout_frame = ttk.Frame(self)
         logout_frame.pack(fill="x", padx=10, pady=(0, 10))
         ttk.Label(logout_frame, text=f"Logged in as: {self.controller.current_user.username} ({self.controller.current_user.role})").pack(side="left")
         ttk.Button(logout_frame, text="Logout", command=self.logout).pack(side="right")
 
+    def subscribe(self, handler, event_types):
+        """Subscribes a view to inventory/order events (no-op without an event bus)."""
+        event_bus = self.controller.product_manager.event_bus
+        if event_bus is not None:
+            # Tk is single-threaded, so deliver each event as it happens
+            self.subscriptions.append(event_bus.subscribe(handler, event_types, batch_size=1))
+
+    def add_tab(self, notebook, text, setup):
+        tab = ttk.Frame(notebook)
+        notebook.add(tab, text=text)
+        self.tab_builders[str(tab)] = (text, tab, setup)
+
+    def build_selected_tab(self):
+        entry = self.tab_builders.pop(self.notebook.select(), None)
+        if entry is None:
+            return
+        text, tab, setup = entry
+        setup(tab)
+        if self.controller.timer is not None:
+            self.controller.timer.mark(f"tab: {text}")
+
+    def fill_tree(self, tree, rows):
+        """Replaces a Treeview's rows, inserting them in chunks so long lists never block the UI."""
+        pending = self.tree_fills.pop(tree, None)
+        if pending is not None:
+            self.after_cancel(pending)
+        tree.delete(*tree.get_children())
+        rows = iter(rows)
+
+        def insert_chunk():
+            chunk = list(islice(rows, TREE_CHUNK_SIZE))
+            for values in chunk:
+                tree.insert("", "end", values=values)
+            if len(chunk) == TREE_CHUNK_SIZE:
+                self.tree_fills[tree] = self.after(1, insert_chunk)
+            else:
+                self.tree_fills.pop(tree, None)
+
+        insert_chunk()
+
     def logout(self):
+        event_bus = self.controller.product_manager.event_bus
+        for subscription in self.subscriptions:
+            event_bus.unsubscribe(subscription)
+        self.subscriptions = []
+        for pending in self.tree_fills.values():
+            self.after_cancel(pending)
+        self.tree_fills = {}
+        if getattr(self, "trend_redraw", None):
+            self.after_cancel(self.trend_redraw)
+        if getattr(self, "facet_redraw", None):
+            self.after_cancel(self.facet_redraw)
         self.controller.current_user = None
         self.controller.cart = None
+        if self.controller.audit_log is not None:
+            self.controller.audit_log.actor = None
         self.controller.show_frame(LoginFrame)
 
     # --- ADMIN UI CREATION ---
     def create_admin_ui(self, notebook):
-        product_tab = ttk.Frame(notebook)
-        orders_tab = ttk.Frame(notebook)
-        reports_tab = ttk.Frame(notebook)
-        notebook.add(product_tab, text="Product Management")
-        notebook.add(orders_tab, text="View All Orders")
-        notebook.add(reports_tab, text="System Reports")
-        self.setup_product_management_tab(product_tab)
-        self.setup_admin_orders_tab(orders_tab)
-        self.setup_reports_tab(reports_tab)
+        self.add_tab(notebook, "Product Management", self.setup_product_management_tab)
+        self.add_tab(notebook, "View All Orders", self.setup_admin_orders_tab)
+        self.add_tab(notebook, "System Reports", self.setup_reports_tab)
 
     # --- CUSTOMER UI CREATION ---
     def create_customer_ui(self, notebook):
-        browse_tab = ttk.Frame(notebook)
-        cart_tab = ttk.Frame(notebook)
-        history_tab = ttk.Frame(notebook)
-        notebook.add(browse_tab, text="Browse Products")
-        notebook.add(cart_tab, text="Shopping Cart")
-        notebook.add(history_tab, text="My Past Orders")
-        self.setup_browse_products_tab(browse_tab)
-        self.setup_cart_tab(cart_tab)
-        self.setup_order_history_tab(history_tab)
+        self.add_tab(notebook, "Browse Products", self.setup_browse_products_tab)
+        self.add_tab(notebook, "Shopping Cart", self.setup_cart_tab)
+        self.add_tab(notebook, "My Past Orders", self.setup_order_history_tab)
 
     # --- ADMIN TAB IMPLEMENTATIONS ---
     def setup_product_management_tab(self, tab):
@@ -206,6 +372,7 @@ class MainFrame(tk.Frame):
         form_frame.pack(fill="x", padx=10, pady=10)
         labels = ["ID", "Name", "Category", "Price", "Quantity"]
         self.product_entries = {}
+        self.editing = None  # (product_id, version, quantity) of the product loaded into the form
         for i, label in enumerate(labels):
             ttk.Label(form_frame, text=label).grid(row=i, column=0, sticky="w", padx=5, pady=2)
             entry = ttk.Entry(form_frame)
@@ -218,6 +385,7 @@ class MainFrame(tk.Frame):
         ttk.Button(btn_frame, text="Update Product", command=self.update_product).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Delete Product", command=self.delete_product).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Clear Form", command=self.clear_product_form).pack(side="left", padx=5)
+        self.setup_pricing_panel(tab)
         tree_frame = ttk.Frame(tab)
         tree_frame.pack(expand=True, fill="both", padx=10, pady=10)
         columns = ("id", "name", "category", "price", "quantity")
@@ -230,6 +398,109 @@ class MainFrame(tk.Frame):
         self.product_tree.bind("<<TreeviewSelect>>", self.on_product_select)
         self.refresh_product_list()
         
+    # --- NEW: Scheduled Pricing Panel ---
+    def setup_pricing_panel(self, tab):
+        pricing_frame = ttk.LabelFrame(tab, text="Pricing", padding=10)
+        pricing_frame.pack(fill="x", padx=10)
+        self.pricing_entries = {}
+        fields = (("price", "New Price"), ("category", "Category"), ("percent", "% Change"),
+                  ("effective", "Effective (YYYY-MM-DD HH:MM, blank = now)"))
+        for i, (key, label) in enumerate(fields):
+            ttk.Label(pricing_frame, text=label).grid(row=0, column=i, sticky="w", padx=5)
+            entry = ttk.Entry(pricing_frame, width=40 if key == "effective" else 12)
+            entry.grid(row=1, column=i, sticky="w", padx=5, pady=2)
+            self.pricing_entries[key] = entry
+        btn_frame = ttk.Frame(pricing_frame)
+        btn_frame.grid(row=2, column=0, columnspan=len(fields), sticky="w", pady=5)
+        ttk.Button(btn_frame, text="Set Price for Selected", command=self.schedule_selected_price).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Reprice Category", command=self.reprice_category).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Price History", command=self.show_price_history).pack(side="left", padx=5)
+        self.pending_prices_label = ttk.Label(pricing_frame, text="")
+        self.pending_prices_label.grid(row=3, column=0, columnspan=len(fields), sticky="w", padx=5)
+        self.refresh_pending_prices()
+
+    def selected_product_id(self):
+        selected_item = self.product_tree.focus()
+        if not selected_item:
+            messagebox.showwarning("Selection Error", "Please select a product.")
+            return None
+        return str(self.product_tree.item(selected_item)['values'][0])
+
+    def pricing_effective_time(self):
+        """The typed effective time, None for now; raises ValueError if it cannot be parsed."""
+        text = self.pricing_entries["effective"].get().strip()
+        if text and self.controller.price_scheduler is None:
+            raise InvalidInputError("Scheduled price changes are not enabled; leave the effective time blank.")
+        return datetime.datetime.strptime(text, PRICE_TIME_FORMAT) if text else None
+
+    def schedule_selected_price(self):
+        if not (pid := self.selected_product_id()): return
+        pm = self.controller.product_manager
+        try:
+            effective = self.pricing_effective_time()
+            price = self.pricing_entries["price"].get()
+            if effective is None:
+                product = pm.get_product(pid)
+                pm.update_product(pid, product.name, product.category, price)
+                self.refresh_product_list()
+                messagebox.showinfo("Success", f"Price of '{pid}' updated.")
+            else:
+                self.controller.price_scheduler.schedule_price(pid, price, effective)
+                messagebox.showinfo("Success", f"Price of '{pid}' will change at {effective.strftime(PRICE_TIME_FORMAT)}.")
+            self.refresh_pending_prices()
+        except ValueError:
+            messagebox.showerror("Validation Error", "Effective time must look like 2025-12-01 09:00.")
+        except (ProductNotFoundError, InvalidInputError) as e:
+            messagebox.showerror("Error", str(e))
+
+    def reprice_category(self):
+        category = self.pricing_entries["category"].get()
+        try:
+            effective = self.pricing_effective_time()
+            percent = self.pricing_entries["percent"].get()
+            if effective is None:
+                count = self.controller.product_manager.reprice_category(category, percent)
+                self.refresh_product_list()
+                messagebox.showinfo("Success", f"Repriced {count} product(s) in '{category}'.")
+            else:
+                self.controller.price_scheduler.schedule_reprice(category, percent, effective)
+                messagebox.showinfo("Success", f"'{category}' will be repriced at {effective.strftime(PRICE_TIME_FORMAT)}.")
+            self.refresh_pending_prices()
+        except ValueError:
+            messagebox.showerror("Validation Error", "Effective time must look like 2025-12-01 09:00.")
+        except InvalidInputError as e:
+            messagebox.showerror("Error", str(e))
+
+    def show_price_history(self):
+        if not (pid := self.selected_product_id()): return
+        lines = [f"{when.strftime(PRICE_TIME_FORMAT)}  ${price:.2f}"
+                 for when, price in self.controller.product_manager.price_history.history(pid)]
+        if self.controller.price_scheduler is not None:
+            lines += [f"Scheduled {change.describe()}" for change in self.controller.price_scheduler.pending(pid)]
+        messagebox.showinfo(f"Price History: {pid}", "\n".join(lines) or "No prices recorded.")
+
+    def refresh_pending_prices(self):
+        scheduler = self.controller.price_scheduler
+        pending = scheduler.pending() if scheduler is not None else []
+        text = "Scheduled: " + "; ".join(change.describe() for change in pending[:5]) if pending else "No scheduled price changes."
+        if len(pending) > 5:
+            text += f" (+{len(pending) - 5} more)"
+        failed = self.controller.failed_price_changes[-3:]
+        if failed:
+            text += "\nFailed: " + "; ".join(f"{change.describe()} ({change.error})" for change in failed)
+        self.pending_prices_label.config(text=text, foreground="red" if failed else "")
+
+    def on_prices_applied(self, failed):
+        # Customer views follow the PRODUCT_UPDATED events; the admin list is refreshed here
+        if self.controller.current_user.role != 'admin':
+            return
+        if getattr(self, "pending_prices_label", None) is not None:
+            self.refresh_product_list()
+            self.refresh_pending_prices()
+        if failed:
+            messagebox.showwarning("Scheduled Price Change Failed",
+                                   "\n".join(f"{change.describe()}: {change.error}" for change in failed))
+
     def setup_admin_orders_tab(self, tab):
         tree_frame = ttk.Frame(tab)
         tree_frame.pack(expand=True, fill="both", padx=10, pady=10)
@@ -252,16 +523,19 @@ class MainFrame(tk.Frame):
         status_frame.pack(fill="x", padx=10, pady=5)
         ttk.Label(status_frame, text="Update Status for Selected Order:").pack(side="left")
         self.order_status_var = tk.StringVar()
-        status_menu = ttk.Combobox(status_frame, textvariable=self.order_status_var, values=["Placed", "Shipped", "Delivered"], state="readonly")
+        status_menu = ttk.Combobox(status_frame, textvariable=self.order_status_var, values=[s for s in ORDER_STATUSES if s != STATUS_PLACED], state="readonly")
         status_menu.pack(side="left", padx=10)
-        status_menu.set("Shipped")
-        ttk.Button(status_frame, text="Update Status", command=self.update_order_status).pack(side="left")
+        status_menu.set(STATUS_SHIPPED)
+        ttk.Button(status_frame, text="Update Selected Orders", command=self.update_order_status).pack(side="left")
         ttk.Button(status_frame, text="Refresh List", command=self.refresh_admin_orders_list).pack(side="left", padx=10)
+        self.admin_orders_more_btn = ttk.Button(status_frame, text="Load Older Orders", command=self.load_more_admin_orders)
+        self.admin_orders_more_btn.pack(side="left")
         
         self.refresh_admin_orders_list()
 
     def setup_reports_tab(self, tab):
-        # (Unchanged from previous version)
+        if self.controller.rollups is not None:
+            self.setup_sales_trend(tab)
         report_frame = ttk.LabelFrame(tab, text="Summary Reports", padding=20)
         report_frame.pack(fill="both", expand=True, padx=10, pady=10)
         self.total_revenue_label = ttk.Label(report_frame, text="Total Revenue: ", font=("Arial", 12))
@@ -270,12 +544,65 @@ class MainFrame(tk.Frame):
         self.total_orders_label.pack(anchor="w", pady=5)
         self.most_ordered_label = ttk.Label(report_frame, text="Most Ordered Product: ", font=("Arial", 12))
         self.most_ordered_label.pack(anchor="w", pady=5)
+        if self.controller.sketches is not None:
+            self.sketch_label = ttk.Label(report_frame, text="", font=("Arial", 12))
+            self.sketch_label.pack(anchor="w", pady=5)
         self.out_of_stock_label = ttk.Label(report_frame, text="Out of Stock Products:", font=("Arial", 12))
         self.out_of_stock_label.pack(anchor="w", pady=15)
         self.out_of_stock_listbox = tk.Listbox(report_frame, height=10)
         self.out_of_stock_listbox.pack(fill="x", anchor="w")
+        if self.controller.forecaster is not None:
+            ttk.Label(report_frame, text="Low Stock Alerts (projected days to stock-out):", font=("Arial", 12)).pack(anchor="w", pady=(15, 5))
+            self.low_stock_listbox = tk.Listbox(report_frame, height=6)
+            self.low_stock_listbox.pack(fill="x", anchor="w")
         ttk.Button(report_frame, text="Generate/Refresh Report", command=self.generate_reports).pack(pady=20)
         self.generate_reports()
+        # Keep the out-of-stock list current without rescanning the catalog
+        self.subscribe(self.on_inventory_events, [PRODUCT_ADDED, PRODUCT_UPDATED, PRODUCT_DELETED, STOCK_CHANGED])
+
+    def setup_sales_trend(self, tab):
+        trend_frame = ttk.LabelFrame(tab, text="Sales Trend", padding=10)
+        trend_frame.pack(side="right", fill="both", expand=True, padx=10, pady=10)
+        self.trend_window = tk.StringVar(value=next(iter(TREND_WINDOWS)))
+        window_box = ttk.Combobox(trend_frame, textvariable=self.trend_window, values=list(TREND_WINDOWS), state="readonly", width=28)
+        window_box.pack(anchor="w")
+        window_box.bind("<<ComboboxSelected>>", lambda e: self.draw_sales_trend())
+        self.trend_canvas = tk.Canvas(trend_frame, height=220, background="white")
+        self.trend_canvas.pack(fill="x", pady=10)
+        self.trend_canvas.bind("<Configure>", lambda e: self.draw_sales_trend())
+        self.trend_summary_label = ttk.Label(trend_frame, text="", justify="left")
+        self.trend_summary_label.pack(anchor="w")
+        self.trend_redraw = None
+        self.subscribe(self.on_order_events, [ORDER_PLACED])
+
+    def on_order_events(self, events):
+        # Redraw once per burst of orders rather than once per order
+        if self.trend_redraw is None:
+            self.trend_redraw = self.after(250, self.draw_sales_trend)
+
+    def draw_sales_trend(self):
+        self.trend_redraw = None
+        rollups = self.controller.rollups
+        length, width = TREND_WINDOWS[self.trend_window.get()]
+        end = time.time()
+        start = end - length + width
+        series = rollups.series(start, end, width)
+        canvas = self.trend_canvas
+        canvas.delete("all")
+        chart_width, chart_height = max(canvas.winfo_width(), 100), max(canvas.winfo_height(), 100)
+        peak = max((totals.revenue for _, totals in series), default=0) or 1.0
+        bar = chart_width / max(len(series), 1)
+        for i, (_, totals) in enumerate(series):
+            top = chart_height - 15 - (chart_height - 30) * totals.revenue / peak
+            canvas.create_rectangle(i * bar + 1, top, (i + 1) * bar - 1, chart_height - 15, fill="steelblue", outline="")
+        canvas.create_text(4, 4, anchor="nw", text=f"Peak ${peak:.2f}" if peak > 1.0 else "No sales")
+
+        window = rollups.totals(start - start % width, end)
+        categories = ", ".join(f"{name} (${t.revenue:.2f})" for name, t in rollups.top("category", start - start % width, end, 3))
+        states = ", ".join(f"{code} ({t.orders})" for code, t in rollups.top("state", start - start % width, end, 3, by="orders"))
+        self.trend_summary_label.config(text=f"Revenue: ${window.revenue:.2f}   Orders: {window.orders}   "
+                                             f"Units: {window.units}   Tax: ${window.tax:.2f}\n"
+                                             f"Top categories: {categories or 'None'}\nTop states: {states or 'None'}")
 
     # --- CUSTOMER TAB IMPLEMENTATIONS ---
     def setup_browse_products_tab(self, tab):
@@ -290,6 +617,25 @@ class MainFrame(tk.Frame):
 
         tree_frame = ttk.Frame(tab)
         tree_frame.pack(expand=True, fill="both", padx=10, pady=10)
+
+        # --- NEW: Facet filters with live counts ---
+        facet_frame = ttk.Frame(tree_frame)
+        facet_frame.pack(side="left", fill="y", padx=(0, 10))
+        self.facet_lists = {}
+        self.facet_values = {}
+        for facet, title in (("category", "Category"), ("price", "Price"), ("stock", "Availability")):
+            box_frame = ttk.LabelFrame(facet_frame, text=title, padding=5)
+            box_frame.pack(fill="x", pady=(0, 5))
+            listbox = tk.Listbox(box_frame, selectmode="multiple", exportselection=False, height=5, width=24)
+            listbox.pack(fill="x")
+            listbox.bind("<<ListboxSelect>>", lambda e: self.on_facet_changed())
+            self.facet_lists[facet] = listbox
+            self.facet_values[facet] = []
+        ttk.Button(facet_frame, text="Clear Filters", command=self.clear_facets).pack(fill="x")
+        self.facet_redraw = None
+        self.browse_base_ids = None
+        self.subscribe(self.on_catalog_events, [PRODUCT_ADDED, PRODUCT_UPDATED, PRODUCT_DELETED, STOCK_CHANGED])
+
         columns = ("id", "name", "category", "price", "quantity")
         self.customer_product_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
         for col in columns: self.customer_product_tree.heading(col, text=col.title())
@@ -303,7 +649,17 @@ class MainFrame(tk.Frame):
         btn_frame.pack(fill="x", padx=10, pady=5)
         ttk.Button(btn_frame, text="Add Selected Item to Cart", command=self.add_to_cart).pack(side="left", padx=10)
         ttk.Button(btn_frame, text="View/Add Reviews for Selected", command=self.open_review_window).pack(side="left")
+
+        # --- NEW: Frequently bought together ---
+        self.also_bought_list = None
+        if self.controller.recommender is not None:
+            also_frame = ttk.LabelFrame(tab, text="Customers Also Bought", padding=5)
+            also_frame.pack(fill="x", padx=10, pady=5)
+            self.also_bought_list = tk.Listbox(also_frame, height=4)
+            self.also_bought_list.pack(fill="x")
+            self.customer_product_tree.bind("<<TreeviewSelect>>", lambda e: self.show_also_bought())
         
+        self.refresh_facets()
         self.customer_refresh_product_list()
 
     def setup_cart_tab(self, tab):
@@ -323,7 +679,7 @@ class MainFrame(tk.Frame):
         self.state_combobox.pack(side="left", padx=5)
         self.state_combobox.set("Select State")
         # Bind state selection to update tax calculation
-        self.state_combobox.bind("<<ComboboxSelected>>", lambda e: self.refresh_cart_view())
+        self.state_combobox.bind("<<ComboboxSelected>>", lambda e: self.on_state_selected())
         
         # State tax info label
         self.state_tax_label = ttk.Label(state_frame, text="", foreground="blue")
@@ -351,13 +707,28 @@ class MainFrame(tk.Frame):
         btn_frame.pack(pady=10)
         ttk.Button(btn_frame, text="Place Order", command=self.place_order).pack(side="left", padx=10)
         ttk.Button(btn_frame, text="Remove Selected Item", command=self.remove_from_cart).pack(side="left", padx=10)
+
+        # --- NEW: Suggestions from items bought with the cart's contents ---
+        self.cart_suggestions_list = None
+        if self.controller.recommender is not None:
+            suggest_frame = ttk.LabelFrame(tab, text="Suggested for Your Cart", padding=5)
+            suggest_frame.pack(fill="x", padx=10, pady=5)
+            self.cart_suggestions_list = tk.Listbox(suggest_frame, height=4)
+            self.cart_suggestions_list.pack(fill="x")
         
-        tab.bind("<Visibility>", lambda e: self.refresh_cart_view())
+        # Cart rows and totals are updated incrementally from pricing events
+        self.cart_pricing = CartPricing(self.controller.cart, self.controller.order_manager)
+        self.cart_pricing.subscribe(self.on_cart_pricing_event)
+        # Re-pricing the cart emits row and totals events for any line whose price changed
+        self.subscribe(lambda events: self.cart_pricing.totals(), [PRODUCT_UPDATED])
+        self.refresh_cart_view()
 
     def setup_order_history_tab(self, tab):
         top_frame = ttk.Frame(tab)
         top_frame.pack(fill="x", padx=10, pady=5)
-        ttk.Button(top_frame, text="Refresh Order Statuses", command=self.refresh_order_history).pack(anchor="e")
+        ttk.Button(top_frame, text="Refresh Order Statuses", command=self.refresh_order_history).pack(side="right")
+        self.history_more_btn = ttk.Button(top_frame, text="Load Older Orders", command=self.load_more_order_history)
+        self.history_more_btn.pack(side="right", padx=10)
 
         history_frame = ttk.LabelFrame(tab, text="My Order History", padding=10)
         history_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -376,21 +747,24 @@ class MainFrame(tk.Frame):
     
     # --- LOGIC METHODS (ADMIN) ---
     def refresh_product_list(self):
-        self.product_tree.delete(*self.product_tree.get_children())
-        for p in self.controller.product_manager.get_all_products():
-            self.product_tree.insert("", "end", values=(p.product_id, p.name, p.category, f"{p.price:.2f}", p.quantity))
+        cache = self.controller.view_cache
+        self.fill_tree(self.product_tree, cache.iter_rows(cache.all_product_ids()))
 
     def on_product_select(self, event):
         selected_item = self.product_tree.focus()
         if not selected_item: return
-        values = self.product_tree.item(selected_item)['values']
-        self.product_entries['id'].delete(0, tk.END); self.product_entries['id'].insert(0, values[0])
-        self.product_entries['name'].delete(0, tk.END); self.product_entries['name'].insert(0, values[1])
-        self.product_entries['category'].delete(0, tk.END); self.product_entries['category'].insert(0, values[2])
-        self.product_entries['price'].delete(0, tk.END); self.product_entries['price'].insert(0, values[3])
-        self.product_entries['quantity'].delete(0, tk.END); self.product_entries['quantity'].insert(0, values[4])
+        product = self.controller.product_manager.products.get(str(self.product_tree.item(selected_item)['values'][0]))
+        if product: self.load_product_form(product)
+
+    def load_product_form(self, product):
+        # Remember what the admin started from, for conflict detection and stock deltas
+        self.editing = (product.product_id, product.details_version, product.quantity)
+        values = (product.product_id, product.name, product.category, f"{product.price:.2f}", product.quantity)
+        for key, value in zip(("id", "name", "category", "price", "quantity"), values):
+            self.product_entries[key].delete(0, tk.END); self.product_entries[key].insert(0, value)
 
     def clear_product_form(self):
+        self.editing = None
         for entry in self.product_entries.values(): entry.delete(0, tk.END)
 
     def validate_product_inputs(self):
@@ -416,11 +790,34 @@ class MainFrame(tk.Frame):
 
     def update_product(self):
         if not (data := self.validate_product_inputs()): return
+        pid, name, category, price, quantity = data
+        pm = self.controller.product_manager
+        editing = self.editing
         try:
-            self.controller.product_manager.update_product(*data)
+            if editing and editing[0] == pid:
+                # Details are only saved if nobody else edited them, while stock moves by the
+                # difference the admin made, so orders placed while the form was open neither
+                # block the save nor get overwritten. Both writes happen under the stock lock,
+                # with the stock change checked first, so either both are saved or neither is
+                delta = quantity - editing[2]
+                with pm._lock:
+                    product = pm.get_product(pid)
+                    if product.quantity + delta < 0:
+                        raise InvalidInputError(f"Cannot remove {-delta} of '{product.name}'; only {product.quantity} in stock.")
+                    pm.update_product(pid, name, category, price, expected_details_version=editing[1])
+                    if delta:
+                        pm.adjust_stock(pid, delta, reason="update")
+            else:
+                pm.update_product(pid, name, category, price, quantity)
             self.refresh_product_list(); self.clear_product_form()
-            messagebox.showinfo("Success", f"Product '{data[0]}' updated.")
+            messagebox.showinfo("Success", f"Product '{pid}' updated.")
+        except ConcurrentModificationError:
+            self.load_product_form(pm.products[pid])
+            messagebox.showerror("Product Changed", f"Product '{pid}' was changed while you were editing it.\n"
+                                                    "The form now shows the latest values; please re-apply your changes.")
         except (ProductNotFoundError, InvalidInputError) as e: 
+            if editing and pid in pm.products and pm.products[pid].details_version != editing[1]:
+                self.load_product_form(pm.products[pid])  # Edit from the saved version next time
             messagebox.showerror("Error", str(e))
 
     def delete_product(self):
@@ -438,43 +835,130 @@ class MainFrame(tk.Frame):
     
     def refresh_admin_orders_list(self):
         self.admin_orders_tree.delete(*self.admin_orders_tree.get_children())
-        for o in self.controller.order_manager.get_all_orders():
+        self.admin_orders_cursor = None
+        self.load_more_admin_orders()
+
+    def load_more_admin_orders(self):
+        orders, self.admin_orders_cursor = self.controller.order_manager.get_orders_page(
+            cursor=self.admin_orders_cursor, limit=ORDER_PAGE_SIZE)
+        for o in orders:
             self.admin_orders_tree.insert("", "end", values=(
                 o.order_id, o.customer_id, f"${o.total_price:.2f}", f"${o.tax:.2f}",
                 o.state_code, o.address, o.timestamp.strftime('%Y-%m-%d %H:%M'), o.status
             ))
+        self.admin_orders_more_btn.config(state="normal" if self.admin_orders_cursor else "disabled")
 
     def update_order_status(self):
-        if not (sel := self.admin_orders_tree.focus()):
-            messagebox.showwarning("Selection Error", "Please select an order.")
+        if not (selection := self.admin_orders_tree.selection()):
+            messagebox.showwarning("Selection Error", "Please select one or more orders.")
             return
-        order_id = self.admin_orders_tree.item(sel)['values'][0]
         new_status = self.order_status_var.get()
-        try:
-            self.controller.order_manager.update_order_status(order_id, new_status)
-            messagebox.showinfo("Success", f"Order {order_id} status updated.")
-            self.refresh_admin_orders_list()
-        except ProductNotFoundError as e: 
-            messagebox.showerror("Error", str(e))
+        updates = [(self.admin_orders_tree.item(row)['values'][0], new_status) for row in selection]
+        results = self.controller.order_manager.update_order_statuses(updates)
+        # Update the changed rows in place instead of reloading the list
+        for row, result in zip(selection, results):
+            if result.success:
+                self.admin_orders_tree.set(row, "status", result.order.status)
+        if failed := [r for r in results if not r.success]:
+            details = "\n".join(str(r.error) for r in failed[:10])
+            more = f"\n...and {len(failed) - 10} more" if len(failed) > 10 else ""
+            messagebox.showerror("Some Updates Failed", f"{len(results) - len(failed)} updated, {len(failed)} rejected:\n{details}{more}")
+        else:
+            messagebox.showinfo("Success", f"{len(results)} order(s) updated to {new_status}.")
             
     def generate_reports(self):
         om = self.controller.order_manager; pm = self.controller.product_manager
         self.total_revenue_label.config(text=f"Total Revenue: ${om.get_total_revenue():.2f}")
         self.total_orders_label.config(text=f"Total Orders Placed: {om.get_total_orders_placed()}")
         self.most_ordered_label.config(text=f"Most Ordered Product: {om.get_most_frequently_ordered_product()}")
+        self.out_of_stock = {p.product_id: p.name for p in pm.get_out_of_stock_products()}
+        self.render_out_of_stock_list()
+        if (sketches := self.controller.sketches) is not None:
+            if sketches.orders:
+                self.sketch_label.config(text=f"Distinct Customers: ~{sketches.distinct_customers()}   "
+                                              f"Order Value p50/p90: ${sketches.order_value_percentile(50):.2f} / "
+                                              f"${sketches.order_value_percentile(90):.2f} (approximate)")
+            else:
+                self.sketch_label.config(text="Distinct Customers: 0")
+        if self.controller.forecaster is not None:
+            self.low_stock_listbox.delete(0, tk.END)
+            if not (alerts := self.controller.forecaster.get_alerts()): self.low_stock_listbox.insert(tk.END, "None")
+            else: [self.low_stock_listbox.insert(tk.END, f"{a.name} (ID: {a.product_id}): {a.quantity} left, ~{a.days_to_stockout:.1f} days at {a.velocity:.1f}/day") for a in alerts]
+
+    def render_out_of_stock_list(self):
         self.out_of_stock_listbox.delete(0, tk.END)
-        if not (out_of_stock := pm.get_out_of_stock_products()): self.out_of_stock_listbox.insert(tk.END, "None")
-        else: [self.out_of_stock_listbox.insert(tk.END, f"{p.name} (ID: {p.product_id})") for p in out_of_stock]
+        if not self.out_of_stock: self.out_of_stock_listbox.insert(tk.END, "None")
+        else: [self.out_of_stock_listbox.insert(tk.END, f"{name} (ID: {pid})") for pid, name in self.out_of_stock.items()]
+
+    def on_inventory_events(self, events):
+        changed = False
+        for event in events:
+            pid = event.data["product_id"]
+            product = self.controller.product_manager.products.get(pid)
+            if product is not None and product.quantity == 0:
+                if self.out_of_stock.get(pid) != product.name:
+                    self.out_of_stock[pid] = product.name
+                    changed = True
+            elif self.out_of_stock.pop(pid, None) is not None:
+                changed = True
+        if changed:
+            self.render_out_of_stock_list()
 
     # --- LOGIC METHODS (CUSTOMER) ---
-    def customer_refresh_product_list(self, products=None):
-        self.customer_product_tree.delete(*self.customer_product_tree.get_children())
-        product_list = products if products is not None else self.controller.product_manager.get_all_products()
-        for p in product_list: self.customer_product_tree.insert("", "end", values=(p.product_id, p.name, p.category, f"{p.price:.2f}", p.quantity))
+    def customer_refresh_product_list(self, product_ids=None):
+        cache = self.controller.view_cache
+        facets = self.controller.product_manager.facets
+        self.browse_base_ids = product_ids
+        selected = self.facet_selection()
+        if not selected:
+            ids = product_ids if product_ids is not None else cache.all_product_ids()
+        elif product_ids is None:
+            ids = facets.product_ids(selected)
+        else:
+            matching = facets.matching(selected)
+            ids = [pid for pid in product_ids if facets.contains(matching, pid)]
+        self.fill_tree(self.customer_product_tree, cache.iter_rows(ids))
+
+    # --- NEW: Faceted Browsing ---
+    def facet_selection(self):
+        """{facet: set of selected values}, omitting facets with nothing selected."""
+        selection = {}
+        for facet, listbox in self.facet_lists.items():
+            chosen = {self.facet_values[facet][i] for i in listbox.curselection()}
+            if chosen:
+                selection[facet] = chosen
+        return selection
+
+    def refresh_facets(self):
+        self.facet_redraw = None
+        selected = self.facet_selection()
+        counts = self.controller.product_manager.facets.counts(selected)
+        for facet, listbox in self.facet_lists.items():
+            values = list(counts[facet])
+            listbox.delete(0, tk.END)
+            for i, value in enumerate(values):
+                listbox.insert(tk.END, f"{value} ({counts[facet][value]})")
+                if value in selected.get(facet, ()):
+                    listbox.selection_set(i)
+            self.facet_values[facet] = values
+
+    def on_facet_changed(self):
+        self.refresh_facets()
+        self.customer_refresh_product_list(self.browse_base_ids)
+
+    def clear_facets(self):
+        for listbox in self.facet_lists.values():
+            listbox.selection_clear(0, tk.END)
+        self.on_facet_changed()
+
+    def on_catalog_events(self, events):
+        # Recount once per burst of changes (e.g. a batch of orders) rather than once per event
+        if self.facet_redraw is None:
+            self.facet_redraw = self.after(250, self.refresh_facets)
 
-    def customer_search_products(self): self.customer_refresh_product_list(self.controller.product_manager.search_product_by_name(self.search_entry.get()))
+    def customer_search_products(self): self.customer_refresh_product_list(self.controller.view_cache.search_ids(self.search_entry.get()))
             
-    def sort_products_by_price(self): self.customer_refresh_product_list(self.controller.product_manager.get_products_sorted_by_price())
+    def sort_products_by_price(self): self.customer_refresh_product_list(self.controller.view_cache.sorted_by_price_ids())
 
     def add_to_cart(self):
         if not (sel := self.customer_product_tree.focus()): 
@@ -510,75 +994,86 @@ class MainFrame(tk.Frame):
         
     def refresh_cart_view(self):
         self.cart_tree.delete(*self.cart_tree.get_children())
-        subtotal = 0
         try:
-            for pid, qty in self.controller.cart.items.items():
-                # Use dict access to avoid raising exception
-                p = self.controller.product_manager.products.get(pid)
-                if p:
-                    item_total = p.price * qty
-                    subtotal += item_total
-                    self.cart_tree.insert("", "end", values=(pid, p.name, f"{p.price:.2f}", qty, f"{item_total:.2f}"))
-            
-            # Calculate totals
-            discount_amount = 0.0
-            discount_text = ""
-            if self.discount_applied:
-                discount_amount = subtotal * 0.10
-                discount_text = f"\nDiscount (10%): -${discount_amount:.2f}"
-                
-            discounted_subtotal = subtotal - discount_amount
-            
-            # Get selected state code
-            state_selection = self.state_combobox.get()
-            state_code = None
-            tax_rate_pct = 0.0
-            
-            if state_selection and state_selection != "Select State":
-                # Extract state code from selection (format: "AL - Alabama")
-                state_code = state_selection.split(" - ")[0]
-                tax_rate_pct = get_tax_rate(state_code) * 100
-                
-                # Update state tax info label
-                self.state_tax_label.config(text=f"(Tax Rate: {tax_rate_pct:.2f}%)")
-            else:
-                self.state_tax_label.config(text="")
-            
-            # Calculate tax using state code
-            try:
-                if state_code:
-                    tax, final_total = self.controller.order_manager.calculate_order_totals(discounted_subtotal, state_code)
-                else:
-                    tax = 0.0
-                    final_total = discounted_subtotal
-            except InvalidInputError:
-                # Invalid state code, no tax
-                tax = 0.0
-                final_total = discounted_subtotal
-            
-            self.total_price_label.config(text=f"Subtotal: ${subtotal:.2f}"
-                                               f"{discount_text}"
-                                               f"\nTax: +${tax:.2f}"
-                                               f"\nTotal: ${final_total:.2f}")
+            for pid in self.controller.cart.items:
+                self.update_cart_row(pid)
+            self.update_cart_totals(self.cart_pricing.totals())
+            self.show_cart_suggestions()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to refresh cart: {str(e)}")
 
+    def on_cart_pricing_event(self, event, payload):
+        if event == "row":
+            self.update_cart_row(payload)
+        elif event == "row_removed":
+            if self.cart_tree.exists(payload): self.cart_tree.delete(payload)
+        elif event == "cleared":
+            self.cart_tree.delete(*self.cart_tree.get_children())
+        elif event == "totals":
+            self.update_cart_totals(payload)
+            self.show_cart_suggestions()
+
+    def _fill_suggestions(self, listbox, product_ids):
+        listbox.delete(0, tk.END)
+        for product_id in product_ids:
+            row = self.controller.view_cache.row(product_id)
+            if row:
+                listbox.insert(tk.END, f"{row[1]} (${row[3]}) [{product_id}]")
+        if not listbox.size():
+            listbox.insert(tk.END, "No suggestions yet.")
+
+    def show_also_bought(self):
+        if self.also_bought_list is None or not (sel := self.customer_product_tree.focus()):
+            return
+        product_id = self.customer_product_tree.item(sel)['values'][0]
+        self._fill_suggestions(self.also_bought_list, self.controller.recommender.recommend(product_id))
+
+    def show_cart_suggestions(self):
+        if self.cart_suggestions_list is None:
+            return
+        self._fill_suggestions(self.cart_suggestions_list,
+                               self.controller.recommender.recommend_for_cart(list(self.controller.cart.items)))
+
+    def update_cart_row(self, pid):
+        cart = self.controller.cart
+        row = self.controller.view_cache.row(pid)
+        name = row[1] if row else "(unavailable)"
+        values = (pid, name, f"{cart.unit_prices[pid]:.2f}", cart.items[pid], f"{cart.line_total(pid):.2f}")
+        if self.cart_tree.exists(pid):
+            self.cart_tree.item(pid, values=values)
+        else:
+            self.cart_tree.insert("", "end", iid=pid, values=values)
+
+    def update_cart_totals(self, totals):
+        if totals.state_code:
+            self.state_tax_label.config(text=f"(Tax Rate: {totals.tax_rate * 100:.2f}%)")
+        else:
+            self.state_tax_label.config(text="")
+        discount_text = "".join(f"\n{name}: -${amount:.2f}" for _, name, amount in totals.applied)
+        self.total_price_label.config(text=f"Subtotal: ${totals.subtotal:.2f}"
+                                           f"{discount_text}"
+                                           f"\nTax: +${totals.tax:.2f}"
+                                           f"\nTotal: ${totals.total:.2f}")
+
+    def on_state_selected(self):
+        state_selection = self.state_combobox.get()
+        # Extract state code from selection (format: "AL - Alabama")
+        state_code = state_selection.split(" - ")[0] if state_selection != "Select State" else None
+        try:
+            self.cart_pricing.set_state(state_code)
+        except InvalidInputError as e:
+            messagebox.showerror("Invalid State", str(e))
+
     def remove_from_cart(self):
         if not (sel := self.cart_tree.focus()): messagebox.showwarning("Selection Error", "Please select an item."); return
-        self.controller.cart.remove_item(self.cart_tree.item(sel)['values'][0]); self.refresh_cart_view()
+        self.controller.cart.remove_item(sel)
 
     def apply_discount(self):
-        code = self.discount_entry.get()
-        if code == "DISCOUNT10":
-            if not self.discount_applied:
-                self.discount_applied = True
-                messagebox.showinfo("Discount", "10% discount applied!")
-                self.refresh_cart_view()
-            else:
-                messagebox.showwarning("Discount", "Discount already applied.")
-        else:
-            messagebox.showerror("Error", "Invalid discount code.")
-        self.refresh_cart_view()
+        try:
+            promotion = self.cart_pricing.apply_code(self.discount_entry.get())
+            messagebox.showinfo("Discount", f"'{promotion.name}' applied!")
+        except InvalidInputError as e:
+            messagebox.showerror("Discount", str(e))
 
     # UPDATED: Handles state, address, tax, and final confirmation
     def place_order(self):
@@ -603,40 +1098,27 @@ class MainFrame(tk.Frame):
             return
 
         # --- Calculate final totals ---
-        subtotal = 0
         try:
-            for pid, qty in self.controller.cart.items.items():
-                p = self.controller.product_manager.products.get(pid)
-                if p:
-                    subtotal += p.price * qty
-            
-            discounted_subtotal = subtotal * 0.90 if self.discount_applied else subtotal
-            tax, final_total = self.controller.order_manager.calculate_order_totals(discounted_subtotal, state_code)
-            
-            # Get tax rate for display
-            tax_rate_pct = get_tax_rate(state_code) * 100
+            self.cart_pricing.set_state(state_code)
+            totals = self.cart_pricing.totals()
             
             # --- Confirmation ---
             if not messagebox.askyesno("Confirm Order", 
                                        f"Please confirm your order:\n\n"
-                                       f"Subtotal: ${discounted_subtotal:.2f}\n"
-                                       f"Tax ({state_code} - {tax_rate_pct:.2f}%): ${tax:.2f}\n"
-                                       f"Total: ${final_total:.2f}\n\n"
+                                       f"Subtotal: ${totals.discounted_subtotal:.2f}\n"
+                                       f"Tax ({state_code} - {totals.tax_rate * 100:.2f}%): ${totals.tax:.2f}\n"
+                                       f"Total: ${totals.total:.2f}\n\n"
                                        f"Ship to:\n{address}\n{state_name}\n\n"
                                        "Place this order?"):
                 return
                 
-            order = self.controller.order_manager.place_order(
-                self.controller.cart, discounted_subtotal, tax, final_total, address, state_code
-            )
+            # Places the order, then clears the cart and discount codes
+            order = self.cart_pricing.checkout(address)
             
-            # --- Clear cart and fields ---
-            self.controller.cart.clear()
-            self.discount_applied = False
+            # --- Clear fields ---
             self.discount_entry.delete(0, tk.END)
             self.address_entry.delete(0, tk.END)
             self.state_combobox.set("Select State")
-            self.state_tax_label.config(text="")
             self.refresh_cart_view()
             self.customer_refresh_product_list()
             messagebox.showinfo("Order Placed", f"Order #{order.order_id} placed successfully!")
@@ -651,9 +1133,15 @@ class MainFrame(tk.Frame):
             
     def refresh_order_history(self):
         self.history_tree.delete(*self.history_tree.get_children())
-        orders = self.controller.order_manager.get_orders_by_customer(self.controller.current_user.user_id)
-        for o in sorted(orders, key=lambda o: o.timestamp, reverse=True):
+        self.history_cursor = None
+        self.load_more_order_history()
+
+    def load_more_order_history(self):
+        orders, self.history_cursor = self.controller.order_manager.get_orders_page(
+            self.controller.current_user.user_id, self.history_cursor, ORDER_PAGE_SIZE)
+        for o in orders:
             self.history_tree.insert("", "end", values=(
                 o.order_id, f"${o.total_price:.2f}", f"${o.tax:.2f}",
                 o.state_code, o.address, o.timestamp.strftime('%Y-%m-%d %H:%M'), o.status
-            ))
\ No newline at end of file
+            ))
+        self.history_more_btn.config(state="normal" if self.history_cursor else "disabled")
\ No newline at end of file
@@ -1,33 +1,105 @@
 # main.py
 
+import os
+from startup_timing import StartupTimer, timing_enabled
+
+timer = StartupTimer()
+
 from models import User, Product
 from managers import UserManager, ProductManager, OrderManager
-from gui import Application
 from exceptions import ECommerceError, InvalidInputError
+from events import EventBus
+from forecasting import ReplenishmentForecaster
+from rollups import SalesRollups
+from sketches import OrderSketches
+from recommendations import CoPurchaseIndex
+from pricing import PriceScheduler
+from audit_log import AuditLog, AUDIT_DIR_ENV_VAR
+from warehouses import Warehouse, WarehouseNetwork
+from state_snapshot import save_snapshot, restore_snapshot, SNAPSHOT_ENV_VAR
+
+timer.mark("backend imports")
+
+def populate_sample_data(user_manager, product_manager, warehouses):
+    """Sample users and products, with opening stock spread across the warehouses."""
+    # Users
+    user_manager.register(User("admin01", "admin", "admin123", "admin"))
+    user_manager.register(User("cust01", "alice", "alice123", "customer"))
+    user_manager.register(User("cust02", "bob", "bob123", "customer"))
+
+    # Products
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.00, 10))
+    product_manager.add_product(Product("P002", "Smartphone", "Electronics", 800.00, 25))
+    product_manager.add_product(Product("P003", "Coffee Maker", "Appliances", 75.50, 50))
+    product_manager.add_product(Product("P004", "Desk Chair", "Furniture", 150.75, 15))
+    product_manager.add_product(Product("P005", "Wireless Mouse", "Electronics", 25.00, 100))
+    product_manager.add_product(Product("P006", "Monitor", "Electronics", 300.00, 0))
+
+    # Spread opening stock across the warehouses
+    for product in product_manager.get_all_products():
+        for i, warehouse_id in enumerate(warehouses.warehouses):
+            share = product.quantity // 3 + (1 if i < product.quantity % 3 else 0)
+            if share:
+                warehouses.assign(product.product_id, warehouse_id, share)
+
+def replay_orders(orders, recommender, rollups, forecaster, sketches):
+    """Rebuilds the event-fed views from restored orders, since restoring publishes no events."""
+    recommender.rebuild(orders)
+    for order in sorted(orders, key=lambda o: o.timestamp):
+        timestamp = order.timestamp.timestamp()
+        lines = [(item.product_id, item.category, item.price, item.quantity) for item in order.items]
+        rollups.record(timestamp, order.state_code, order.total_price, order.tax, lines)
+        for product_id, _, _, quantity in lines:
+            forecaster.record_sale(product_id, quantity, timestamp)
+        sketches.record(order.customer_id, order.state_code, order.total_price,
+                        [(product_id, quantity) for product_id, _, _, quantity in lines])
 
 def main():
+    audit_log = None
+    snapshot_path = saved_state = None
     try:
         # --- Backend Initialization ---
-        product_manager = ProductManager()
-        user_manager = UserManager()
-        order_manager = OrderManager(product_manager)
-
-        # --- Pre-populate with Sample Data ---
-        # Users
-        user_manager.register(User("admin01", "admin", "admin123", "admin"))
-        user_manager.register(User("cust01", "alice", "alice123", "customer"))
-        user_manager.register(User("cust02", "bob", "bob123", "customer"))
-
-        # Products
-        product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.00, 10))
-        product_manager.add_product(Product("P002", "Smartphone", "Electronics", 800.00, 25))
-        product_manager.add_product(Product("P003", "Coffee Maker", "Appliances", 75.50, 50))
-        product_manager.add_product(Product("P004", "Desk Chair", "Furniture", 150.75, 15))
-        product_manager.add_product(Product("P005", "Wireless Mouse", "Electronics", 25.00, 100))
-        product_manager.add_product(Product("P006", "Monitor", "Electronics", 300.00, 0))
+        event_bus = EventBus()
+        product_manager = ProductManager(event_bus)
+        user_manager = UserManager(event_bus)
+        if os.environ.get(AUDIT_DIR_ENV_VAR):
+            audit_log = AuditLog(os.environ[AUDIT_DIR_ENV_VAR])
+            audit_log.attach(event_bus)
+        warehouses = WarehouseNetwork(product_manager, [Warehouse("WH-EAST", "East", "PA"),
+                                                        Warehouse("WH-CENTRAL", "Central", "TX"),
+                                                        Warehouse("WH-WEST", "West", "CA")])
+        warehouses.attach(event_bus)
+        order_manager = OrderManager(product_manager, warehouses=warehouses)
+        forecaster = ReplenishmentForecaster(product_manager)
+        forecaster.attach(event_bus)
+        rollups = SalesRollups()
+        rollups.attach(event_bus)
+        sketches = OrderSketches()
+        sketches.attach(event_bus)
+        recommender = CoPurchaseIndex(product_manager)
+        recommender.attach(event_bus)
+        price_scheduler = PriceScheduler(product_manager)
+        timer.mark("backend setup")
+
+        snapshot_path = os.environ.get(SNAPSHOT_ENV_VAR)
+        if snapshot_path and os.path.exists(snapshot_path):
+            # --- Fast restart from the state saved on the last exit (warehouse stock included) ---
+            restore_snapshot(snapshot_path, product_manager, user_manager, order_manager, price_scheduler=price_scheduler)
+            replay_orders(order_manager.get_all_orders(), recommender, rollups, forecaster, sketches)
+        else:
+            # --- Pre-populate with Sample Data ---
+            populate_sample_data(user_manager, product_manager, warehouses)
+        saved_state = dict(product_manager=product_manager, user_manager=user_manager, order_manager=order_manager,
+                           price_scheduler=price_scheduler)
+        timer.mark("sample data")
 
         # --- Frontend Initialization and Execution ---
-        app = Application(user_manager, product_manager, order_manager)
+        # Tkinter and the GUI are only imported once the backend is ready
+        from gui import Application
+        timer.mark("gui imports")
+        app = Application(user_manager, product_manager, order_manager, forecaster=forecaster, rollups=rollups, audit_log=audit_log,
+                          recommender=recommender, price_scheduler=price_scheduler, sketches=sketches,
+                          timer=timer if timing_enabled() else None)
         app.mainloop()
         
     except InvalidInputError as e:
@@ -36,6 +108,11 @@ def main():
         print(f"Application Error: {e}")
     except Exception as e:
         print(f"Unexpected Error: {e}")
+    finally:
+        if snapshot_path and saved_state is not None:
+            save_snapshot(snapshot_path, **saved_state)
+        if audit_log is not None:
+            audit_log.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,25 +1,70 @@
 # managers.py
 
 import heapq
+import datetime
+import threading
+from bisect import bisect_left, insort
 from collections import defaultdict
-from models import Order
+from itertools import islice
+from models import Order, LineItem, ProductSnapshots, BatchOrderResult, StatusUpdateResult, ORDER_STATUSES, STATUS_CANCELLED, can_transition
 from exceptions import (
+    ECommerceError,
     AuthenticationError,
     OutOfStockError,
     ProductNotFoundError,
-    InvalidInputError
+    InvalidInputError,
+    InvalidStatusTransitionError,
+    ConcurrentModificationError
 )
 from state_tax_rates import get_tax_rate, is_valid_state, calculate_tax
+from promotions import PromotionEngine, DEFAULT_PROMOTIONS
+from review_store import ReviewStore
+from facets import FacetIndex
+from pricing import PriceHistory, validate_percent_change
+from events import (
+    PRODUCT_ADDED,
+    PRODUCT_UPDATED,
+    PRODUCT_DELETED,
+    STOCK_CHANGED,
+    ORDER_PLACED,
+    ORDER_STATUS_CHANGED,
+    USER_LOGGED_IN,
+    USER_LOGIN_FAILED
+)
 
 class ProductManager:
     """Handles all operations related to products and inventory."""
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.products = {} 
+        self.review_store = ReviewStore()
+        self.event_bus = event_bus
+        # Names/categories referenced by order lines, kept after renames and deletions
+        self.snapshots = ProductSnapshots()
+        # Category / price band / stock bitmaps for faceted browsing
+        self.facets = FacetIndex()
+        # Every price each product has had, for as-of lookups
+        self.price_history = PriceHistory()
+        # Bumped when the set of products, their names or their prices change,
+        # so cached search and sort results know when they are stale
+        self.name_version = 0
+        self.price_version = 0
+        # Guards only the compare-and-write step of each change; nothing is held while a user edits
+        self._lock = threading.RLock()
+
+    def _emit(self, event_type, **data):
+        if self.event_bus is not None:
+            self.event_bus.publish(event_type, **data)
 
     def add_product(self, product):
         if product.product_id in self.products:
             raise InvalidInputError("Product ID already exists.")
         self.products[product.product_id] = product
+        self.facets.index(product)
+        self.price_history.record(product.product_id, product.price)
+        self.name_version += 1
+        self.price_version += 1
+        self._emit(PRODUCT_ADDED, product_id=product.product_id, name=product.name,
+                   category=product.category, price=product.price, quantity=product.quantity)
 
     def get_product(self, product_id):
         product = self.products.get(product_id)
@@ -27,7 +72,27 @@ class ProductManager:
             raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
         return product
 
-    def update_product(self, product_id, name, category, price, quantity):
+    def _check_version(self, product, expected_version):
+        if expected_version is not None and product.version != expected_version:
+            raise ConcurrentModificationError(
+                f"Product '{product.product_id}' was changed by someone else "
+                f"(version {product.version}, expected {expected_version}).")
+
+    def update_product(self, product_id, name, category, price, quantity=None, expected_version=None,
+                       expected_details_version=None):
+        """
+        Updates a product's details and, optionally, overwrites its stock level.
+        
+        Args:
+            quantity (int): New absolute stock level (None keeps the current level;
+                prefer adjust_stock for changes that must not lose concurrent orders)
+            expected_version (int): Only update if the product is still at this version
+            expected_details_version (int): Only update if the name, category and price
+                are still at this details_version; stock changes (e.g. checkouts) do not count
+        
+        Raises:
+            ConcurrentModificationError: If expected_version or expected_details_version no longer matches
+        """
         if product_id not in self.products:
             raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
         
@@ -42,24 +107,124 @@ class ProductManager:
         except (ValueError, TypeError):
             raise InvalidInputError("Price must be a valid number.")
         
-        try:
-            quantity = int(quantity)
-            if quantity < 0:
-                raise InvalidInputError("Quantity cannot be negative.")
-        except (ValueError, TypeError):
-            raise InvalidInputError("Quantity must be a valid integer.")
+        if quantity is not None:
+            try:
+                quantity = int(quantity)
+                if quantity < 0:
+                    raise InvalidInputError("Quantity cannot be negative.")
+            except (ValueError, TypeError):
+                raise InvalidInputError("Quantity must be a valid integer.")
         
-        product = self.products[product_id]
-        product.name = name
-        product.category = category
-        product.price = price
-        product.quantity = quantity
+        with self._lock:
+            product = self.products.get(product_id)
+            if product is None:
+                raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+            self._check_version(product, expected_version)
+            if expected_details_version is not None and product.details_version != expected_details_version:
+                raise ConcurrentModificationError(
+                    f"Product '{product_id}' was edited by someone else "
+                    f"(details version {product.details_version}, expected {expected_details_version}).")
+            old_quantity = product.quantity
+            if quantity is None:
+                quantity = old_quantity
+            if name != product.name:
+                self.name_version += 1
+            if price != product.price:
+                self.price_version += 1
+                self.price_history.record(product_id, price)
+            if (name, category, price) != (product.name, product.category, product.price):
+                product.details_version += 1
+            product.name = name
+            product.category = category
+            product.price = price
+            product.quantity = quantity
+            product.version += 1
+            self.facets.index(product)
+        self._emit(PRODUCT_UPDATED, product_id=product_id, name=name, category=category,
+                   price=price, quantity=quantity)
+        if quantity != old_quantity:
+            self._emit(STOCK_CHANGED, product_id=product_id, old_quantity=old_quantity,
+                       new_quantity=quantity, reason="update")
         return True
 
-    def delete_product(self, product_id):
-        if product_id not in self.products:
-            raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
-        del self.products[product_id]
+    def reprice_category(self, category, percent):
+        """
+        Changes the price of every product in a category by a percentage, in one pass.
+        
+        Args:
+            percent (float): E.g. 10 for 10% more, -25 for 25% off; prices are rounded to cents
+        
+        Returns:
+            int: The number of products whose price changed
+        """
+        factor = 1 + validate_percent_change(percent) / 100
+        changed = []
+        with self._lock:
+            now = self.price_history.clock()
+            # The category bitmap picks the products without scanning the catalog
+            for product_id in self.facets.product_ids({"category": {category}}):
+                product = self.products[product_id]
+                price = round(product.price * factor, 2)
+                if price == product.price:
+                    continue
+                product.price = price
+                product.version += 1
+                product.details_version += 1
+                self.facets.index(product)
+                self.price_history.record(product_id, price, now)
+                changed.append(product)
+            if changed:
+                self.price_version += 1
+        for product in changed:
+            self._emit(PRODUCT_UPDATED, product_id=product.product_id, name=product.name, category=product.category,
+                       price=product.price, quantity=product.quantity)
+        return len(changed)
+
+    def adjust_stock(self, product_id, delta, reason="adjustment", expected_version=None):
+        """
+        Adds delta (negative to remove) to a product's stock level atomically,
+        so concurrent orders and adjustments are never overwritten.
+        
+        Returns:
+            int: The new stock level
+        
+        Raises:
+            InvalidInputError: If delta is not an integer or would make stock negative
+            ConcurrentModificationError: If expected_version no longer matches
+        """
+        try:
+            delta = int(delta)
+        except (ValueError, TypeError):
+            raise InvalidInputError("Stock adjustment must be a valid integer.")
+        with self._lock:
+            product = self.get_product(product_id)
+            self._check_version(product, expected_version)
+            if product.quantity + delta < 0:
+                raise InvalidInputError(f"Cannot remove {-delta} of '{product.name}'; only {product.quantity} in stock.")
+            self._set_quantity(product, product.quantity + delta, reason)
+            return product.quantity
+
+    def _set_quantity(self, product, quantity, reason):
+        """Writes a product's stock level, bumps its version and announces the change."""
+        with self._lock:
+            old_quantity = product.quantity
+            if quantity == old_quantity:
+                return
+            product.quantity = quantity
+            product.version += 1
+            self.facets.index(product)
+        self._emit(STOCK_CHANGED, product_id=product.product_id, old_quantity=old_quantity,
+                   new_quantity=quantity, reason=reason)
+
+    def delete_product(self, product_id, expected_version=None):
+        with self._lock:
+            product = self.get_product(product_id)
+            self._check_version(product, expected_version)
+            del self.products[product_id]
+            self.facets.remove(product_id)
+            self.name_version += 1
+            self.price_version += 1
+        self._emit(PRODUCT_DELETED, product_id=product_id)
         return True
     
     def get_all_products(self):
@@ -75,26 +240,46 @@ class ProductManager:
     def get_out_of_stock_products(self):
         return [p for p in self.products.values() if p.quantity == 0]
 
+    def publish_snapshot(self, publisher):
+        """Publishes the current catalog to a CatalogSnapshotPublisher and returns its version."""
+        return publisher.publish(self.products.values())
+
     # --- NEW: Review Methods ---
-    def add_review_to_product(self, product_id, username, review_text):
+    def add_review_to_product(self, product_id, username, review_text, rating=None):
         product = self.products.get(product_id)
         if not product:
             raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
         if not review_text or not isinstance(review_text, str) or not review_text.strip():
             raise InvalidInputError("Review text cannot be empty.")
-        product.add_review(username, review_text)
+        self.review_store.add(product_id, username, review_text, rating)
         return True
 
     def get_product_reviews(self, product_id):
-        product = self.products.get(product_id)
-        if not product:
+        """All reviews as (username, review_text) tuples, oldest first. Prefer get_review_page for large products."""
+        if product_id not in self.products:
             raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
-        return product.reviews
+        return [(r.username, r.text) for r in self.review_store.iter_reviews(product_id)]
+
+    def get_review_page(self, product_id, cursor=None, limit=20):
+        """One page of Review objects, newest first, plus the cursor for the next page."""
+        if product_id not in self.products:
+            raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+        return self.review_store.get_page(product_id, cursor, limit)
+
+    def get_review_summary(self, product_id):
+        """(review count, average rating or None) for a product."""
+        if product_id not in self.products:
+            raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+        return self.review_store.get_summary(product_id)
+
+    def search_reviews(self, query, product_id=None, limit=50):
+        return self.review_store.search(query, product_id, limit)
 
 class UserManager:
     """Manages user authentication."""
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.users = {} 
+        self.event_bus = event_bus  # Optional EventBus; logins are published for auditing
 
     def register(self, user):
         if user.username in self.users:
@@ -102,6 +287,17 @@ class UserManager:
         self.users[user.username] = user
 
     def login(self, username, password):
+        try:
+            user = self._authenticate(username, password)
+        except AuthenticationError as e:
+            if self.event_bus is not None:
+                self.event_bus.publish(USER_LOGIN_FAILED, username=username, reason=str(e))
+            raise
+        if self.event_bus is not None:
+            self.event_bus.publish(USER_LOGGED_IN, username=user.username, user_id=user.user_id, role=user.role)
+        return user
+
+    def _authenticate(self, username, password):
         if not username or not password:
             raise AuthenticationError("Username and password cannot be empty.")
         
@@ -114,11 +310,31 @@ class UserManager:
         
         return user
 
+# Stock allocation policies for batch order placement
+ALLOCATION_FIFO = "fifo"
+ALLOCATION_PRIORITY = "priority"
+
+# Orders in these statuses are finished and may be moved to the archive
+ARCHIVABLE_STATUSES = ("Delivered", "Cancelled")
+ARCHIVE_CHECK_INTERVAL = datetime.timedelta(hours=1)
+
 class OrderManager:
     """Handles order processing and history."""
-    def __init__(self, product_manager):
+    def __init__(self, product_manager, archive=None, archive_after_days=None, promotion_engine=None, warehouses=None):
         self.orders = []
         self.product_manager = product_manager
+        self.promotion_engine = promotion_engine or PromotionEngine(DEFAULT_PROMOTIONS)
+        # Time-ordered (timestamp, order_id) keys for cursor pagination
+        self._orders_by_id = {}
+        self._order_keys = []
+        self._customer_keys = defaultdict(list)
+        # Optional cold storage (an OrderArchive) for old, finished orders
+        self.archive = archive
+        self.archive_after_days = archive_after_days
+        self._last_archive_check = None
+        self._lock = threading.RLock()  # Guards compare-and-set of order status
+        # Optional WarehouseNetwork that picks the fulfillment location(s) per order
+        self.warehouses = warehouses
 
     # --- UPDATED: State-Based Tax Calculation Logic ---
     def calculate_order_totals(self, subtotal, state_code):
@@ -145,8 +361,44 @@ class OrderManager:
         tax_amount, final_total = calculate_tax(subtotal, state_code)
         return tax_amount, final_total
 
+    def evaluate_promotions(self, cart, state_code=None, codes=()):
+        """Returns the PromotionResult for a cart using the active promotion rules."""
+        return self.promotion_engine.evaluate(cart, self.product_manager.products, state_code, codes)
+
     # UPDATED: Accepts address, state, and tax details
     def place_order(self, cart, subtotal_with_discount, tax, final_total, address, state_code):
+        self._validate_shipping(address, state_code)
+        
+        # Check and take stock as one step so concurrent checkouts cannot oversell
+        with self.product_manager._lock:
+            for product_id, quantity in cart.items.items():
+                product = self.product_manager.products.get(product_id)
+                if not product:
+                    raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+                if product.quantity < quantity:
+                    raise OutOfStockError(f"Not enough stock for '{product.name}'. Available: {product.quantity}, Requested: {quantity}")
+
+            # Plan shipments and take stock from the chosen locations before Product.quantity drops
+            fulfillment = self.warehouses.plan(cart.items, state_code) if self.warehouses is not None else {}
+            # Lines are charged the prices the cart (and so the caller's totals) were computed from
+            if self.warehouses is not None:
+                self.warehouses.commit(fulfillment)
+            line_items = []
+            for product_id, quantity in cart.items.items():
+                product = self.product_manager.products.get(product_id)
+                line_items.append(LineItem.for_product(product, quantity, self.product_manager.snapshots,
+                                                       cart.unit_prices.get(product_id)))
+                self.product_manager._set_quantity(product, product.quantity - quantity, "order")
+
+        # Create order with state information
+        new_order = Order(cart.customer_id, line_items, final_total, tax, address, state_code, dict(cart.items))
+        new_order.fulfillment = fulfillment
+        self._record_order(new_order)
+        self._emit_order_placed(new_order)
+        self._maybe_archive()
+        return new_order
+
+    def _validate_shipping(self, address, state_code):
         # Validate address
         if not address or not isinstance(address, str) or not address.strip():
             raise InvalidInputError("Shipping address cannot be empty.")
@@ -157,50 +409,288 @@ class OrderManager:
         
         if not is_valid_state(state_code):
             raise InvalidInputError(f"Invalid state code: '{state_code}'")
+
+    # --- NEW: Batch Order Placement ---
+    def place_orders_batch(self, requests, policy=ALLOCATION_FIFO):
+        """
+        Places many orders in one pass with grouped stock validation.
         
-        # Validate quantities
-        for product_id, quantity in cart.items.items():
-            product = self.product_manager.products.get(product_id)
-            if not product:
-                raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
-            if product.quantity < quantity:
-                raise OutOfStockError(f"Not enough stock for '{product.name}'. Available: {product.quantity}, Requested: {quantity}")
+        Each request is a dict with the same fields as place_order:
+        "cart", "subtotal", "tax", "final_total", "address", "state_code",
+        plus an optional "priority" (higher wins) used by the priority policy.
+        When a product is oversubscribed, stock goes to requests in policy
+        order and an order is only accepted if every line can be filled.
+        
+        Args:
+            requests (list): Order request dicts
+            policy (str): ALLOCATION_FIFO or ALLOCATION_PRIORITY
+        
+        Returns:
+            list: BatchOrderResult per request, in submission order
+        """
+        if policy not in (ALLOCATION_FIFO, ALLOCATION_PRIORITY):
+            raise InvalidInputError(f"Unknown allocation policy: '{policy}'")
+        
+        products = self.product_manager.products
+        results = [BatchOrderResult(i) for i in range(len(requests))]
+        candidates = []
+        valid_states = set()
+        for i, request in enumerate(requests):
+            try:
+                address, state_code = request.get("address"), request.get("state_code")
+                if state_code not in valid_states or not isinstance(address, str) or not address.strip():
+                    self._validate_shipping(address, state_code)
+                    valid_states.add(state_code)
+                lines = request["cart"].items
+                if not lines:
+                    raise InvalidInputError("Cart is empty.")
+                for product_id, quantity in lines.items():
+                    if product_id not in products:
+                        raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+                    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                        raise InvalidInputError(f"Quantity of '{product_id}' must be a positive integer.")
+                candidates.append(i)
+            except (ECommerceError, KeyError, AttributeError) as e:
+                results[i].error = e if isinstance(e, ECommerceError) else InvalidInputError(f"Malformed order request: {e}")
+        
+        if policy == ALLOCATION_PRIORITY:
+            candidates.sort(key=lambda i: (-requests[i].get("priority", 0), i))
+        
+        # Allocate and write under the stock lock so concurrent checkouts cannot oversell
+        with self.product_manager._lock:
+            remaining = {}
+            for i in candidates:
+                for product_id in requests[i]["cart"].items:
+                    if product_id not in remaining and product_id in products:
+                        remaining[product_id] = products[product_id].quantity
+            accepted = []
+            for i in candidates:
+                lines = requests[i]["cart"].items
+                for product_id, quantity in lines.items():
+                    if product_id not in remaining:
+                        results[i].error = ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+                        break
+                    if remaining[product_id] < quantity:
+                        results[i].error = OutOfStockError(f"Not enough stock for '{products[product_id].name}'. Available: {remaining[product_id]}, Requested: {quantity}")
+                        break
+                else:
+                    for product_id, quantity in lines.items():
+                        remaining[product_id] -= quantity
+                    accepted.append(i)
+            
+            fulfillment = {}
+            if self.warehouses is None:
+                for product_id, quantity in remaining.items():
+                    self.product_manager._set_quantity(products[product_id], quantity, "order")
+            else:
+                # Locations depend on what earlier orders took, so ship accepted orders one by one
+                for i in accepted:
+                    lines = requests[i]["cart"].items
+                    fulfillment[i] = self.warehouses.plan(lines, requests[i]["state_code"])
+                    self.warehouses.commit(fulfillment[i])
+                    for product_id, quantity in lines.items():
+                        self.product_manager._set_quantity(products[product_id], products[product_id].quantity - quantity, "order")
+            snapshots = self.product_manager.snapshots
+            details = {i: [LineItem.for_product(products[pid], qty, snapshots, requests[i]["cart"].unit_prices.get(pid))
+                           for pid, qty in requests[i]["cart"].items.items()]
+                       for i in accepted}
+        
+        for i in sorted(accepted):
+            request = requests[i]
+            cart = request["cart"]
+            order = Order(cart.customer_id, details[i], request["final_total"], request["tax"],
+                          request["address"], request["state_code"], dict(cart.items))
+            order.fulfillment = fulfillment.get(i, {})
+            self._record_order(order)
+            self._emit_order_placed(order)
+            results[i].order = order
+        self._maybe_archive()
+        return results
 
-        items_with_details = []
-        for product_id, quantity in cart.items.items():
-            product = self.product_manager.products.get(product_id)
-            items_with_details.append((product.name, product.price, quantity))
-            product.quantity -= quantity
+    def _record_order(self, order):
+        self.orders.append(order)
+        self._orders_by_id[order.order_id] = order
+        key = (order.timestamp.timestamp(), order.order_id)
+        insort(self._order_keys, key)
+        insort(self._customer_keys[order.customer_id], key)
 
-        # Create order with state information
-        new_order = Order(cart.customer_id, items_with_details, final_total, tax, address, state_code)
-        self.orders.append(new_order)
-        return new_order
+    def _emit_order_placed(self, order):
+        if self.product_manager.event_bus is None:
+            return
+        self.product_manager._emit(
+            ORDER_PLACED, order_id=order.order_id, customer_id=order.customer_id,
+            state_code=order.state_code, total_price=order.total_price, tax=order.tax,
+            timestamp=order.timestamp.timestamp(),
+            lines=[(item.product_id, item.category, item.price, item.quantity) for item in order.items],
+        )
 
     def get_orders_by_customer(self, user_id):
-        return [o for o in self.orders if o.customer_id == user_id]
+        return [self._orders_by_id[order_id] for _, order_id in self._customer_keys.get(user_id, [])]
     
     def get_all_orders(self):
         return self.orders
+
+    # --- NEW: Cursor Pagination ---
+    def get_orders_page(self, customer_id=None, cursor=None, limit=50):
+        """
+        Returns one page of orders, newest first, including archived orders.
         
-    def update_order_status(self, order_id, new_status):
-        for order in self.orders:
-            if order.order_id == order_id:
-                order.status = new_status
-                return True
-        raise ProductNotFoundError(f"Order with ID '{order_id}' not found.")
+        Args:
+            customer_id (str): Restrict to one customer (None for all orders)
+            cursor: Opaque cursor returned by the previous page (None for the first page)
+            limit (int): Maximum number of orders in the page
+        
+        Returns:
+            tuple: (list of Order, next cursor or None when there are no more pages)
+        """
+        if limit <= 0:
+            raise InvalidInputError("Page size must be positive.")
+        keys = self._order_keys if customer_id is None else self._customer_keys.get(customer_id, [])
+        end = len(keys) if cursor is None else bisect_left(keys, cursor)
+        hot = ((keys[i], self._orders_by_id[keys[i][1]]) for i in range(end - 1, -1, -1))
+        if self.archive is not None:
+            cold = self.archive.iter_orders(customer_id, cursor)
+            hot = heapq.merge(hot, cold, key=lambda entry: entry[0], reverse=True)
+        page = list(islice(hot, limit))
+        next_cursor = page[-1][0] if len(page) == limit else None
+        return [order for _, order in page], next_cursor
+
+    # --- NEW: Archival Tiering ---
+    def archive_orders(self, older_than_days=None, now=None):
+        """
+        Moves finished orders older than the cutoff from memory to the archive.
+        
+        Returns:
+            int: Number of orders archived
+        """
+        if self.archive is None:
+            raise InvalidInputError("No order archive is configured.")
+        days = self.archive_after_days if older_than_days is None else older_than_days
+        if days is None or days < 0:
+            raise InvalidInputError("Archive age must be a non-negative number of days.")
+        cutoff = (now or datetime.datetime.now()) - datetime.timedelta(days=days)
+        moving = [o for o in self.orders if o.timestamp < cutoff and o.status in ARCHIVABLE_STATUSES]
+        if not moving:
+            return 0
+        self.archive.append(moving)
+        moved_ids = {o.order_id for o in moving}
+        for order_id in moved_ids:
+            del self._orders_by_id[order_id]
+        self.orders = [o for o in self.orders if o.order_id not in moved_ids]
+        self._order_keys = [k for k in self._order_keys if k[1] not in moved_ids]
+        for customer_id in {o.customer_id for o in moving}:
+            remaining = [k for k in self._customer_keys[customer_id] if k[1] not in moved_ids]
+            if remaining:
+                self._customer_keys[customer_id] = remaining
+            else:
+                del self._customer_keys[customer_id]
+        return len(moving)
+
+    def _maybe_archive(self):
+        if self.archive is None or self.archive_after_days is None:
+            return
+        now = datetime.datetime.now()
+        if self._last_archive_check is None or now - self._last_archive_check >= ARCHIVE_CHECK_INTERVAL:
+            self._last_archive_check = now
+            self.archive_orders(now=now)
+        
+    def update_order_status(self, order_id, new_status, expected_version=None):
+        result = self.update_order_statuses([(order_id, new_status, expected_version)])[0]
+        if not result.success:
+            raise result.error
+        return True
+
+    # --- NEW: Bulk Status Transitions ---
+    def update_order_statuses(self, updates):
+        """
+        Applies many status changes in one call, validating each against the
+        order lifecycle (see models.ORDER_TRANSITIONS).
+        
+        Updates are applied in order, so one batch may move an order through
+        several steps. Cancelled orders return their stock, summed per product
+        and written once per product at the end of the batch.
+        
+        Args:
+            updates (iterable): (order_id, new_status) pairs, or
+                (order_id, new_status, expected_version) to only apply the
+                change if the order is still at that version
+        
+        Returns:
+            list: StatusUpdateResult per update, in submission order
+        """
+        results = []
+        restock = defaultdict(int)
+        cancelled_shipments = []
+        for i, update in enumerate(updates):
+            order_id, new_status = update[0], update[1]
+            expected_version = update[2] if len(update) > 2 else None
+            result = StatusUpdateResult(i, order_id)
+            results.append(result)
+            status = str(new_status).strip().title()
+            with self._lock:
+                order = self._orders_by_id.get(str(order_id))
+                if order is None:
+                    result.error = ProductNotFoundError(f"Order with ID '{order_id}' not found.")
+                elif expected_version is not None and order.version != expected_version:
+                    result.error = ConcurrentModificationError(
+                        f"Order '{order.order_id}' was changed by someone else "
+                        f"(version {order.version}, expected {expected_version}).")
+                elif status not in ORDER_STATUSES:
+                    result.error = InvalidInputError(f"Unknown order status: '{new_status}'")
+                elif not can_transition(order.status, status):
+                    result.error = InvalidStatusTransitionError(
+                        f"Order '{order.order_id}' cannot move from {order.status} to {status}.")
+                else:
+                    old_status = order.status
+                    order.status = status
+                    order.version += 1
+                    result.order = order
+                    if status == STATUS_CANCELLED:
+                        for product_id, quantity in order.stock_allocations.items():
+                            restock[product_id] += quantity
+                        cancelled_shipments.append(order.fulfillment)
+            if result.success:
+                self.product_manager._emit(ORDER_STATUS_CHANGED, order_id=order.order_id,
+                                           old_status=old_status, new_status=status)
+        
+        with self.product_manager._lock:
+            for product_id, quantity in restock.items():
+                try:
+                    self.product_manager.adjust_stock(product_id, quantity, "cancel")
+                except ProductNotFoundError:
+                    pass  # Deleted since the order was placed
+            if self.warehouses is not None:
+                for shipment in cancelled_shipments:
+                    self.warehouses.release(shipment)
+        return results
 
     def get_total_revenue(self):
-        return sum(o.total_price for o in self.orders)
+        archived = self.archive.total_revenue if self.archive is not None else 0.0
+        return sum(o.total_price for o in self.orders) + archived
     
     def get_total_orders_placed(self):
-        return len(self.orders)
+        archived = len(self.archive) if self.archive is not None else 0
+        return len(self.orders) + archived
         
     def get_most_frequently_ordered_product(self):
+        """Current name of the product with the most units ordered, grouped by product ID so renames don't split it."""
         freq_map = defaultdict(int)
+        if self.archive is not None:
+            freq_map.update(self.archive.item_quantities)
         for order in self.orders:
-            for name, price, quantity in order.items:
-                freq_map[name] += quantity
+            for item in order.items:
+                freq_map[item.key] += item.quantity
         
         if not freq_map: return "N/A"
-        return max(freq_map, key=freq_map.get)
\ No newline at end of file
+        return self.product_name(max(freq_map, key=freq_map.get))
+
+    def product_name(self, product_id):
+        """Current name of a product, or the last name it was ordered under if it has been deleted."""
+        product = self.product_manager.products.get(product_id)
+        if product is not None:
+            return product.name
+        for snapshots in (self.product_manager.snapshots, getattr(self.archive, "snapshots", None)):
+            snapshot = snapshots.latest(product_id) if snapshots is not None else None
+            if snapshot is not None:
+                return snapshot.name
+        return product_id
\ No newline at end of file
@@ -1,9 +1,32 @@
 # models.py
 
+import sys
 import uuid
 import datetime
 from exceptions import InvalidInputError
 
+# --- Order Lifecycle ---
+STATUS_PLACED = "Placed"
+STATUS_PROCESSING = "Processing"
+STATUS_SHIPPED = "Shipped"
+STATUS_DELIVERED = "Delivered"
+STATUS_CANCELLED = "Cancelled"
+
+ORDER_STATUSES = (STATUS_PLACED, STATUS_PROCESSING, STATUS_SHIPPED, STATUS_DELIVERED, STATUS_CANCELLED)
+
+# Allowed moves: forward through the lifecycle (skipping steps is fine, e.g. when a
+# warehouse reports "Shipped" directly), and cancellation until the order ships.
+ORDER_TRANSITIONS = {
+    STATUS_PLACED: frozenset((STATUS_PROCESSING, STATUS_SHIPPED, STATUS_DELIVERED, STATUS_CANCELLED)),
+    STATUS_PROCESSING: frozenset((STATUS_SHIPPED, STATUS_DELIVERED, STATUS_CANCELLED)),
+    STATUS_SHIPPED: frozenset((STATUS_DELIVERED,)),
+    STATUS_DELIVERED: frozenset(),
+    STATUS_CANCELLED: frozenset(),
+}
+
+def can_transition(old_status, new_status):
+    return new_status in ORDER_TRANSITIONS.get(old_status, ())
+
 class Product:
     """Represents a product in the inventory."""
     def __init__(self, product_id, name, category, price, quantity):
@@ -32,11 +55,22 @@ class Product:
         self.category = category
         self.price = price
         self.quantity = quantity
-        # NEW: Added a list to store reviews
-        self.reviews = [] # List of tuples: (username, review_text)
+        self.version = 0  # Bumped by ProductManager on every change to the product
+        self.details_version = 0  # Bumped only when the name, category or price change (not stock)
+        # Reviews live in ProductManager.review_store, not on the product
 
-    def add_review(self, username, review_text):
-        self.reviews.append((username, review_text))
+    @classmethod
+    def restore(cls, product_id, name, category, price, quantity, version=0, details_version=0):
+        """Rebuilds a previously saved product (e.g. from a snapshot) without re-validating it."""
+        product = cls.__new__(cls)
+        product.product_id = product_id
+        product.name = name
+        product.category = category
+        product.price = price
+        product.quantity = quantity
+        product.version = version
+        product.details_version = details_version
+        return product
 
     def __lt__(self, other):
         return self.price < other.price
@@ -54,30 +88,216 @@ class ShoppingCart:
     def __init__(self, customer_id):
         self.customer_id = customer_id
         self.items = {} 
+        self.unit_prices = {}  # product_id -> price when the line was last updated
+        self.subtotal = 0.0    # Running total of unit price * quantity
+        self.version = 0  # Bumped on every change so derived results can be cached
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """Registers listener(event, product_id) for "item_changed", "item_removed" and "cleared"."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, product_id=None):
+        for listener in list(self._listeners):
+            listener(event, product_id)
 
     def add_item(self, product, quantity=1):
-        if product.product_id in self.items:
-            self.items[product.product_id] += quantity
+        pid = product.product_id
+        if pid in self.items:
+            # Re-price the existing line in case the product price changed
+            self.subtotal -= self.unit_prices[pid] * self.items[pid]
+            self.items[pid] += quantity
         else:
-            self.items[product.product_id] = quantity
+            self.items[pid] = quantity
+        self.unit_prices[pid] = product.price
+        self.subtotal += product.price * self.items[pid]
+        self.version += 1
+        self._notify("item_changed", pid)
 
     def remove_item(self, product_id):
         if product_id in self.items:
-            del self.items[product_id]
+            self.subtotal -= self.unit_prices.pop(product_id) * self.items.pop(product_id)
+            if not self.items:
+                self.subtotal = 0.0  # Avoid float drift on an empty cart
+            self.version += 1
+            self._notify("item_removed", product_id)
+
+    def reprice(self, products):
+        """
+        Moves every line to its product's current price (products: product_id -> Product).
+
+        Returns:
+            bool: Whether any price changed
+        """
+        changed = [pid for pid, price in self.unit_prices.items() if pid in products and products[pid].price != price]
+        if not changed:
+            return False
+        for pid in changed:
+            self.unit_prices[pid] = products[pid].price
+        self.subtotal = sum(self.unit_prices[pid] * quantity for pid, quantity in self.items.items())
+        self.version += 1
+        for pid in changed:
+            self._notify("item_changed", pid)
+        return True
+
+    def line_total(self, product_id):
+        return self.unit_prices.get(product_id, 0.0) * self.items.get(product_id, 0)
 
     def clear(self):
         self.items = {}
+        self.unit_prices = {}
+        self.subtotal = 0.0
+        self.version += 1
+        self._notify("cleared")
+
+# --- NEW: Line Items and Product Snapshots ---
+class ProductSnapshot:
+    """A product's name and category as they were when it was ordered."""
+    __slots__ = ("product_id", "version", "name", "category")
+
+    def __init__(self, product_id, version, name, category):
+        self.product_id = product_id
+        self.version = version
+        self.name = name
+        self.category = category
+
+    def __repr__(self):
+        return f"ProductSnapshot({self.product_id!r}, v{self.version}, {self.name!r})"
+
+class ProductSnapshots:
+    """
+    Interned, versioned product names for order lines. Every distinct
+    (product ID, name, category) gets one shared snapshot, so orders keep the
+    names they were placed under without each line holding its own copy.
+    """
+    def __init__(self):
+        self._history = {}   # product_id -> [ProductSnapshot], oldest first
+        self._interned = {}  # (product_id, name, category) -> ProductSnapshot
+
+    def intern(self, product_id, name, category=None):
+        key = (product_id, name, category)
+        snapshot = self._interned.get(key)
+        if snapshot is None:
+            history = self._history.setdefault(product_id, [])
+            snapshot = ProductSnapshot(product_id, len(history), sys.intern(name), category)
+            history.append(snapshot)
+            self._interned[key] = snapshot
+        return snapshot
+
+    def snapshot(self, product):
+        """The current snapshot of a Product, creating a new version if it was renamed or recategorized."""
+        history = self._history.get(product.product_id)
+        if history and history[-1].name == product.name and history[-1].category == product.category:
+            return history[-1]
+        return self.intern(product.product_id, product.name, product.category)
+
+    def latest(self, product_id):
+        history = self._history.get(product_id)
+        return history[-1] if history else None
+
+    def history(self, product_id):
+        return list(self._history.get(product_id, ()))
+
+    def __len__(self):
+        return len(self._interned)
+
+class LineItem:
+    """One order line: product ID, unit price and quantity at checkout, plus the product's snapshot."""
+    __slots__ = ("product_id", "price", "quantity", "snapshot")
+
+    def __init__(self, product_id, price, quantity, snapshot):
+        self.product_id = product_id
+        self.price = price
+        self.quantity = quantity
+        self.snapshot = snapshot
+
+    @classmethod
+    def for_product(cls, product, quantity, snapshots, price=None):
+        return cls(product.product_id, product.price if price is None else price, quantity, snapshots.snapshot(product))
+
+    @property
+    def name(self):
+        return self.snapshot.name
+
+    @property
+    def category(self):
+        return self.snapshot.category
+
+    @property
+    def key(self):
+        """Stable grouping key: the product ID (the name only for lines from before IDs were stored)."""
+        return self.product_id if self.product_id is not None else self.snapshot.name
+
+    @property
+    def total(self):
+        return self.price * self.quantity
+
+    def __eq__(self, other):
+        return (isinstance(other, LineItem) and self.product_id == other.product_id and self.name == other.name
+                and self.price == other.price and self.quantity == other.quantity)
+
+    def __repr__(self):
+        return f"LineItem({self.product_id!r}, {self.name!r}, {self.price}, {self.quantity})"
 
 class Order:
     """Represents a completed transaction."""
     # MODIFIED: Added address, state, and tax to the order
-    def __init__(self, customer_id, items_with_details, total_price, tax, address, state_code):
+    def __init__(self, customer_id, items, total_price, tax, address, state_code, stock_allocations=None):
         self.order_id = str(uuid.uuid4())[:8]
         self.customer_id = customer_id
-        self.items = items_with_details
+        self.items = items  # [LineItem]
         self.total_price = total_price # This is the final price INCLUDING tax
         self.tax = tax
         self.address = address
         self.state_code = state_code  # Two-letter state code (e.g., "CA", "NY")
         self.timestamp = datetime.datetime.now()
-        self.status = "Placed"
\ No newline at end of file
+        self.status = STATUS_PLACED
+        self.stock_allocations = stock_allocations or {}  # product_id -> units taken from stock
+        self.version = 0  # Bumped on every status change, for conditional updates
+        self.fulfillment = {}  # warehouse_id -> {product_id: quantity} when warehouses are tracked
+
+    @classmethod
+    def restore(cls, order_id, customer_id, items, total_price, tax, address, state_code, timestamp, status,
+                stock_allocations=None, fulfillment=None):
+        """Rebuilds a previously placed order (e.g. from an archive) without generating a new ID."""
+        order = cls.__new__(cls)
+        order.order_id = order_id
+        order.customer_id = customer_id
+        order.items = items
+        order.total_price = total_price
+        order.tax = tax
+        order.address = address
+        order.state_code = state_code
+        order.timestamp = timestamp
+        order.status = status
+        order.stock_allocations = stock_allocations or {}
+        order.version = 0
+        order.fulfillment = fulfillment or {}
+        return order
+
+class BatchOrderResult:
+    """Outcome of a single request submitted to OrderManager.place_orders_batch."""
+    def __init__(self, index, order=None, error=None):
+        self.index = index  # Position of the request in the submitted batch
+        self.order = order
+        self.error = error
+
+    @property
+    def success(self):
+        return self.error is None
+
+class StatusUpdateResult:
+    """Outcome of a single update submitted to OrderManager.update_order_statuses."""
+    def __init__(self, index, order_id, order=None, error=None):
+        self.index = index  # Position of the update in the submitted batch
+        self.order_id = order_id
+        self.order = order
+        self.error = error
+
+    @property
+    def success(self):
+        return self.error is None
@@ -0,0 +1,223 @@
+# order_archive.py
+
+"""
+Order Archive
+-------------
+Cold storage for old orders that have been moved out of OrderManager's
+in-memory history. Each order is appended to a single file as a small
+uncompressed key (timestamp, customer ID) followed by a zlib-compressed JSON
+body. The file is memory-mapped for reads, and an in-memory per-customer
+offset index keeps lookups from scanning the whole archive.
+
+Running totals (revenue, order count, units per product ID) are kept so
+that reports still cover archived orders without decompressing them.
+Opening an archive rebuilds the offset index from the uncompressed keys
+alone; revenue and units are read from a small JSON sidecar
+("<path>.totals") that records how much of the archive they cover, so only
+orders appended after it was last written are decompressed.
+
+Line items are stored as [product_id, name, category, price, quantity].
+Archives written before product IDs were recorded hold [name, price,
+quantity]; those lines load with no product ID and are grouped by name.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+import datetime
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from models import Order, LineItem, ProductSnapshots
+
+_RECORD = struct.Struct("<dIII")  # timestamp, customer_id length, order_id length, body length
+TOTALS_SUFFIX = ".totals"
+
+
+def order_to_dict(order):
+    """Convert an Order into a JSON-serializable dict."""
+    return {
+        "order_id": order.order_id,
+        "customer_id": order.customer_id,
+        "items": [[item.product_id, item.name, item.category, item.price, item.quantity] for item in order.items],
+        "total_price": order.total_price,
+        "tax": order.tax,
+        "address": order.address,
+        "state_code": order.state_code,
+        "timestamp": order.timestamp.timestamp(),
+        "status": order.status,
+        "stock_allocations": order.stock_allocations,
+        "fulfillment": order.fulfillment,
+    }
+
+
+def line_item_from_list(item, snapshots):
+    if len(item) == 3:  # Legacy [name, price, quantity]
+        name, price, quantity = item
+        return LineItem(None, price, quantity, snapshots.intern(None, name))
+    product_id, name, category, price, quantity = item
+    return LineItem(product_id, price, quantity, snapshots.intern(product_id, name, category))
+
+
+def order_from_dict(data, snapshots=None):
+    """Rebuild an Order from order_to_dict output, sharing names through a ProductSnapshots registry."""
+    snapshots = snapshots if snapshots is not None else ProductSnapshots()
+    return Order.restore(
+        data["order_id"], data["customer_id"], [line_item_from_list(item, snapshots) for item in data["items"]],
+        data["total_price"], data["tax"], data["address"], data["state_code"],
+        datetime.datetime.fromtimestamp(data["timestamp"]), data["status"],
+        data.get("stock_allocations"), data.get("fulfillment"),
+    )
+
+
+class OrderArchive:
+    """Append-only, compressed, memory-mapped store of archived orders."""
+    def __init__(self, path, snapshots=None):
+        self.path = path
+        self.totals_path = path + TOTALS_SUFFIX
+        self.snapshots = snapshots if snapshots is not None else ProductSnapshots()
+        self._index = defaultdict(list)  # customer_id -> sorted [(timestamp, order_id, offset)]
+        self._all = []                   # sorted [(timestamp, order_id, offset)]
+        self._ids = {}                   # order_id -> offset
+        self.total_revenue = 0.0
+        self.order_count = 0
+        self.item_quantities = defaultdict(int)
+        self._map = None
+        self._mapped_size = 0
+        self._file = open(path, "a+b")
+        self._size = os.path.getsize(path)
+        self._load()
+
+    def _load(self):
+        """Rebuild the offset index from record keys and the running totals from the sidecar."""
+        self._remap()
+        offsets = []
+        offset = 0
+        while offset + _RECORD.size <= self._size:
+            timestamp, cust_len, id_len, body_len = _RECORD.unpack_from(self._map, offset)
+            start = offset + _RECORD.size
+            end = start + cust_len + id_len + body_len
+            if end > self._size:
+                break  # Truncated tail from an interrupted write
+            customer_id = self._map[start:start + cust_len].decode("utf-8")
+            order_id = self._map[start + cust_len:start + cust_len + id_len].decode("utf-8")
+            self._index_key(customer_id, timestamp, order_id, offset)
+            offsets.append(offset)
+            offset = end
+        if offset < self._size:
+            self._file.truncate(offset)  # So later appends are not hidden behind the torn record
+            self._size = offset
+
+        covered = self._read_totals()
+        if covered > self._size:  # Sidecar is newer than the archive it describes
+            self.total_revenue = 0.0
+            self.item_quantities.clear()
+            covered = 0
+        pending = [o for o in offsets if o >= covered]
+        for offset in pending:
+            self._add_to_totals(self._read_at(offset))
+        if pending:
+            self._write_totals()
+
+    def _read_totals(self):
+        """Loads saved revenue and units; returns the archive size they cover (0 if none)."""
+        try:
+            with open(self.totals_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.total_revenue = float(data["total_revenue"])
+            self.item_quantities.update(data["item_quantities"])
+            return int(data["size"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.total_revenue = 0.0
+            self.item_quantities.clear()
+            return 0
+
+    def _write_totals(self):
+        temp_path = self.totals_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"size": self._size, "total_revenue": self.total_revenue,
+                       "item_quantities": self.item_quantities}, f)
+        os.replace(temp_path, self.totals_path)
+
+    def _remap(self):
+        if self._size != self._mapped_size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+            self._mapped_size = self._size
+
+    def _read_at(self, offset):
+        self._remap()
+        if self._map is None or offset + _RECORD.size > self._mapped_size:
+            return None
+        _, cust_len, id_len, body_len = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size + cust_len + id_len
+        if start + body_len > self._mapped_size:
+            return None
+        body = zlib.decompress(self._map[start:start + body_len])
+        return order_from_dict(json.loads(body), self.snapshots)
+
+    def _index_key(self, customer_id, timestamp, order_id, offset):
+        key = (timestamp, order_id, offset)
+        insort(self._index[customer_id], key)
+        insort(self._all, key)
+        self._ids[order_id] = offset
+        self.order_count += 1
+
+    def _add_to_totals(self, order):
+        self.total_revenue += order.total_price
+        for item in order.items:
+            self.item_quantities[item.key] += item.quantity
+
+    def append(self, orders):
+        """Append orders to the archive and index them."""
+        self._file.seek(0, os.SEEK_END)
+        for order in orders:
+            if order.order_id in self._ids:
+                continue
+            offset = self._file.tell()
+            body = zlib.compress(json.dumps(order_to_dict(order), separators=(",", ":")).encode("utf-8"))
+            customer = str(order.customer_id).encode("utf-8")
+            order_id = order.order_id.encode("utf-8")
+            self._file.write(_RECORD.pack(order.timestamp.timestamp(), len(customer), len(order_id), len(body)))
+            self._file.write(customer + order_id + body)
+            self._index_key(str(order.customer_id), order.timestamp.timestamp(), order.order_id, offset)
+            self._add_to_totals(order)
+        self._file.flush()
+        self._size = self._file.tell()
+        self._write_totals()
+
+    def __len__(self):
+        return self.order_count
+
+    def __contains__(self, order_id):
+        return order_id in self._ids
+
+    def get_order(self, order_id):
+        offset = self._ids.get(order_id)
+        return None if offset is None else self._read_at(offset)
+
+    def iter_orders(self, customer_id=None, before=None):
+        """
+        Yield archived orders newest first.
+
+        Args:
+            customer_id (str): Restrict to one customer (None for all)
+            before (tuple): Only orders whose (timestamp, order_id) key is lower
+
+        Yields:
+            tuple: ((timestamp, order_id), Order)
+        """
+        keys = self._all if customer_id is None else self._index.get(customer_id, [])
+        end = len(keys) if before is None else bisect_left(keys, before)
+        for i in range(end - 1, -1, -1):
+            timestamp, order_id, offset = keys[i]
+            yield (timestamp, order_id), self._read_at(offset)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,402 @@
+# order_file.py
+
+"""
+Order File Format
+-----------------
+A compact, append-only binary format for long-term order retention that
+reporting code can scan through a memory map without building Order objects.
+
+File layout (all integers little-endian):
+
+    file header : magic "ORDF", format version, rows per block
+    block*      : block header (row count, item count, string table size,
+                  min/max timestamp), fixed-width order rows, fixed-width
+                  line items, then the block's UTF-8 string table
+    footer      : one directory entry per block (offset, rows, min/max
+                  timestamp), followed by a trailer pointing at the footer
+
+Line items reference the product by ID, with the name and category the
+product had when it was ordered (interned in the block's string table).
+String references are 32-bit offset/length pairs, so long addresses or
+names never overflow a field.
+
+Rows inside a block are sorted by timestamp, and the directory doubles as a
+sparse timestamp index: date-range scans skip every block whose min/max
+range misses the query and binary-search the first matching row inside
+each remaining block. Reopening a file for append truncates the footer,
+adds new blocks and writes a fresh footer on close; if the footer is
+missing (e.g. after a crash) readers rebuild the directory by walking the
+block headers.
+"""
+
+import os
+import mmap
+import struct
+import datetime
+from bisect import bisect_left
+
+from models import LineItem, ProductSnapshots
+from exceptions import InvalidInputError
+
+MAGIC = b"ORDF"
+FOOTER_MAGIC = b"ORDX"
+FORMAT_VERSION = 2
+DEFAULT_BLOCK_ROWS = 1024
+
+_FILE_HEADER = struct.Struct("<4sHI")          # magic, format version, rows per block
+_BLOCK_HEADER = struct.Struct("<4sIIIdd")      # magic, rows, items, strings size, min ts, max ts
+_ROW = struct.Struct("<IIIIIIII2sdddII")       # order id, customer, address, status (off/len), state,
+                                               # timestamp, total, tax, first item, item count
+_ITEM = struct.Struct("<IIIIIIdI")             # product id, name, category (off/len), price, quantity
+_DIRECTORY_ENTRY = struct.Struct("<QIdd")      # block offset, rows, min ts, max ts
+_TRAILER = struct.Struct("<QI4s")              # footer offset, block count, magic
+_BLOCK_MAGIC = b"BLK0"
+
+_TIMESTAMP_OFFSET = struct.calcsize("<IIIIIIII2s")  # Byte offset of the timestamp inside a row
+
+
+class OrderView:
+    """Lightweight, read-only view of one order row inside a mapped block."""
+    __slots__ = ("_reader", "_block", "_row")
+
+    def __init__(self, reader, block, row):
+        self._reader = reader
+        self._block = block
+        self._row = row
+
+    def _fields(self):
+        return _ROW.unpack_from(self._reader._map, self._block.row_offset(self._row))
+
+    @property
+    def order_id(self):
+        off, length = self._fields()[0:2]
+        return self._block.text(off, length)
+
+    @property
+    def customer_id(self):
+        off, length = self._fields()[2:4]
+        return self._block.text(off, length)
+
+    @property
+    def address(self):
+        off, length = self._fields()[4:6]
+        return self._block.text(off, length)
+
+    @property
+    def status(self):
+        off, length = self._fields()[6:8]
+        return self._block.text(off, length)
+
+    @property
+    def state_code(self):
+        return self._fields()[8].decode("ascii").strip()
+
+    @property
+    def timestamp(self):
+        return datetime.datetime.fromtimestamp(self._fields()[9])
+
+    @property
+    def total_price(self):
+        return self._fields()[10]
+
+    @property
+    def tax(self):
+        return self._fields()[11]
+
+    @property
+    def items(self):
+        first, count = self._fields()[12:14]
+        reader, block = self._reader, self._block
+        items = []
+        for i in range(first, first + count):
+            fields = _ITEM.unpack_from(reader._map, block.item_offset(i))
+            product_id, name, category = block.text(*fields[0:2]), block.text(*fields[2:4]), block.text(*fields[4:6])
+            items.append(LineItem(product_id, fields[6], fields[7], reader.snapshots.intern(product_id, name, category)))
+        return items
+
+
+class _Block:
+    """Directory entry plus the offsets needed to address rows inside a block."""
+    __slots__ = ("reader", "offset", "rows", "items", "min_ts", "max_ts", "_rows_at", "_items_at", "_strings_at")
+
+    def __init__(self, reader, offset):
+        magic, rows, items, _, min_ts, max_ts = _BLOCK_HEADER.unpack_from(reader._map, offset)
+        if magic != _BLOCK_MAGIC:
+            raise InvalidInputError(f"Corrupt order file block at offset {offset}.")
+        self.reader = reader
+        self.offset = offset
+        self.rows = rows
+        self.items = items
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self._rows_at = offset + _BLOCK_HEADER.size
+        self._items_at = self._rows_at + rows * _ROW.size
+        self._strings_at = self._items_at + items * _ITEM.size
+
+    def end(self):
+        _, _, _, strings_size, _, _ = _BLOCK_HEADER.unpack_from(self.reader._map, self.offset)
+        return self._strings_at + strings_size
+
+    def row_offset(self, row):
+        return self._rows_at + row * _ROW.size
+
+    def item_offset(self, item):
+        return self._items_at + item * _ITEM.size
+
+    def timestamp(self, row):
+        return struct.unpack_from("<d", self.reader._map, self.row_offset(row) + _TIMESTAMP_OFFSET)[0]
+
+    def text(self, offset, length):
+        start = self._strings_at + offset
+        return self.reader._map[start:start + length].decode("utf-8")
+
+    def first_row_at_or_after(self, ts):
+        """Binary search over the block's (sorted) row timestamps."""
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+def _encode_block(orders):
+    orders = sorted(orders, key=lambda o: o.timestamp)
+    strings = bytearray()
+    interned = {}
+
+    def put(text):
+        if text in interned:
+            return interned[text]
+        data = str(text).encode("utf-8")
+        ref = (len(strings), len(data))
+        strings.extend(data)
+        interned[text] = ref
+        return ref
+
+    rows = bytearray()
+    items = bytearray()
+    item_count = 0
+    for o in orders:
+        first_item = item_count
+        for item in o.items:
+            items += _ITEM.pack(*put(item.product_id or ""), *put(item.name), *put(item.category or ""),
+                                float(item.price), int(item.quantity))
+            item_count += 1
+        rows += _ROW.pack(*put(o.order_id), *put(o.customer_id), *put(o.address), *put(o.status),
+                          (o.state_code or "").encode("ascii")[:2].ljust(2), o.timestamp.timestamp(),
+                          float(o.total_price), float(o.tax), first_item, len(o.items))
+    min_ts = orders[0].timestamp.timestamp()
+    max_ts = orders[-1].timestamp.timestamp()
+    header = _BLOCK_HEADER.pack(_BLOCK_MAGIC, len(orders), item_count, len(strings), min_ts, max_ts)
+    return header + bytes(rows) + bytes(items) + bytes(strings), min_ts, max_ts
+
+
+class OrderFileWriter:
+    """Appends orders to an order file in fixed-size, time-sorted blocks."""
+    def __init__(self, path, block_rows=DEFAULT_BLOCK_ROWS):
+        if block_rows <= 0:
+            raise InvalidInputError("Block size must be positive.")
+        self.path = path
+        self._pending = []
+        self._directory = []
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            with OrderFileReader(path) as reader:
+                if reader.version != FORMAT_VERSION:
+                    self._file.close()
+                    raise InvalidInputError(f"'{path}' uses order file format {reader.version}; write new orders to a new file.")
+                self.block_rows = reader.block_rows
+                self._directory = [(b.offset, b.rows, b.min_ts, b.max_ts) for b in reader.blocks]
+                data_end = reader.data_end
+            self._file.truncate(data_end)
+            self._file.seek(data_end)
+        else:
+            self.block_rows = block_rows
+            self._file.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION, block_rows))
+
+    def append(self, order):
+        self._pending.append(order)
+        if len(self._pending) >= self.block_rows:
+            self.flush()
+
+    def extend(self, orders):
+        for order in orders:
+            self.append(order)
+
+    def flush(self):
+        """Write buffered orders as a new block (no footer until close)."""
+        if not self._pending:
+            return
+        payload, min_ts, max_ts = _encode_block(self._pending)
+        offset = self._file.tell()
+        self._file.write(payload)
+        self._directory.append((offset, len(self._pending), min_ts, max_ts))
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        footer_offset = self._file.tell()
+        for entry in self._directory:
+            self._file.write(_DIRECTORY_ENTRY.pack(*entry))
+        self._file.write(_TRAILER.pack(footer_offset, len(self._directory), FOOTER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OrderFileReader:
+    """Memory-mapped reader with block skipping for date-range scans."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.path.getsize(path)
+        if size < _FILE_HEADER.size:
+            self._file.close()
+            raise InvalidInputError(f"'{path}' is not an order file.")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, self.block_rows = _FILE_HEADER.unpack_from(self._map, 0)
+        self.snapshots = ProductSnapshots()  # Shared by the line items of every view
+        if magic != MAGIC or self.version != FORMAT_VERSION:
+            self.close()
+            raise InvalidInputError(f"'{path}' is not a supported order file.")
+        self.blocks = self._read_footer(size)
+        if self.blocks is None:
+            self.blocks = self._scan_blocks(size)
+        self.data_end = self.blocks[-1].end() if self.blocks else _FILE_HEADER.size
+        # Blocks written in time order allow bisecting the sparse index
+        self._sorted = all(a.max_ts <= b.min_ts for a, b in zip(self.blocks, self.blocks[1:]))
+        self._block_min = [b.min_ts for b in self.blocks]
+
+    def _read_footer(self, size):
+        if size < _FILE_HEADER.size + _TRAILER.size:
+            return None
+        footer_offset, count, magic = _TRAILER.unpack_from(self._map, size - _TRAILER.size)
+        if magic != FOOTER_MAGIC or footer_offset + count * _DIRECTORY_ENTRY.size + _TRAILER.size != size:
+            return None
+        blocks = []
+        for i in range(count):
+            offset = _DIRECTORY_ENTRY.unpack_from(self._map, footer_offset + i * _DIRECTORY_ENTRY.size)[0]
+            blocks.append(_Block(self, offset))
+        return blocks
+
+    def _scan_blocks(self, size):
+        blocks = []
+        offset = _FILE_HEADER.size
+        while offset + _BLOCK_HEADER.size <= size and self._map[offset:offset + 4] == _BLOCK_MAGIC:
+            block = _Block(self, offset)
+            if block.end() > size:
+                break  # Partially written block
+            blocks.append(block)
+            offset = block.end()
+        return blocks
+
+    def __len__(self):
+        return sum(b.rows for b in self.blocks)
+
+    def _candidate_blocks(self, start_ts, end_ts):
+        blocks = self.blocks
+        if self._sorted and start_ts is not None:
+            first = max(bisect_left(self._block_min, start_ts) - 1, 0)
+            blocks = blocks[first:]
+        for block in blocks:
+            if start_ts is not None and block.max_ts < start_ts:
+                continue
+            if end_ts is not None and block.min_ts >= end_ts:
+                if self._sorted:
+                    break
+                continue
+            yield block
+
+    def _rows(self, start=None, end=None):
+        start_ts = start.timestamp() if start is not None else None
+        end_ts = end.timestamp() if end is not None else None
+        for block in self._candidate_blocks(start_ts, end_ts):
+            row = block.first_row_at_or_after(start_ts) if start_ts is not None else 0
+            while row < block.rows:
+                if end_ts is not None and block.timestamp(row) >= end_ts:
+                    break
+                yield block, row
+                row += 1
+
+    def scan(self, start=None, end=None):
+        """
+        Stream orders with start <= timestamp < end.
+
+        Args:
+            start (datetime): Inclusive lower bound (None for no bound)
+            end (datetime): Exclusive upper bound (None for no bound)
+
+        Yields:
+            OrderView: Lazily decoded order rows
+        """
+        for block, row in self._rows(start, end):
+            yield OrderView(self, block, row)
+
+    def revenue_and_item_range(self, block, first_row, end_row):
+        """
+        Order totals of a block's rows [first_row, end_row), read without building views.
+
+        Returns:
+            tuple: (list of total prices, first line item, end line item) where the
+            item range [first, end) covers exactly the lines of those rows
+        """
+        if first_row >= end_row:
+            return [], 0, 0
+        rows = memoryview(self._map)[block.row_offset(first_row):block.row_offset(end_row)]
+        try:
+            fields = list(_ROW.iter_unpack(rows))
+        finally:
+            rows.release()
+        return [f[10] for f in fields], fields[0][12], fields[-1][12] + fields[-1][13]
+
+    def product_quantities(self, block, first_item, end_item):
+        """
+        Units per product over a block's line items [first_item, end_item).
+
+        Lines are grouped by their string-table references first, so each
+        product ID and name is decoded once per block.
+
+        Returns:
+            dict: product_id -> (name, units); the name is the one the last group carried
+        """
+        by_ref = {}
+        items = memoryview(self._map)[block.item_offset(first_item):block.item_offset(end_item)]
+        try:
+            for id_offset, id_length, name_offset, name_length, _, _, _, quantity in _ITEM.iter_unpack(items):
+                key = (id_offset, id_length, name_offset, name_length)
+                by_ref[key] = by_ref.get(key, 0) + quantity
+        finally:
+            items.release()
+        quantities = {}
+        for (id_offset, id_length, name_offset, name_length), quantity in by_ref.items():
+            product_id = block.text(id_offset, id_length)
+            units = quantities[product_id][1] if product_id in quantities else 0
+            quantities[product_id] = (block.text(name_offset, name_length), units + quantity)
+        return quantities
+
+    def total_revenue(self, start=None, end=None):
+        """Sum of order totals in a date range, read straight from the mapped rows."""
+        total = 0.0
+        for block, row in self._rows(start, end):
+            total += _ROW.unpack_from(self._map, block.row_offset(row))[10]
+        return total
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,212 @@
+# parallel_reports.py
+
+"""
+Parallel Reports
+----------------
+Map-reduce versions of the revenue and most-ordered-product reports over an
+order file (order_file.py), for histories too large to scan on one core.
+
+- The file's blocks are split into partitions of roughly equal row counts.
+  Each partition is scanned in a worker process that maps the file itself,
+  so only the small partial aggregates (revenue, order count, units per
+  product ID) cross process boundaries.
+- Partials are merged in partition order, so the most-ordered product and
+  its tie-breaking (among tied products, the one that appears first in the
+  file) match a sequential scan exactly.
+- Revenue is summed exactly and rounded once, so it does not depend on how
+  the file was partitioned or how many workers ran.
+
+    python parallel_reports.py bench [--items 5000000] [--workers 1,2,4,8]
+"""
+
+import os
+import sys
+import time
+import math
+import random
+import argparse
+import itertools
+import datetime
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from models import LineItem, ProductSnapshots
+from order_file import OrderFileWriter, OrderFileReader
+from exceptions import InvalidInputError
+
+
+def _add_exact(partials, value):
+    """Adds value to a list of non-overlapping float partials (Shewchuk), keeping the sum exact."""
+    i = 0
+    for other in partials:
+        if abs(value) < abs(other):
+            value, other = other, value
+        high = value + other
+        low = other - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+class ReportTotals:
+    """Partial or merged report aggregates."""
+    def __init__(self):
+        self.revenue_partials = []
+        self.orders = 0
+        self.item_quantities = {}  # product ID -> units, in order of first appearance
+        self.names = {}            # product ID -> name it was last ordered under
+
+    @property
+    def revenue(self):
+        return math.fsum(self.revenue_partials)
+
+    def merge(self, other):
+        for partial in other.revenue_partials:
+            _add_exact(self.revenue_partials, partial)
+        self.orders += other.orders
+        quantities = self.item_quantities
+        for name, quantity in other.item_quantities.items():
+            quantities[name] = quantities.get(name, 0) + quantity
+        self.names.update(other.names)  # Later partitions hold later orders
+
+    def most_ordered_product(self):
+        if not self.item_quantities:
+            return "N/A"
+        top = max(self.item_quantities, key=self.item_quantities.get)
+        return self.names.get(top, top)
+
+
+def _scan_partition(path, first_block, last_block, start_ts=None, end_ts=None):
+    """Worker: aggregates blocks [first_block, last_block) of an order file."""
+    totals = ReportTotals()
+    with OrderFileReader(path) as reader:
+        for block in reader.blocks[first_block:last_block]:
+            first_row = block.first_row_at_or_after(start_ts) if start_ts is not None else 0
+            end_row = block.first_row_at_or_after(end_ts) if end_ts is not None else block.rows
+            if first_row >= end_row:
+                continue
+            revenues, first_item, end_item = reader.revenue_and_item_range(block, first_row, end_row)
+            for revenue in revenues:
+                _add_exact(totals.revenue_partials, revenue)
+            totals.orders += end_row - first_row
+
+            quantities = totals.item_quantities
+            for product_id, (name, units) in reader.product_quantities(block, first_item, end_item).items():
+                totals.names[product_id] = name
+                quantities[product_id] = quantities.get(product_id, 0) + units
+    return totals
+
+
+def partition_blocks(blocks, partitions):
+    """Splits blocks into at most `partitions` contiguous (first, last) ranges of similar row counts."""
+    total = sum(b.rows for b in blocks)
+    ranges = []
+    first = rows = 0
+    for i, block in enumerate(blocks):
+        rows += block.rows
+        if rows * partitions >= total * (len(ranges) + 1) or i == len(blocks) - 1:
+            ranges.append((first, i + 1))
+            first = i + 1
+    return ranges
+
+
+def order_file_report(path, start=None, end=None, workers=None, partitions_per_worker=4):
+    """
+    Revenue, order count and units per product for an order file.
+
+    Args:
+        path (str): Order file
+        start, end (datetime): Optional date range (start inclusive, end exclusive)
+        workers (int): Worker processes (default: CPU count); 1 scans in this process
+        partitions_per_worker (int): More partitions than workers evens out skew
+
+    Returns:
+        ReportTotals: Merged totals
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1 or partitions_per_worker < 1:
+        raise InvalidInputError("Worker and partition counts must be positive.")
+    with OrderFileReader(path) as reader:
+        ranges = partition_blocks(reader.blocks, workers * partitions_per_worker if workers > 1 else 1)
+    start_ts = start.timestamp() if start is not None else None
+    end_ts = end.timestamp() if end is not None else None
+
+    result = ReportTotals()
+    if workers == 1:
+        partials = (_scan_partition(path, first, last, start_ts, end_ts) for first, last in ranges)
+        for partial in partials:
+            result.merge(partial)
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_scan_partition, path, first, last, start_ts, end_ts) for first, last in ranges]
+        for future in futures:  # Merge in partition order
+            result.merge(future.result())
+    return result
+
+
+# --- Benchmark ---
+class _BenchOrder:
+    __slots__ = ("order_id", "customer_id", "address", "status", "state_code", "timestamp", "total_price", "tax", "items")
+
+
+def write_bench_file(path, line_items, items_per_order=3, products=5000, seed=1):
+    """Writes a synthetic order file with about `line_items` line items."""
+    rng = random.Random(seed)
+    snapshots = ProductSnapshots()
+    catalog = [(f"P{i:05d}", 10.0 + i % 90, snapshots.intern(f"P{i:05d}", f"Product {i:05d}", "Bench"))
+               for i in range(products)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(products)))  # Zipf-like popularity
+    base = datetime.datetime(2020, 1, 1).timestamp()
+    with OrderFileWriter(path, block_rows=4096) as writer:
+        for i in range(max(line_items // items_per_order, 1)):
+            order = _BenchOrder()
+            order.order_id, order.customer_id, order.address = f"O{i:09d}", f"c{rng.randrange(100000)}", "1 Main St"
+            order.status, order.state_code = "Delivered", "PA"
+            order.timestamp = datetime.datetime.fromtimestamp(base + i * 30)
+            order.items = [LineItem(product_id, price, rng.randint(1, 3), snapshot)
+                           for product_id, price, snapshot in rng.choices(catalog, cum_weights=cum_weights, k=items_per_order)]
+            order.tax = 0.0
+            order.total_price = round(sum(item.total for item in order.items), 2)
+            writer.append(order)
+
+
+def run_benchmark(line_items, worker_counts, out=sys.stdout):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.ordf")
+        started = time.perf_counter()
+        write_bench_file(path, line_items)
+        print(f"Wrote {line_items:,} line items in {time.perf_counter() - started:.1f}s", file=out)
+        baseline = reference = None
+        for workers in worker_counts:
+            started = time.perf_counter()
+            totals = order_file_report(path, workers=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            summary = (totals.revenue, totals.orders, totals.most_ordered_product())
+            reference = reference or summary
+            match = "same result" if summary == reference else "RESULT MISMATCH"
+            print(f"{workers:>3} worker(s): {elapsed:7.2f}s  speedup {baseline / elapsed:5.2f}x  ({match})", file=out)
+        return reference
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="parallel_reports.py", description="Parallel order file reports.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench", help="Time the report with increasing worker counts")
+    bench.add_argument("--items", type=int, default=5_000_000, help="Line items to generate (e.g. 50000000)")
+    bench.add_argument("--workers", default=None, help="Comma-separated worker counts (default: 1,2,4,... up to CPUs)")
+    args = parser.parse_args(argv)
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= (os.cpu_count() or 1):
+            worker_counts.append(worker_counts[-1] * 2)
+    run_benchmark(args.items, worker_counts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
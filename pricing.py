@@ -0,0 +1,257 @@
+# pricing.py
+
+"""
+Price History and Scheduled Price Changes
+-----------------------------------------
+Keeps every price a product has had and applies planned price changes
+(sales, category-wide repricing) when they take effect.
+
+- Each product has a PriceTimeline: effective times and prices in two
+  parallel sorted lists. "What did this cost at time T" is a binary search,
+  and recording a change (almost always the newest) is an append.
+- ProductManager records a product's first price and every change, so the
+  history covers edits, bulk repricing and scheduled changes alike.
+- PriceScheduler holds future changes in a heap ordered by effective time.
+  A change sets one product's price or changes a whole category by a
+  percentage (ProductManager.reprice_category). run_due() applies everything
+  that has come due through ProductManager, so the usual events, versions
+  and indexes are updated; the GUI calls it once a second. History records
+  when a change was actually applied, since that is when orders started
+  paying the new price.
+"""
+
+import time
+import heapq
+import datetime
+import itertools
+import threading
+from bisect import bisect_left, bisect_right
+
+from exceptions import ECommerceError, InvalidInputError, ProductNotFoundError
+
+
+def _timestamp(moment, clock=time.time):
+    """Epoch seconds for a datetime or number; now when None."""
+    if moment is None:
+        return clock()
+    if isinstance(moment, datetime.datetime):
+        return moment.timestamp()
+    return float(moment)
+
+
+def validate_price(price):
+    try:
+        price = float(price)
+    except (ValueError, TypeError):
+        raise InvalidInputError("Price must be a valid number.")
+    if price < 0:
+        raise InvalidInputError("Price cannot be negative.")
+    return price
+
+
+def validate_percent_change(percent):
+    try:
+        percent = float(percent)
+    except (ValueError, TypeError):
+        raise InvalidInputError("Percentage change must be a number.")
+    if percent <= -100:
+        raise InvalidInputError("Percentage change must be greater than -100.")
+    return percent
+
+
+class PriceTimeline:
+    """Effective-dated prices of one product, oldest first."""
+    __slots__ = ("times", "prices")
+
+    def __init__(self):
+        self.times = []   # Epoch seconds, ascending
+        self.prices = []
+
+    def record(self, effective, price):
+        i = bisect_right(self.times, effective)
+        if i and self.prices[i - 1] == price:
+            return  # Already the price at that time
+        self.times.insert(i, effective)
+        self.prices.insert(i, price)
+
+    def price_at(self, effective):
+        i = bisect_right(self.times, effective)
+        return self.prices[i - 1] if i else None
+
+    def entries(self, start=None, end=None):
+        """[(epoch seconds, price)] changed before end, starting with the one in effect at start."""
+        first = 0 if start is None else max(bisect_right(self.times, start) - 1, 0)
+        last = len(self.times) if end is None else bisect_left(self.times, end)
+        return list(zip(self.times[first:last], self.prices[first:last]))
+
+    def __len__(self):
+        return len(self.times)
+
+
+class PriceHistory:
+    """Price timelines for a catalog, kept by ProductManager."""
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._timelines = {}  # product_id -> PriceTimeline
+
+    def record(self, product_id, price, effective=None):
+        timeline = self._timelines.get(product_id)
+        if timeline is None:
+            timeline = self._timelines[product_id] = PriceTimeline()
+        timeline.record(_timestamp(effective, self.clock), price)
+
+    def price_at(self, product_id, when):
+        """The product's price at a datetime (or epoch seconds), or None before its first recorded price."""
+        timeline = self._timelines.get(product_id)
+        return timeline.price_at(_timestamp(when, self.clock)) if timeline else None
+
+    def history(self, product_id, start=None, end=None):
+        """[(datetime, price)] for a product; the first entry is the price in effect at start."""
+        timeline = self._timelines.get(product_id)
+        if timeline is None:
+            return []
+        start = None if start is None else _timestamp(start)
+        end = None if end is None else _timestamp(end)
+        return [(datetime.datetime.fromtimestamp(ts), price) for ts, price in timeline.entries(start, end)]
+
+    def entries(self):
+        """Every (product_id, epoch seconds, price), for persistence."""
+        for product_id, timeline in self._timelines.items():
+            for ts, price in zip(timeline.times, timeline.prices):
+                yield product_id, ts, price
+
+    def __len__(self):
+        return sum(len(timeline) for timeline in self._timelines.values())
+
+
+# Scheduled change states
+PENDING = "pending"
+APPLIED = "applied"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class ScheduledPriceChange:
+    """A price for one product, or a percentage change for a category, that takes effect later."""
+    def __init__(self, change_id, effective, product_id=None, price=None, category=None, percent=None):
+        self.change_id = change_id
+        self.effective = effective  # Epoch seconds
+        self.product_id = product_id
+        self.price = price
+        self.category = category
+        self.percent = percent
+        self.status = PENDING
+        self.error = None
+
+    def describe(self):
+        when = datetime.datetime.fromtimestamp(self.effective).strftime("%Y-%m-%d %H:%M")
+        if self.category is not None:
+            return f"{when}: {self.category} {self.percent:+g}%"
+        return f"{when}: {self.product_id} -> ${self.price:.2f}"
+
+    def __lt__(self, other):
+        return (self.effective, self.change_id) < (other.effective, other.change_id)
+
+
+class PriceScheduler:
+    """Applies scheduled price changes to a ProductManager when they come due."""
+    def __init__(self, product_manager, clock=time.time):
+        self.product_manager = product_manager
+        self.clock = clock
+        self._heap = []      # Pending changes by effective time (cancelled ones are skipped when popped)
+        self._changes = {}   # change_id -> pending ScheduledPriceChange
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def schedule_price(self, product_id, price, effective):
+        """Sets a product's price at a future datetime (or epoch seconds)."""
+        if product_id not in self.product_manager.products:
+            raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+        return self._add(_timestamp(effective, self.clock), product_id=product_id, price=validate_price(price))
+
+    def schedule_reprice(self, category, percent, effective):
+        """Changes every price in a category by percent (e.g. -20 for 20% off) at a future time."""
+        if not category:
+            raise InvalidInputError("Category cannot be empty.")
+        return self._add(_timestamp(effective, self.clock), category=category, percent=validate_percent_change(percent))
+
+    def _add(self, effective, **change):
+        with self._lock:
+            scheduled = ScheduledPriceChange(next(self._ids), effective, **change)
+            self._changes[scheduled.change_id] = scheduled
+            heapq.heappush(self._heap, scheduled)
+        return scheduled
+
+    def cancel(self, change_id):
+        with self._lock:
+            scheduled = self._changes.get(change_id)
+            if scheduled is None:
+                raise InvalidInputError(f"No pending price change #{change_id}.")
+            scheduled.status = CANCELLED
+            del self._changes[change_id]
+
+    def pending(self, product_id=None):
+        """Pending changes (for one product, including category changes that cover it), soonest first."""
+        category = None
+        if product_id is not None:
+            product = self.product_manager.products.get(product_id)
+            category = product.category if product else None
+        with self._lock:
+            changes = list(self._changes.values())
+        if product_id is not None:
+            changes = [c for c in changes if c.product_id == product_id or (c.category is not None and c.category == category)]
+        return sorted(changes)
+
+    def next_due(self):
+        """Effective time (epoch seconds) of the next pending change, or None."""
+        with self._lock:
+            while self._heap and self._heap[0].status != PENDING:
+                heapq.heappop(self._heap)
+            return self._heap[0].effective if self._heap else None
+
+    def price_at(self, product_id, when):
+        """A product's price at any time: recorded history for the past, plus pending changes for the future."""
+        ts = _timestamp(when, self.clock)
+        now = self.clock()
+        if ts <= now:
+            return self.product_manager.price_history.price_at(product_id, ts)
+        product = self.product_manager.products.get(product_id)
+        if product is None:
+            return None
+        price = product.price
+        for change in self.pending(product_id):
+            if change.effective > ts:
+                break
+            price = change.price if change.category is None else round(price * (1 + change.percent / 100), 2)
+        return price
+
+    def run_due(self, now=None):
+        """
+        Applies every pending change whose effective time has passed, oldest first.
+
+        Returns:
+            list: The ScheduledPriceChange objects processed (status APPLIED or FAILED)
+        """
+        now = self.clock() if now is None else _timestamp(now)
+        pm = self.product_manager
+        processed = []
+        while True:
+            with self._lock:
+                if not self._heap or self._heap[0].effective > now:
+                    break
+                change = heapq.heappop(self._heap)
+                if change.status != PENDING:
+                    continue
+                del self._changes[change.change_id]
+            try:
+                if change.category is not None:
+                    pm.reprice_category(change.category, change.percent)
+                else:
+                    product = pm.get_product(change.product_id)
+                    pm.update_product(product.product_id, product.name, product.category, change.price)
+                change.status = APPLIED
+            except ECommerceError as e:
+                change.status = FAILED  # E.g. the product was deleted after the change was scheduled
+                change.error = e
+            processed.append(change)
+        return processed
@@ -0,0 +1,290 @@
+# promotions.py
+
+"""
+Promotions Engine
+-----------------
+Evaluates discounts for a shopping cart from a set of promotion rules.
+
+Rules are compiled into indexes (by product ID, by category, by discount code
+and by state for cart-wide rules) so that evaluating a cart only touches the
+rules that can apply to the items actually in it. Results are memoized per
+cart version, and a new rule set can be swapped in at any time without
+disturbing evaluations that are already running.
+
+Stacking policy:
+    - Each cart line gets the single best line-level discount (percent off or
+      buy-X-get-Y) among its applicable rules.
+    - The single best cart-level discount (cart-wide percent or spend tier) is
+      then applied to the subtotal remaining after line discounts.
+"""
+
+import datetime
+import threading
+from collections import OrderedDict, defaultdict
+
+from exceptions import InvalidInputError
+
+MEMO_SIZE = 1024
+
+
+class Promotion:
+    """Base class for promotion rules. Optional restrictions apply to every rule type."""
+    # Cart-level rules discount the whole cart; others discount individual lines
+    cart_level = False
+
+    def __init__(self, promo_id, name, code=None, start=None, end=None, states=None,
+                 product_ids=None, categories=None):
+        if not promo_id or not isinstance(promo_id, str):
+            raise InvalidInputError("Promotion ID must be a non-empty string.")
+        if start and end and end <= start:
+            raise InvalidInputError("Promotion end must be after its start.")
+        self.promo_id = promo_id
+        self.name = name or promo_id
+        self.code = code.strip().upper() if code else None
+        self.start = start
+        self.end = end
+        self.states = frozenset(s.upper() for s in states) if states else None
+        self.product_ids = frozenset(product_ids) if product_ids else None
+        self.categories = frozenset(categories) if categories else None
+
+    def is_active(self, now):
+        return (self.start is None or self.start <= now) and (self.end is None or now < self.end)
+
+    def applies_to_state(self, state_code):
+        return self.states is None or (state_code or "").upper() in self.states
+
+    def applies_to(self, product):
+        if self.product_ids is None and self.categories is None:
+            return True
+        return ((self.product_ids is not None and product.product_id in self.product_ids) or
+                (self.categories is not None and product.category in self.categories))
+
+    def line_discount(self, product, quantity):
+        return 0.0
+
+    def cart_discount(self, subtotal):
+        return 0.0
+
+
+def _validate_percent(percent):
+    try:
+        percent = float(percent)
+    except (ValueError, TypeError):
+        raise InvalidInputError("Discount percent must be a number.")
+    if not 0 < percent <= 100:
+        raise InvalidInputError("Discount percent must be between 0 and 100.")
+    return percent
+
+
+class PercentOffPromotion(Promotion):
+    """Percent off matching products/categories, or off the whole cart if unscoped."""
+    def __init__(self, promo_id, name, percent, **options):
+        super().__init__(promo_id, name, **options)
+        self.percent = _validate_percent(percent)
+        self.cart_level = self.product_ids is None and self.categories is None
+
+    def line_discount(self, product, quantity):
+        return product.price * quantity * self.percent / 100
+
+    def cart_discount(self, subtotal):
+        return subtotal * self.percent / 100
+
+
+class TieredPromotion(Promotion):
+    """Spend-based tiers, e.g. [(100, 5), (250, 10)] = 5% over $100, 10% over $250."""
+    cart_level = True
+
+    def __init__(self, promo_id, name, tiers, **options):
+        super().__init__(promo_id, name, **options)
+        if not tiers:
+            raise InvalidInputError("Tiered promotion needs at least one tier.")
+        self.tiers = sorted((float(minimum), _validate_percent(percent)) for minimum, percent in tiers)
+
+    def cart_discount(self, subtotal):
+        percent = 0.0
+        for minimum, tier_percent in self.tiers:
+            if subtotal >= minimum:
+                percent = tier_percent
+        return subtotal * percent / 100
+
+
+class BuyXGetYPromotion(Promotion):
+    """Buy `buy` units, get `get` more at `percent` off (100 = free), per matching line."""
+    def __init__(self, promo_id, name, buy, get, percent=100, **options):
+        super().__init__(promo_id, name, **options)
+        if int(buy) <= 0 or int(get) <= 0:
+            raise InvalidInputError("Buy and get quantities must be positive.")
+        if self.product_ids is None and self.categories is None:
+            raise InvalidInputError("Buy-X-get-Y promotions must target products or categories.")
+        self.buy = int(buy)
+        self.get = int(get)
+        self.percent = _validate_percent(percent)
+
+    def line_discount(self, product, quantity):
+        discounted_units = (quantity // (self.buy + self.get)) * self.get
+        return product.price * discounted_units * self.percent / 100
+
+
+class PromotionResult:
+    """Discount breakdown for one cart evaluation."""
+    def __init__(self, subtotal, line_discounts, cart_promotion, cart_discount, applied):
+        self.subtotal = subtotal
+        self.line_discounts = line_discounts  # product_id -> discount amount
+        self.cart_promotion = cart_promotion
+        self.cart_discount = cart_discount
+        self.applied = applied                # [(promo_id, name, amount)]
+        self.discount = sum(line_discounts.values()) + cart_discount
+        self.discounted_subtotal = subtotal - self.discount
+
+
+class _RuleSet:
+    """Immutable compiled indexes for one version of the rules."""
+    def __init__(self, promotions, version):
+        self.version = version
+        self.by_product = defaultdict(list)
+        self.by_category = defaultdict(list)
+        self.by_code = defaultdict(list)
+        self.cart_rules_by_state = defaultdict(list)
+        self.cart_rules_any_state = []
+        seen = set()
+        for promo in promotions:
+            if promo.promo_id in seen:
+                raise InvalidInputError(f"Duplicate promotion ID '{promo.promo_id}'.")
+            seen.add(promo.promo_id)
+            if promo.code:
+                # Code-gated rules are only reachable through their code
+                self.by_code[promo.code].append(promo)
+            elif promo.cart_level:
+                if promo.states is None:
+                    self.cart_rules_any_state.append(promo)
+                else:
+                    for state in promo.states:
+                        self.cart_rules_by_state[state].append(promo)
+            else:
+                for product_id in promo.product_ids or ():
+                    self.by_product[product_id].append(promo)
+                for category in promo.categories or ():
+                    self.by_category[category].append(promo)
+
+
+class PromotionEngine:
+    """Compiles promotion rules and evaluates carts against them."""
+    def __init__(self, promotions=()):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._memo = OrderedDict()
+        self.load_rules(promotions)
+
+    @property
+    def version(self):
+        return self._ruleset.version
+
+    def load_rules(self, promotions):
+        """Compile and atomically swap in a new rule set."""
+        with self._lock:
+            self._version += 1
+            version = self._version
+        ruleset = _RuleSet(list(promotions), version)  # Compile outside the lock
+        with self._lock:
+            if getattr(self, "_ruleset", None) is None or self._ruleset.version < version:
+                self._ruleset = ruleset
+                self._memo.clear()
+        return version
+
+    def get_code_promotion(self, code, now=None):
+        """Returns an active promotion for a discount code, or None."""
+        now = now or datetime.datetime.now()
+        for promo in self._ruleset.by_code.get((code or "").strip().upper(), ()):
+            if promo.is_active(now):
+                return promo
+        return None
+
+    def evaluate(self, cart, products, state_code=None, codes=(), now=None):
+        """
+        Evaluates all applicable promotions for a cart.
+
+        Args:
+            cart (ShoppingCart): Cart to price
+            products (dict): product_id -> Product lookup (e.g. ProductManager.products)
+            state_code (str): Shipping state, for state-restricted promotions
+            codes (iterable): Discount codes entered by the customer
+            now (datetime): Evaluation time (defaults to the current time)
+
+        Returns:
+            PromotionResult: Discount breakdown
+        """
+        now = now or datetime.datetime.now()
+        ruleset = self._ruleset  # Evaluate against one consistent rule set
+        codes = frozenset((c or "").strip().upper() for c in codes)
+        state = (state_code or "").upper()
+        lines = [(products[pid], qty) for pid, qty in cart.items.items() if pid in products]
+        contents = tuple((p.product_id, p.price, p.category, qty) for p, qty in lines)
+
+        key = (cart.customer_id, cart.version, codes, state, ruleset.version)
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None and entry[0] == contents and now < entry[1] and (entry[2] is None or now >= entry[2]):
+                self._memo.move_to_end(key)
+                return entry[3]
+
+        result, valid_from, valid_until = self._evaluate(ruleset, lines, state, codes, now)
+        with self._lock:
+            self._memo[key] = (contents, valid_until, valid_from, result)
+            if len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return result
+
+    def _evaluate(self, ruleset, lines, state, codes, now):
+        code_rules = [promo for code in codes for promo in ruleset.by_code.get(code, ())]
+        code_line_rules = [promo for promo in code_rules if not promo.cart_level]
+        # Track the window in which this result stays valid as rules start/end
+        boundaries = []
+
+        def usable(promo):
+            for moment in (promo.start, promo.end):
+                if moment is not None:
+                    boundaries.append(moment)
+            return promo.is_active(now) and promo.applies_to_state(state)
+
+        subtotal = 0.0
+        line_discounts = {}
+        applied = defaultdict(float)
+        names = {}
+        for product, quantity in lines:
+            subtotal += product.price * quantity
+            candidates = ruleset.by_product.get(product.product_id, []) + ruleset.by_category.get(product.category, [])
+            best, best_amount = None, 0.0
+            for promo in candidates + [p for p in code_line_rules if p.applies_to(product)]:
+                if usable(promo):
+                    amount = min(promo.line_discount(product, quantity), product.price * quantity)
+                    if amount > best_amount:
+                        best, best_amount = promo, amount
+            if best is not None:
+                line_discounts[product.product_id] = best_amount
+                applied[best.promo_id] += best_amount
+                names[best.promo_id] = best.name
+
+        remaining = subtotal - sum(line_discounts.values())
+        cart_candidates = (ruleset.cart_rules_any_state + ruleset.cart_rules_by_state.get(state, []) +
+                           [p for p in code_rules if p.cart_level])
+        cart_promo, cart_amount = None, 0.0
+        for promo in cart_candidates:
+            if usable(promo):
+                amount = min(promo.cart_discount(remaining), remaining)
+                if amount > cart_amount:
+                    cart_promo, cart_amount = promo, amount
+        if cart_promo is not None:
+            applied[cart_promo.promo_id] += cart_amount
+            names[cart_promo.promo_id] = cart_promo.name
+
+        valid_from = max((b for b in boundaries if b <= now), default=None)
+        valid_until = min((b for b in boundaries if b > now), default=datetime.datetime.max)
+        result = PromotionResult(subtotal, line_discounts, cart_promo, cart_amount,
+                                 [(pid, names[pid], amount) for pid, amount in applied.items()])
+        return result, valid_from, valid_until
+
+
+# Promotions available out of the box (matches the original DISCOUNT10 code)
+DEFAULT_PROMOTIONS = [
+    PercentOffPromotion("DISCOUNT10", "10% Off Everything", 10, code="DISCOUNT10"),
+]
@@ -0,0 +1,150 @@
+# recommendations.py
+
+"""
+Co-Purchase Recommendations
+---------------------------
+"Customers also bought" suggestions from which products are ordered together.
+
+- A sparse item-item co-occurrence matrix (product ID -> {product ID: orders
+  containing both}) is updated from every ORDER_PLACED event, so placing an
+  order costs O(lines^2) dictionary updates. Very large orders only pair
+  their first max_lines_per_order products.
+- Each product keeps a bounded list of its K most co-purchased neighbors.
+  Co-counts only grow, so a neighbor is swapped in exactly when its count
+  passes the smallest count in the list, and the list always holds a true
+  top K (ties broken arbitrarily).
+- Queries read the neighbor list, ranked by confidence (the share of orders
+  containing the product that also contained the neighbor), and skip deleted
+  or out-of-stock products, so they never touch the order history.
+- rebuild() recomputes everything from a full order history, e.g. an order
+  archive at startup.
+"""
+
+import heapq
+import itertools
+from collections import Counter, defaultdict
+
+from events import ORDER_PLACED
+from exceptions import InvalidInputError
+
+
+class CoPurchaseIndex:
+    """Incrementally maintained co-purchase counts with a top-K neighbor list per product."""
+    def __init__(self, product_manager=None, k=10, max_lines_per_order=50):
+        if k <= 0 or max_lines_per_order < 2:
+            raise InvalidInputError("Neighbor count must be positive and orders must pair at least 2 lines.")
+        self.product_manager = product_manager  # Optional; used to skip deleted and out-of-stock products
+        self.k = k
+        self.max_lines_per_order = max_lines_per_order
+        self.orders = 0
+        self._counts = defaultdict(dict)      # product_id -> {product_id: orders containing both}
+        self._orders_with = defaultdict(int)  # product_id -> orders containing it
+        self._neighbors = defaultdict(dict)   # product_id -> {product_id: co-count}, at most k entries
+        self._ranked = {}                     # product_id -> cached [(confidence, product_id)], best first
+        self._subscription = None
+
+    def attach(self, event_bus, batch_size=1):
+        """Consumes order events from an EventBus."""
+        self._subscription = event_bus.subscribe(self.handle_events, [ORDER_PLACED], batch_size=batch_size)
+        return self._subscription
+
+    def handle_events(self, events):
+        for event in events:
+            self.record([product_id for product_id, _, _, _ in event.data["lines"]])
+
+    def _distinct(self, product_ids):
+        return list(dict.fromkeys(pid for pid in product_ids if pid is not None))[:self.max_lines_per_order]
+
+    def record(self, product_ids):
+        """Adds one order, given the product IDs on its lines."""
+        products = self._distinct(product_ids)
+        self.orders += 1
+        for product_id in products:
+            self._orders_with[product_id] += 1
+            self._ranked.pop(product_id, None)  # Confidence changed for every neighbor
+        for a, b in itertools.permutations(products, 2):
+            row = self._counts[a]
+            count = row[b] = row.get(b, 0) + 1
+            self._offer(a, b, count)
+
+    def _offer(self, product_id, other, count):
+        neighbors = self._neighbors[product_id]
+        if other in neighbors or len(neighbors) < self.k:
+            neighbors[other] = count
+            return
+        weakest = min(neighbors, key=neighbors.get)
+        if count > neighbors[weakest]:
+            del neighbors[weakest]
+            neighbors[other] = count
+
+    # --- Offline Rebuild ---
+    def rebuild(self, orders):
+        """
+        Replaces all counts with ones computed from an order history.
+
+        Args:
+            orders (iterable): Order objects (e.g. OrderManager.get_all_orders() or an OrderArchive)
+        """
+        pair_counts = Counter()
+        orders_with = Counter()
+        total = 0
+        for order in orders:
+            products = self._distinct(item.key for item in order.items)
+            total += 1
+            orders_with.update(products)
+            pair_counts.update(itertools.permutations(products, 2))
+
+        counts = defaultdict(dict)
+        for (a, b), count in pair_counts.items():
+            counts[a][b] = count
+        self._counts = counts
+        self._orders_with = defaultdict(int, orders_with)
+        self._neighbors = defaultdict(dict, {
+            a: dict(heapq.nlargest(self.k, row.items(), key=lambda entry: entry[1])) for a, row in counts.items()
+        })
+        self._ranked = {}
+        self.orders = total
+
+    # --- Queries ---
+    def co_count(self, product_id, other):
+        """Orders that contained both products."""
+        return self._counts.get(product_id, {}).get(other, 0)
+
+    def neighbors(self, product_id):
+        """[(confidence, product_id)] for a product's top-K neighbors, best first."""
+        ranked = self._ranked.get(product_id)
+        if ranked is None:
+            base = self._orders_with.get(product_id)
+            if not base:
+                return []
+            ranked = self._ranked[product_id] = sorted(
+                ((count / base, other) for other, count in self._neighbors[product_id].items()),
+                key=lambda entry: (-entry[0], entry[1]))
+        return ranked
+
+    def _available(self, product_id, in_stock_only):
+        if self.product_manager is None:
+            return True
+        product = self.product_manager.products.get(product_id)
+        return product is not None and (not in_stock_only or product.quantity > 0)
+
+    def recommend(self, product_id, limit=5, exclude=(), in_stock_only=True):
+        """Product IDs most often bought with product_id, best first."""
+        results = []
+        for _, other in self.neighbors(product_id):
+            if other not in exclude and self._available(other, in_stock_only):
+                results.append(other)
+                if len(results) == limit:
+                    break
+        return results
+
+    def recommend_for_cart(self, product_ids, limit=5, in_stock_only=True):
+        """Product IDs to suggest for a cart: neighbors of its items, scored by summed confidence."""
+        in_cart = set(product_ids)
+        scores = defaultdict(float)
+        for product_id in in_cart:
+            for confidence, other in self.neighbors(product_id):
+                if other not in in_cart:
+                    scores[other] += confidence
+        ranked = sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [other for other, _ in ranked if self._available(other, in_stock_only)][:limit]
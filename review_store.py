@@ -0,0 +1,137 @@
+# review_store.py
+
+"""
+Review Store
+------------
+Keeps product reviews outside of Product objects so that popular products
+with many reviews don't bloat the catalog.
+
+- Reviews are appended to a single list; a review's ID is its position.
+- Each product has an ascending list of its review IDs, used for cursor
+  pagination (newest first) with binary search.
+- Running aggregates (review count, rating count and rating sum) are kept
+  per product so summaries are O(1).
+- A token index maps each word to the IDs of the reviews containing it, so
+  text search walks the shortest posting list and binary-searches the
+  others instead of scanning reviews.
+"""
+
+import re
+import datetime
+from bisect import bisect_left
+from collections import defaultdict
+
+from exceptions import InvalidInputError
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lower-cased word tokens of a review or query."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class Review:
+    """A single product review."""
+    __slots__ = ("review_id", "product_id", "username", "text", "rating", "timestamp")
+
+    def __init__(self, review_id, product_id, username, text, rating=None, timestamp=None):
+        self.review_id = review_id
+        self.product_id = product_id
+        self.username = username
+        self.text = text
+        self.rating = rating
+        self.timestamp = timestamp or datetime.datetime.now()
+
+
+class ReviewStore:
+    """Append-optimized review storage with pagination, aggregates and search."""
+    def __init__(self):
+        self._reviews = []
+        self._by_product = defaultdict(list)
+        self._stats = defaultdict(lambda: [0, 0, 0])  # product_id -> [count, rated, rating sum]
+        self._tokens = defaultdict(list)
+
+    def __len__(self):
+        return len(self._reviews)
+
+    def __iter__(self):
+        """Every review, oldest first."""
+        return iter(self._reviews)
+
+    def add(self, product_id, username, text, rating=None, timestamp=None):
+        """Appends a review and updates the indexes and aggregates (timestamp defaults to now)."""
+        if rating is not None:
+            try:
+                rating = int(rating)
+            except (ValueError, TypeError):
+                raise InvalidInputError("Rating must be a whole number from 1 to 5.")
+            if not 1 <= rating <= 5:
+                raise InvalidInputError("Rating must be a whole number from 1 to 5.")
+        review = Review(len(self._reviews), product_id, username, text, rating, timestamp)
+        self._reviews.append(review)
+        self._by_product[product_id].append(review.review_id)
+        stats = self._stats[product_id]
+        stats[0] += 1
+        if rating is not None:
+            stats[1] += 1
+            stats[2] += rating
+        for token in set(tokenize(text)):
+            self._tokens[token].append(review.review_id)
+        return review
+
+    def get_page(self, product_id, cursor=None, limit=20):
+        """
+        Returns one page of a product's reviews, newest first.
+
+        Args:
+            product_id (str): Product whose reviews to return
+            cursor (int): Cursor from the previous page (None for the first page)
+            limit (int): Maximum reviews per page
+
+        Returns:
+            tuple: (list of Review, next cursor or None)
+        """
+        if limit <= 0:
+            raise InvalidInputError("Page size must be positive.")
+        ids = self._by_product.get(product_id, [])
+        end = len(ids) if cursor is None else bisect_left(ids, cursor)
+        start = max(end - limit, 0)
+        page = [self._reviews[ids[i]] for i in range(end - 1, start - 1, -1)]
+        next_cursor = ids[start] if start > 0 else None
+        return page, next_cursor
+
+    def iter_reviews(self, product_id):
+        """All reviews of a product, oldest first."""
+        return (self._reviews[i] for i in self._by_product.get(product_id, []))
+
+    def get_summary(self, product_id):
+        """
+        Returns:
+            tuple: (review count, average rating or None if no review was rated)
+        """
+        count, rated, total = self._stats.get(product_id, (0, 0, 0))
+        return count, (total / rated if rated else None)
+
+    def search(self, query, product_id=None, limit=50):
+        """Reviews containing every word in the query, newest first."""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        postings = [self._tokens.get(t, []) for t in tokens]
+        if product_id is not None:
+            postings.append(self._by_product.get(product_id, []))
+        # Walk the shortest list and binary-search the others (all ascending by review ID)
+        postings.sort(key=len)
+        results = []
+        for review_id in reversed(postings[0]):
+            if all(_contains(other, review_id) for other in postings[1:]):
+                results.append(self._reviews[review_id])
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def _contains(ids, review_id):
+    i = bisect_left(ids, review_id)
+    return i < len(ids) and ids[i] == review_id
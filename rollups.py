@@ -0,0 +1,200 @@
+# rollups.py
+
+"""
+Sales Rollups
+-------------
+Time-bucketed sales totals for dashboards and trend charts, maintained as
+orders are placed so reports never scan raw orders.
+
+- Each placed order adds its revenue, units, order count and tax to one
+  bucket, overall and by product, category and shipping state. An order's
+  revenue and tax are split across its lines in proportion to line subtotal,
+  so per-product and per-category totals add up to the overall totals.
+- Buckets start at one minute wide. Minute buckets older than the minute
+  retention are compacted into hour buckets, and hour buckets older than the
+  hour retention into day buckets, so memory stays bounded by the retention
+  windows plus one bucket per day of history.
+- Every sale lives in exactly one bucket, so range queries sum the buckets
+  that start inside the range: O(number of buckets), independent of order
+  volume. Range edges are effectively rounded to the width of the buckets
+  that cover them.
+- Totals reflect orders as placed; later cancellations are not subtracted.
+"""
+
+import math
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from events import ORDER_PLACED
+from exceptions import InvalidInputError
+
+DIMENSIONS = ("product", "category", "state")
+
+# (name, bucket width in seconds, how long buckets stay at this width)
+LEVELS = (
+    ("minute", 60, 2 * 3600),
+    ("hour", 3600, 7 * 86400),
+    ("day", 86400, None),
+)
+
+
+class Totals:
+    """Revenue, units, order count and tax for one bucket and key."""
+    __slots__ = ("revenue", "units", "orders", "tax")
+
+    def __init__(self, revenue=0.0, units=0, orders=0, tax=0.0):
+        self.revenue = revenue
+        self.units = units
+        self.orders = orders
+        self.tax = tax
+
+    def add(self, other):
+        self.revenue += other.revenue
+        self.units += other.units
+        self.orders += other.orders
+        self.tax += other.tax
+
+    def to_dict(self):
+        return {"revenue": round(self.revenue, 2), "units": self.units, "orders": self.orders, "tax": round(self.tax, 2)}
+
+    def __repr__(self):
+        return f"Totals(revenue={self.revenue:.2f}, units={self.units}, orders={self.orders}, tax={self.tax:.2f})"
+
+
+class _Level:
+    def __init__(self, name, width, retention):
+        self.name = name
+        self.width = width
+        self.retention = retention
+        self.buckets = {}  # bucket start -> {None or (dimension, value): Totals}
+        self.starts = []   # Sorted bucket starts
+
+    def bucket(self, timestamp):
+        start = int(timestamp // self.width) * self.width
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            bucket = self.buckets[start] = defaultdict(Totals)
+            insort(self.starts, start)
+        return bucket
+
+    def in_range(self, start, end):
+        for i in range(bisect_left(self.starts, start), bisect_left(self.starts, end)):
+            yield self.starts[i], self.buckets[self.starts[i]]
+
+
+class SalesRollups:
+    """Per-minute, per-hour and per-day sales buckets, updated on each placed order."""
+    def __init__(self, levels=LEVELS, clock=time.time):
+        self.levels = [_Level(*level) for level in levels]
+        self.clock = clock
+        self._subscription = None
+
+    def attach(self, event_bus, batch_size=1):
+        """Consumes order events from an EventBus."""
+        self._subscription = event_bus.subscribe(self.handle_events, [ORDER_PLACED], batch_size=batch_size)
+        return self._subscription
+
+    def handle_events(self, events):
+        for event in events:
+            data = event.data
+            self.record(data["timestamp"], data["state_code"], data["total_price"], data["tax"], data["lines"])
+
+    def record(self, timestamp, state_code, total_price, tax, lines):
+        """
+        Adds one order.
+
+        Args:
+            timestamp (float): Epoch seconds the order was placed
+            state_code (str): Shipping state
+            total_price (float): Order total including tax
+            tax (float): Order tax
+            lines (list): (product_id, category, price, quantity) per line
+        """
+        cutoffs = self._compact()
+        level = next(level for level, cutoff in zip(self.levels, cutoffs) if timestamp >= cutoff)
+        bucket = level.bucket(timestamp)
+        units = sum(quantity for _, _, _, quantity in lines)
+        bucket[None].add(Totals(total_price, units, 1, tax))
+        bucket[("state", state_code)].add(Totals(total_price, units, 1, tax))
+
+        subtotal = sum(price * quantity for _, _, price, quantity in lines)
+        categories = set()
+        for product_id, category, price, quantity in lines:
+            share = price * quantity / subtotal if subtotal else 1.0 / len(lines)
+            line = Totals(total_price * share, quantity, 1, tax * share)
+            bucket[("product", product_id)].add(line)
+            # An order counts once per category even when several lines share it
+            line.orders = 0 if category in categories else 1
+            categories.add(category)
+            bucket[("category", category)].add(line)
+
+    def _compact(self):
+        """Moves buckets past their level's retention into the next level; returns each level's cutoff."""
+        now = self.clock()
+        cutoffs = []
+        for level, coarser in zip(self.levels, self.levels[1:]):
+            # Align to the coarser width so a coarse bucket is never split across levels
+            cutoff = int((now - level.retention) // coarser.width) * coarser.width
+            moved = bisect_left(level.starts, cutoff)
+            for start in level.starts[:moved]:
+                target = coarser.bucket(start)
+                for key, totals in level.buckets.pop(start).items():
+                    target[key].add(totals)
+            del level.starts[:moved]
+            cutoffs.append(cutoff)
+        cutoffs.append(float("-inf"))
+        return cutoffs
+
+    # --- Queries ---
+    def _key(self, dimension, value):
+        if dimension is None:
+            return None
+        if dimension not in DIMENSIONS:
+            raise InvalidInputError(f"Unknown dimension '{dimension}'. Use one of: {', '.join(DIMENSIONS)}")
+        return (dimension, value)
+
+    def totals(self, start, end, dimension=None, value=None):
+        """Totals for buckets starting in [start, end), overall or for one product/category/state."""
+        key = self._key(dimension, value)
+        result = Totals()
+        for level in self.levels:
+            for _, bucket in level.in_range(start, end):
+                if key in bucket:
+                    result.add(bucket[key])
+        return result
+
+    def series(self, start, end, width, dimension=None, value=None):
+        """
+        Totals per time slot of the given width, for trend charts.
+
+        Returns:
+            list: (slot start, Totals) for every slot in the range, including empty ones.
+                Data already compacted into buckets wider than `width` lands in the
+                slot where its bucket starts.
+        """
+        if width <= 0:
+            raise InvalidInputError("Slot width must be positive.")
+        key = self._key(dimension, value)
+        first = int(start // width) * width
+        slots = {slot: Totals() for slot in range(first, math.ceil(end), width)}
+        for level in self.levels:
+            for bucket_start, bucket in level.in_range(first, end):
+                if key in bucket:
+                    slots[int(bucket_start // width) * width].add(bucket[key])
+        return sorted(slots.items())
+
+    def top(self, dimension, start, end, limit=5, by="revenue"):
+        """The `limit` products, categories or states with the highest `by` total in the range."""
+        self._key(dimension, None)
+        ranked = defaultdict(Totals)
+        for level in self.levels:
+            for _, bucket in level.in_range(start, end):
+                for key, totals in bucket.items():
+                    if key is not None and key[0] == dimension:
+                        ranked[key[1]].add(totals)
+        return sorted(ranked.items(), key=lambda item: (-getattr(item[1], by), item[0]))[:limit]
+
+    def bucket_counts(self):
+        """Number of buckets held at each level, e.g. {"minute": 120, "hour": 166, "day": 30}."""
+        return {level.name: len(level.starts) for level in self.levels}
@@ -0,0 +1,348 @@
+# sketches.py
+
+"""
+Approximate Analytics
+---------------------
+Streaming sketches for questions over order histories too large to scan:
+
+- HyperLogLog: distinct customers (overall and per state). With 2**p
+  registers the standard error is about 1.04 / sqrt(2**p), e.g. 1.6% for the
+  default p=12 in 4 KB per counter.
+- Count-Min with a top-K list: units sold per product and the heavy hitters.
+  Estimates never undercount, and overcount by at most e / width * total
+  units with probability 1 - exp(-depth).
+- t-digest: order value percentiles, most accurate near the tails, using at
+  most about `compression` centroids.
+
+Every sketch takes O(1) memory in the number of orders, is updated in O(1)
+per order, can be merged with a sketch of the same shape built in another
+process, and round-trips through to_dict()/from_dict() (JSON-safe).
+OrderSketches bundles them and is fed from ORDER_PLACED events, like the
+forecaster.
+"""
+
+import math
+import json
+import base64
+import hashlib
+
+from events import ORDER_PLACED
+from exceptions import InvalidInputError
+
+_HASH_BITS = 64
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _check_shape(a, b, *fields):
+    if any(getattr(a, f) != getattr(b, f) for f in fields):
+        raise InvalidInputError(f"Cannot merge sketches with different {'/'.join(fields)}.")
+
+
+class HyperLogLog:
+    """Distinct-count sketch."""
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise InvalidInputError("HyperLogLog precision must be between 4 and 16.")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._estimate = 0.0  # Cached; None when registers changed since the last count
+
+    @property
+    def standard_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value):
+        h = _hash64(value)
+        index = h >> (_HASH_BITS - self.precision)
+        rest = h & ((1 << (_HASH_BITS - self.precision)) - 1)
+        rank = _HASH_BITS - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._estimate = None
+
+    def count(self):
+        if self._estimate is None:
+            m = len(self.registers)
+            alpha = 0.7213 / (1 + 1.079 / m)
+            estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+            zeros = self.registers.count(0)
+            if estimate <= 2.5 * m and zeros:
+                estimate = m * math.log(m / zeros)  # Linear counting for small sets
+            self._estimate = estimate
+        return int(round(self._estimate))
+
+    def merge(self, other):
+        _check_shape(self, other, "precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        self._estimate = None
+
+    def to_dict(self):
+        return {"precision": self.precision, "registers": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["precision"])
+        sketch.registers = bytearray(base64.b64decode(data["registers"]))
+        sketch._estimate = None
+        return sketch
+
+
+class CountMinTopK:
+    """Count-Min frequency sketch that also tracks the K most frequent items."""
+    def __init__(self, width=2048, depth=5, k=20):
+        if width <= 0 or depth <= 0 or k <= 0:
+            raise InvalidInputError("Count-Min width, depth and K must be positive.")
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.total = 0
+        self.rows = [[0] * width for _ in range(depth)]
+        self.top = {}  # item -> estimated count, at most k entries
+
+    @property
+    def error_bound(self):
+        """Maximum overcount (with probability 1 - exp(-depth))."""
+        return math.e / self.width * self.total
+
+    def _cells(self, item):
+        digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[4 * i:4 * i + 4], "big") % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        self.total += count
+        estimate = None
+        for row, cell in zip(self.rows, self._cells(item)):
+            row[cell] += count
+            estimate = row[cell] if estimate is None else min(estimate, row[cell])
+        self._offer(item, estimate)
+
+    def _offer(self, item, estimate):
+        if item in self.top or len(self.top) < self.k:
+            self.top[item] = estimate
+            return
+        smallest = min(self.top, key=self.top.get)
+        if estimate > self.top[smallest]:
+            del self.top[smallest]
+            self.top[item] = estimate
+
+    def estimate(self, item):
+        return min(row[cell] for row, cell in zip(self.rows, self._cells(item)))
+
+    def heavy_hitters(self, limit=None):
+        """[(item, estimated count)], most frequent first."""
+        ranked = sorted(self.top.items(), key=lambda entry: (-entry[1], entry[0]))
+        return ranked[:limit] if limit else ranked
+
+    def merge(self, other):
+        _check_shape(self, other, "width", "depth")
+        self.total += other.total
+        for row, other_row in zip(self.rows, other.rows):
+            for i, count in enumerate(other_row):
+                row[i] += count
+        candidates = set(self.top) | set(other.top)
+        self.top = {}
+        for item in candidates:
+            self._offer(item, self.estimate(item))
+
+    def to_dict(self):
+        return {"width": self.width, "depth": self.depth, "k": self.k, "total": self.total,
+                "rows": self.rows, "top": self.top}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["width"], data["depth"], data["k"])
+        sketch.total = data["total"]
+        sketch.rows = [list(row) for row in data["rows"]]
+        sketch.top = dict(data["top"])
+        return sketch
+
+
+class TDigest:
+    """Quantile sketch (merging t-digest)."""
+    def __init__(self, compression=100):
+        if compression < 10:
+            raise InvalidInputError("t-digest compression must be at least 10.")
+        self.compression = compression
+        self.centroids = []  # [mean, weight], sorted by mean
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+
+    def add(self, value, weight=1):
+        self._buffer.append([float(value), weight])
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k):
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def _compress(self):
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        if not points:
+            return
+        merged = []
+        mean, weight = points[0]
+        before = 0
+        limit = self._q(self._k(0) + 1) * self.count
+        for point_mean, point_weight in points[1:]:
+            if before + weight + point_weight <= limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                merged.append([mean, weight])
+                before += weight
+                limit = self._q(self._k(before / self.count) + 1) * self.count
+                mean, weight = point_mean, point_weight
+        merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q):
+        """Approximate value at quantile q (0..1), or None when empty."""
+        if not 0 <= q <= 1:
+            raise InvalidInputError("Quantile must be between 0 and 1.")
+        if self._buffer:
+            self._compress()
+        if not self.centroids:
+            return None
+        target = q * self.count
+        first_mean, first_weight = self.centroids[0]
+        if target < first_weight / 2:
+            return self.min + (first_mean - self.min) * target / (first_weight / 2)
+        before = 0
+        for (mean, weight), (next_mean, next_weight) in zip(self.centroids, self.centroids[1:]):
+            left, right = before + weight / 2, before + weight + next_weight / 2
+            if target <= right:
+                return mean + (next_mean - mean) * (target - left) / (right - left)
+            before += weight
+        last_mean, last_weight = self.centroids[-1]
+        return last_mean + (self.max - last_mean) * min((target - (self.count - last_weight / 2)) / (last_weight / 2), 1.0)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        self.centroids.extend(list(c) for c in other.centroids)
+        self._buffer.extend(list(c) for c in other._buffer)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def to_dict(self):
+        if self._buffer:
+            self._compress()
+        return {"compression": self.compression, "count": self.count, "centroids": self.centroids,
+                "min": self.min if self.count else None, "max": self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["compression"])
+        sketch.centroids = [list(c) for c in data["centroids"]]
+        sketch.count = data["count"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class OrderSketches:
+    """Distinct customers, product heavy hitters and order value percentiles for a stream of orders."""
+    def __init__(self, precision=12, width=2048, depth=5, k=20, compression=100):
+        self.precision = precision
+        self.orders = 0
+        self.customers = HyperLogLog(precision)
+        self.customers_by_state = {}  # state_code -> HyperLogLog
+        self.products = CountMinTopK(width, depth, k)  # Units sold
+        self.order_values = TDigest(compression)
+        self._subscription = None
+
+    def attach(self, event_bus, batch_size=1):
+        """Consumes order events from an EventBus."""
+        self._subscription = event_bus.subscribe(self.handle_events, [ORDER_PLACED], batch_size=batch_size)
+        return self._subscription
+
+    def handle_events(self, events):
+        for event in events:
+            data = event.data
+            self.record(data["customer_id"], data["state_code"], data["total_price"],
+                        [(product_id, quantity) for product_id, _, _, quantity in data["lines"]])
+
+    def record(self, customer_id, state_code, total_price, lines):
+        """Adds one order; lines are (product_id, quantity) pairs."""
+        self.orders += 1
+        self.customers.add(customer_id)
+        if state_code not in self.customers_by_state:
+            self.customers_by_state[state_code] = HyperLogLog(self.precision)
+        self.customers_by_state[state_code].add(customer_id)
+        for product_id, quantity in lines:
+            self.products.add(product_id, quantity)
+        self.order_values.add(total_price)
+
+    # --- Queries ---
+    def distinct_customers(self, state_code=None):
+        if state_code is None:
+            return self.customers.count()
+        sketch = self.customers_by_state.get(state_code)
+        return sketch.count() if sketch else 0
+
+    def units_sold(self, product_id):
+        return self.products.estimate(product_id)
+
+    def heavy_hitters(self, limit=10):
+        return self.products.heavy_hitters(limit)
+
+    def order_value_percentile(self, percent):
+        return self.order_values.quantile(percent / 100.0)
+
+    def error_bounds(self):
+        """Documented error of each estimate at the current size."""
+        return {"distinct_customers_relative": self.customers.standard_error,
+                "units_sold_absolute": self.products.error_bound}
+
+    # --- Merging and Persistence ---
+    def merge(self, other):
+        self.orders += other.orders
+        self.customers.merge(other.customers)
+        for state_code, sketch in other.customers_by_state.items():
+            if state_code in self.customers_by_state:
+                self.customers_by_state[state_code].merge(sketch)
+            else:
+                self.customers_by_state[state_code] = HyperLogLog.from_dict(sketch.to_dict())
+        self.products.merge(other.products)
+        self.order_values.merge(other.order_values)
+
+    def to_dict(self):
+        return {"orders": self.orders, "customers": self.customers.to_dict(),
+                "customers_by_state": {s: h.to_dict() for s, h in self.customers_by_state.items()},
+                "products": self.products.to_dict(), "order_values": self.order_values.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketches = cls(data["customers"]["precision"])
+        sketches.orders = data["orders"]
+        sketches.customers = HyperLogLog.from_dict(data["customers"])
+        sketches.customers_by_state = {s: HyperLogLog.from_dict(h) for s, h in data["customers_by_state"].items()}
+        sketches.products = CountMinTopK.from_dict(data["products"])
+        sketches.order_values = TDigest.from_dict(data["order_values"])
+        return sketches
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            try:
+                return cls.from_dict(json.load(f))
+            except (ValueError, KeyError, TypeError):
+                raise InvalidInputError(f"{path}: not a sketch file")
@@ -0,0 +1,48 @@
+# startup_timing.py
+
+"""
+Startup Timing
+--------------
+Records how long each startup phase takes (imports, backend setup, sample
+data, window creation, first tab) so regressions in time-to-interactive are
+easy to spot. Set ECOMMERCE_STARTUP_TIMING=1 to print the breakdown.
+"""
+
+import os
+import time
+
+TIMING_ENV_VAR = "ECOMMERCE_STARTUP_TIMING"
+
+
+class StartupTimer:
+    """Collects named phase durations measured from consecutive marks."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []  # [(name, seconds)]
+
+    def mark(self, name):
+        """Ends the current phase under the given name and starts the next one."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def restart(self):
+        """Starts timing a new phase without recording the idle time before it."""
+        self._last = time.perf_counter()
+
+    @property
+    def total(self):
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self):
+        width = max((len(name) for name, _ in self.phases), default=5)
+        lines = ["Startup timing:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<{width}}  {self.total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+def timing_enabled():
+    return os.environ.get(TIMING_ENV_VAR, "") not in ("", "0")
@@ -0,0 +1,612 @@
+# state_snapshot.py
+
+"""
+State Snapshots
+---------------
+Saves and restores everything held by ProductManager (products, price
+history and reviews), UserManager, OrderManager (orders still in memory) and
+the order manager's WarehouseNetwork (stock per warehouse) and a
+PriceScheduler (pending price changes) in a compact, versioned binary file, for backups, fast restarts and seeding test
+environments.
+
+File layout (all integers little-endian):
+
+    header  : magic "ECSS", format version, codec ID, creation time
+    chunk*  : section tag, record array count, string table and record
+              sizes, one count per record array, fixed-width records,
+              then the chunk's string table
+    end     : an "END." chunk, so a truncated file is detected
+
+- Records refer to strings by their index in the chunk's string table,
+  which holds every distinct string once, NUL-separated. Readers decode the
+  whole table with one decode/split and the records with
+  struct.iter_unpack, about ten times faster than parsing the same state
+  from JSON. Building the Python objects then dominates restore time, so
+  the cyclic garbage collector is paused while they are created.
+- Everything after the header passes through the file's codec ("none",
+  "zlib" or "lzma"; register_codec adds more). Chunks hold at most
+  chunk_records records and are written and read one at a time, so memory
+  stays bounded however large the state is.
+- Readers skip chunks with unknown tags, so sections can be added without
+  breaking older readers of the same format version.
+
+    python state_snapshot.py bench [--orders 200000] [--codec zlib]
+"""
+
+import gc
+import os
+import sys
+import json
+import lzma
+import time
+import zlib
+import struct
+import argparse
+import datetime
+import tempfile
+
+from models import Product, User, Order, LineItem
+from exceptions import InvalidInputError
+
+SNAPSHOT_ENV_VAR = "ECOMMERCE_SNAPSHOT"  # State file the application restores at startup and saves on exit, if set
+
+MAGIC = b"ECSS"
+FORMAT_VERSION = 2
+DEFAULT_CHUNK_RECORDS = 4096
+
+_HEADER = struct.Struct("<4sHBxd")        # magic, format version, codec ID, created at
+_CHUNK = struct.Struct("<4sHII")          # tag, record arrays, string table size, records size
+_COUNT = struct.Struct("<I")              # records in each array, after the chunk header
+_END = b"END."
+_READ_SIZE = 1 << 16
+
+# Record layouts; strings are string-table indexes, 0 meaning None
+_USER = struct.Struct("<IIII")            # user ID, username, password, role
+_PRODUCT = struct.Struct("<IIIdqII")      # ID, name, category, price, quantity, version, details version
+_PRICE = struct.Struct("<Idd")            # product ID, effective time, price
+_REVIEW = struct.Struct("<IIIBd")         # product ID, username, text, rating (0 = none), timestamp
+_ORDER = struct.Struct("<IIIIIdddIIII")   # ID, customer, address, status, state, timestamp, total, tax,
+                                          # version, then item/allocation/shipment record counts
+_ITEM = struct.Struct("<IdI")             # product snapshot (index into the chunk's snapshots), price, quantity
+_SNAPSHOT = struct.Struct("<III")         # product ID, name, category the product was ordered under
+_ALLOCATION = struct.Struct("<II")        # product ID, units taken from stock
+_SHIPMENT = struct.Struct("<III")         # warehouse ID, product ID, quantity
+_STOCK = struct.Struct("<III")            # warehouse ID, product ID, quantity held there
+_SCHEDULED = struct.Struct("<dIdId")      # effective time, product ID, price, category, percent
+                                          # (a product ID for a price change, a category for a repricing)
+
+
+# --- Codecs ---
+class Codec:
+    """A compression scheme for everything after the file header."""
+    def __init__(self, name, codec_id, compressor=None, decompressor=None):
+        self.name = name
+        self.codec_id = codec_id
+        self.compressor = compressor      # Factory for objects with compress(data) and flush()
+        self.decompressor = decompressor  # Factory for objects with decompress(data)
+
+
+CODECS = {}
+
+
+def register_codec(name, codec_id, compressor=None, decompressor=None):
+    """Makes a compression scheme available to save_snapshot and restore_snapshot."""
+    if not 0 <= codec_id <= 255 or any(c.codec_id == codec_id and c.name != name for c in CODECS.values()):
+        raise InvalidInputError(f"Codec ID {codec_id} is invalid or already taken.")
+    CODECS[name] = Codec(name, codec_id, compressor, decompressor)
+
+
+register_codec("none", 0)
+register_codec("zlib", 1, lambda: zlib.compressobj(1), zlib.decompressobj)
+register_codec("lzma", 2, lzma.LZMACompressor, lzma.LZMADecompressor)
+
+
+class _Sink:
+    def __init__(self, file, codec):
+        self.file = file
+        self.compressor = codec.compressor() if codec.compressor else None
+
+    def write(self, data):
+        self.file.write(self.compressor.compress(data) if self.compressor else data)
+
+    def close(self):
+        if self.compressor:
+            self.file.write(self.compressor.flush())
+
+
+class _Source:
+    def __init__(self, file, codec):
+        self.file = file
+        self.decompressor = codec.decompressor() if codec.decompressor else None
+        self.buffer = bytearray()
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            raw = self.file.read(_READ_SIZE)
+            if not raw:
+                raise InvalidInputError("Snapshot file is truncated.")
+            self.buffer += self.decompressor.decompress(raw) if self.decompressor else raw
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+# --- String Tables ---
+class _Strings:
+    def __init__(self):
+        self.refs = {None: 0}
+        self.parts = []
+
+    def put(self, text):
+        ref = self.refs.get(text)
+        if ref is None:
+            value = str(text)
+            if "\0" in value:
+                raise InvalidInputError("Snapshot strings cannot contain NUL characters.")
+            ref = self.refs[text] = len(self.parts) + 1
+            self.parts.append(value)
+        return ref
+
+    def encode(self):
+        return "\0".join(self.parts).encode("utf-8")
+
+
+def _decode_strings(data):
+    return [None] + data.decode("utf-8").split("\0")
+
+
+# --- Sections ---
+class _Managers:
+    def __init__(self, product_manager, user_manager, order_manager, price_scheduler=None):
+        self.product_manager = product_manager
+        self.user_manager = user_manager
+        self.order_manager = order_manager
+        self.warehouses = order_manager.warehouses if order_manager is not None else None
+        self.price_scheduler = price_scheduler
+
+
+def _users(m):
+    return list(m.user_manager.users.values()) if m.user_manager is not None else []
+
+
+def _encode_users(users, put):
+    rows = bytearray()
+    for u in users:
+        rows += _USER.pack(put(u.user_id), put(u.username), put(u.password), put(u.role))
+    return [rows]
+
+
+def _decode_users(arrays, s, m):
+    users = m.user_manager.users
+    for user_id, username, password, role in arrays[0]:
+        users[s[username]] = User(s[user_id], s[username], s[password], s[role])
+
+
+def _products(m):
+    return list(m.product_manager.products.values()) if m.product_manager is not None else []
+
+
+def _encode_products(products, put):
+    rows = bytearray()
+    for p in products:
+        rows += _PRODUCT.pack(put(p.product_id), put(p.name), put(p.category), p.price, p.quantity, p.version,
+                              p.details_version)
+    return [rows]
+
+
+def _decode_products(arrays, s, m):
+    pm = m.product_manager
+    products, index = pm.products, pm.facets.index
+    for product_id, name, category, price, quantity, version, details_version in arrays[0]:
+        product = products[s[product_id]] = Product.restore(s[product_id], s[name], s[category], price, quantity,
+                                                            version, details_version)
+        index(product)
+    pm.name_version += 1
+    pm.price_version += 1
+
+
+def _prices(m):
+    return list(m.product_manager.price_history.entries()) if m.product_manager is not None else []
+
+
+def _encode_prices(prices, put):
+    rows = bytearray()
+    for product_id, timestamp, price in prices:
+        rows += _PRICE.pack(put(product_id), timestamp, price)
+    return [rows]
+
+
+def _decode_prices(arrays, s, m):
+    record = m.product_manager.price_history.record
+    for product_id, timestamp, price in arrays[0]:
+        record(s[product_id], price, timestamp)
+
+
+def _reviews(m):
+    return list(m.product_manager.review_store) if m.product_manager is not None else []
+
+
+def _encode_reviews(reviews, put):
+    rows = bytearray()
+    for r in reviews:
+        rows += _REVIEW.pack(put(r.product_id), put(r.username), put(r.text), r.rating or 0, r.timestamp.timestamp())
+    return [rows]
+
+
+def _decode_reviews(arrays, s, m):
+    add = m.product_manager.review_store.add
+    from_ts = datetime.datetime.fromtimestamp
+    for product_id, username, text, rating, timestamp in arrays[0]:
+        add(s[product_id], s[username], s[text], rating or None, from_ts(timestamp))
+
+
+def _orders(m):
+    return list(m.order_manager.orders) if m.order_manager is not None else []
+
+
+def _encode_orders(orders, put):
+    rows, items, snapshots, allocations, shipments = bytearray(), bytearray(), bytearray(), bytearray(), bytearray()
+    snapshot_refs = {}
+    for o in orders:
+        for item in o.items:
+            key = (item.product_id, item.name, item.category)
+            ref = snapshot_refs.get(key)
+            if ref is None:
+                ref = snapshot_refs[key] = len(snapshot_refs)
+                snapshots += _SNAPSHOT.pack(put(item.product_id), put(item.name), put(item.category))
+            items += _ITEM.pack(ref, item.price, item.quantity)
+        for product_id, quantity in o.stock_allocations.items():
+            allocations += _ALLOCATION.pack(put(product_id), quantity)
+        shipment_count = 0
+        for warehouse_id, lines in o.fulfillment.items():
+            for product_id, quantity in lines.items():
+                shipments += _SHIPMENT.pack(put(warehouse_id), put(product_id), quantity)
+                shipment_count += 1
+        rows += _ORDER.pack(put(o.order_id), put(o.customer_id), put(o.address), put(o.status), put(o.state_code),
+                            o.timestamp.timestamp(), o.total_price, o.tax, o.version,
+                            len(o.items), len(o.stock_allocations), shipment_count)
+    return [rows, items, snapshots, allocations, shipments]
+
+
+def _decode_orders(arrays, s, m):
+    om = m.order_manager
+    intern = om.product_manager.snapshots.intern
+    snapshots = [intern(s[product_id], s[name], s[category]) for product_id, name, category in arrays[2]]
+    # Build every line and allocation of the chunk up front; orders then take consecutive slices
+    lines = [LineItem(snapshots[ref].product_id, price, quantity, snapshots[ref]) for ref, price, quantity in arrays[1]]
+    allocations = [(s[product_id], quantity) for product_id, quantity in arrays[3]]
+    shipments = arrays[4]
+    restore, from_ts = Order.restore, datetime.datetime.fromtimestamp
+    orders, by_id, keys, customer_keys = om.orders, om._orders_by_id, om._order_keys, om._customer_keys
+    line_at = allocation_at = shipment_at = 0
+    for (order_id, customer_id, address, status, state_code, timestamp, total, tax, version,
+         item_count, allocation_count, shipment_count) in arrays[0]:
+        fulfillment = {}
+        if shipment_count:
+            for warehouse_id, product_id, quantity in shipments[shipment_at:shipment_at + shipment_count]:
+                fulfillment.setdefault(s[warehouse_id], {})[s[product_id]] = quantity
+            shipment_at += shipment_count
+        order = restore(s[order_id], s[customer_id], lines[line_at:line_at + item_count], total, tax, s[address],
+                        s[state_code], from_ts(timestamp), s[status],
+                        dict(allocations[allocation_at:allocation_at + allocation_count]), fulfillment)
+        line_at += item_count
+        allocation_at += allocation_count
+        order.version = version
+        # Same indexes as OrderManager._record_order; keys are sorted once the restore finishes
+        orders.append(order)
+        by_id[order.order_id] = order
+        key = (timestamp, order.order_id)
+        keys.append(key)
+        customer_keys[order.customer_id].append(key)
+
+
+def _stock(m):
+    if m.warehouses is None:
+        return []
+    m.warehouses.reconcile()
+    return [(warehouse_id, product_id, quantity) for product_id, stock in m.warehouses._stock.items()
+            for warehouse_id, quantity in stock.items() if quantity]
+
+
+def _encode_stock(stock, put):
+    rows = bytearray()
+    for warehouse_id, product_id, quantity in stock:
+        rows += _STOCK.pack(put(warehouse_id), put(product_id), quantity)
+    return [rows]
+
+
+def _decode_stock(arrays, s, m):
+    network = m.warehouses
+    products = network.product_manager.products
+    for warehouse_id, product_id, quantity in arrays[0]:
+        # Stock of warehouses no longer in the network stays unassigned
+        if s[warehouse_id] in network.warehouses and s[product_id] in products:
+            network._add(s[product_id], s[warehouse_id], quantity)
+
+
+def _scheduled(m):
+    return m.price_scheduler.pending() if m.price_scheduler is not None else []
+
+
+def _encode_scheduled(changes, put):
+    rows = bytearray()
+    for c in changes:
+        rows += _SCHEDULED.pack(c.effective, put(c.product_id), c.price or 0.0, put(c.category), c.percent or 0.0)
+    return [rows]
+
+
+def _decode_scheduled(arrays, s, m):
+    add = m.price_scheduler._add
+    for effective, product_id, price, category, percent in arrays[0]:
+        if category:
+            add(effective, category=s[category], percent=percent)
+        else:
+            add(effective, product_id=s[product_id], price=price)
+
+
+class Section:
+    """How one kind of record is read from the managers, encoded and restored."""
+    def __init__(self, tag, name, structs, source, encode, decode, manager):
+        self.tag = tag
+        self.name = name
+        self.structs = structs  # One record layout per array in a chunk
+        self.source = source    # _Managers -> list of objects to save
+        self.encode = encode    # (objects, put) -> one bytearray per struct
+        self.decode = decode    # (unpacked arrays, strings, _Managers) -> None
+        self.manager = manager  # Attribute of _Managers the section needs when restoring
+
+
+# Written in this order; products come before reviews and orders that refer to them
+SECTIONS = (
+    Section(b"USER", "users", (_USER,), _users, _encode_users, _decode_users, "user_manager"),
+    Section(b"PROD", "products", (_PRODUCT,), _products, _encode_products, _decode_products, "product_manager"),
+    Section(b"PRIC", "prices", (_PRICE,), _prices, _encode_prices, _decode_prices, "product_manager"),
+    Section(b"REVW", "reviews", (_REVIEW,), _reviews, _encode_reviews, _decode_reviews, "product_manager"),
+    Section(b"ORDR", "orders", (_ORDER, _ITEM, _SNAPSHOT, _ALLOCATION, _SHIPMENT), _orders, _encode_orders, _decode_orders,
+            "order_manager"),
+    Section(b"STOK", "warehouse_stock", (_STOCK,), _stock, _encode_stock, _decode_stock, "warehouses"),
+    Section(b"SCHD", "scheduled_prices", (_SCHEDULED,), _scheduled, _encode_scheduled, _decode_scheduled,
+            "price_scheduler"),
+)
+_SECTIONS_BY_TAG = {section.tag: section for section in SECTIONS}
+
+
+# --- Saving ---
+def _write_chunk(sink, tag, arrays, strings):
+    table = strings.encode()
+    records = b"".join(arrays)
+    sink.write(_CHUNK.pack(tag, len(arrays), len(table), len(records)))
+    for array, record in zip(arrays, _SECTIONS_BY_TAG[tag].structs):
+        sink.write(_COUNT.pack(len(array) // record.size))
+    sink.write(records)
+    sink.write(table)
+
+
+def save_snapshot(path, product_manager=None, user_manager=None, order_manager=None,
+                  codec="zlib", chunk_records=DEFAULT_CHUNK_RECORDS, price_scheduler=None):
+    """
+    Writes the managers' state to a snapshot file (replacing it atomically).
+
+    Holds ProductManager's lock while the snapshot is taken, so stock levels
+    and orders are consistent with each other.
+
+    Args:
+        codec (str): "none", "zlib", "lzma" or a registered codec name
+        chunk_records (int): Records encoded and buffered at a time
+
+    Returns:
+        dict: Records written per section, e.g. {"users": 3, "products": 6, ...}
+    """
+    if codec not in CODECS:
+        raise InvalidInputError(f"Unknown codec '{codec}'. Use one of: {', '.join(CODECS)}")
+    if chunk_records <= 0:
+        raise InvalidInputError("Chunk size must be positive.")
+    managers = _Managers(product_manager, user_manager, order_manager, price_scheduler)
+    if product_manager is None and order_manager is not None:
+        product_manager = order_manager.product_manager
+    counts = {}
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, CODECS[codec].codec_id, time.time()))
+        sink = _Sink(f, CODECS[codec])
+        lock = product_manager._lock if product_manager is not None else None
+        if lock is not None:
+            lock.acquire()
+        try:
+            for section in SECTIONS:
+                objects = section.source(managers)
+                counts[section.name] = len(objects)
+                for start in range(0, len(objects), chunk_records):
+                    strings = _Strings()
+                    arrays = section.encode(objects[start:start + chunk_records], strings.put)
+                    _write_chunk(sink, section.tag, arrays, strings)
+        finally:
+            if lock is not None:
+                lock.release()
+        sink.write(_CHUNK.pack(_END, 0, 0, 0))
+        sink.close()
+    os.replace(temp_path, path)
+    return counts
+
+
+# --- Restoring ---
+def read_header(path):
+    """(format version, codec name, creation datetime) of a snapshot file."""
+    with open(path, "rb") as f:
+        return _read_header(f, path)
+
+
+def _read_header(f, path):
+    data = f.read(_HEADER.size)
+    if len(data) < _HEADER.size:
+        raise InvalidInputError(f"'{path}' is not a snapshot file.")
+    magic, version, codec_id, created = _HEADER.unpack(data)
+    if magic != MAGIC:
+        raise InvalidInputError(f"'{path}' is not a snapshot file.")
+    if version != FORMAT_VERSION:
+        raise InvalidInputError(f"'{path}' uses snapshot format {version}; this version reads format {FORMAT_VERSION}.")
+    codec = next((c for c in CODECS.values() if c.codec_id == codec_id), None)
+    if codec is None:
+        raise InvalidInputError(f"'{path}' uses unknown codec {codec_id}.")
+    return version, codec.name, datetime.datetime.fromtimestamp(created)
+
+
+def restore_snapshot(path, product_manager=None, user_manager=None, order_manager=None, price_scheduler=None):
+    """
+    Loads a snapshot into empty managers. Sections for managers that are not
+    given are skipped; warehouse stock is restored into order_manager's
+    WarehouseNetwork, if it has one, and pending price changes into
+    price_scheduler. No events are published.
+
+    Returns:
+        dict: Records restored per section
+
+    Raises:
+        InvalidInputError: If a manager already holds data or the file is damaged
+    """
+    if order_manager is not None and product_manager is None:
+        product_manager = order_manager.product_manager
+    managers = _Managers(product_manager, user_manager, order_manager, price_scheduler)
+    if (product_manager is not None and (product_manager.products or len(product_manager.review_store))
+            or user_manager is not None and user_manager.users
+            or order_manager is not None and order_manager.orders
+            or managers.warehouses is not None and any(managers.warehouses._stock.values())
+            or price_scheduler is not None and price_scheduler.pending()):
+        raise InvalidInputError("Snapshots can only be restored into empty managers.")
+    counts = {section.name: 0 for section in SECTIONS}
+    # Creating millions of objects would otherwise trigger repeated full collections
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        _restore(path, managers, counts)
+    finally:
+        if collecting:
+            gc.enable()
+    if order_manager is not None:
+        order_manager._order_keys.sort()
+        for keys in order_manager._customer_keys.values():
+            keys.sort()
+    return counts
+
+
+def _restore(path, managers, counts):
+    with open(path, "rb") as f:
+        _, codec, _ = _read_header(f, path)
+        source = _Source(f, CODECS[codec])
+        while True:
+            tag, array_count, table_size, records_size = _CHUNK.unpack(source.read(_CHUNK.size))
+            if tag == _END:
+                break
+            record_counts = struct.unpack(f"<{array_count}I", source.read(_COUNT.size * array_count))
+            records = source.read(records_size)
+            table = source.read(table_size)
+            section = _SECTIONS_BY_TAG.get(tag)
+            if section is None or getattr(managers, section.manager) is None:
+                continue  # Unknown section, or a manager the caller did not ask for
+            if len(record_counts) != len(section.structs):
+                raise InvalidInputError(f"Corrupt {section.name} chunk in '{path}'.")
+            arrays, offset = [], 0
+            for count, record in zip(record_counts, section.structs):
+                arrays.append(list(record.iter_unpack(records[offset:offset + count * record.size])))
+                offset += count * record.size
+            section.decode(arrays, _decode_strings(table), managers)
+            counts[section.name] += record_counts[0]
+
+
+# --- Benchmark ---
+def _bench_state(orders, products=5000, users=2000, seed=1):
+    import random
+    from managers import ProductManager, UserManager, OrderManager
+    rng = random.Random(seed)
+    pm, um = ProductManager(), UserManager()
+    om = OrderManager(pm)
+    for i in range(products):
+        pm.add_product(Product(f"P{i:05d}", f"Product {i:05d}", f"Category {i % 40}", 10.0 + i % 90, 100))
+    for i in range(users):
+        um.register(User(f"c{i}", f"user{i}", f"pw{i}", "customer"))
+    catalog = list(pm.products.values())
+    base = datetime.datetime(2024, 1, 1).timestamp()
+    for i in range(max(products // 5, 1)):
+        pm.review_store.add(catalog[i].product_id, f"user{i % users}", "Works as described, would buy again.", 1 + i % 5)
+    for i in range(orders):
+        lines = [LineItem.for_product(p, rng.randint(1, 3), pm.snapshots) for p in rng.sample(catalog, 3)]
+        subtotal = sum(line.total for line in lines)
+        order = Order.restore(f"O{i:08d}", f"c{rng.randrange(users)}", lines, round(subtotal * 1.06, 2),
+                              round(subtotal * 0.06, 2), f"{i} Main St", "PA", datetime.datetime.fromtimestamp(base + i * 30),
+                              "Delivered", {line.product_id: line.quantity for line in lines})
+        om._record_order(order)
+    return pm, um, om
+
+
+def _json_save(path, pm, um, om):
+    from order_archive import order_to_dict
+    state = {"users": [[u.user_id, u.username, u.password, u.role] for u in um.users.values()],
+             "products": [[p.product_id, p.name, p.category, p.price, p.quantity, p.version, p.details_version]
+                          for p in pm.products.values()],
+             "reviews": [[r.product_id, r.username, r.text, r.rating, r.timestamp.timestamp()] for r in pm.review_store],
+             "orders": [order_to_dict(o) for o in om.orders]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+
+
+def _json_restore(path):
+    from managers import ProductManager, UserManager, OrderManager
+    from order_archive import order_from_dict
+    pm, um = ProductManager(), UserManager()
+    om = OrderManager(pm)
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    for user in state["users"]:
+        um.users[user[1]] = User(*user)
+    for fields in state["products"]:
+        product = pm.products[fields[0]] = Product.restore(*fields)
+        pm.facets.index(product)
+    for product_id, username, text, rating, timestamp in state["reviews"]:
+        pm.review_store.add(product_id, username, text, rating, datetime.datetime.fromtimestamp(timestamp))
+    for data in state["orders"]:
+        om._record_order(order_from_dict(data, pm.snapshots))
+    return pm, um, om
+
+
+def run_benchmark(orders, codec="zlib", out=sys.stdout):
+    from managers import ProductManager, UserManager, OrderManager
+    pm, um, om = _bench_state(orders)
+    print(f"State: {len(pm.products):,} products, {len(um.users):,} users, {len(om.orders):,} orders", file=out)
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "state.json")
+        snap_path = os.path.join(directory, "state.snap")
+        started = time.perf_counter()
+        _json_save(json_path, pm, um, om)
+        json_save = time.perf_counter() - started
+        started = time.perf_counter()
+        _json_restore(json_path)
+        json_restore = time.perf_counter() - started
+
+        started = time.perf_counter()
+        save_snapshot(snap_path, pm, um, om, codec=codec)
+        snap_save = time.perf_counter() - started
+        restored_pm = ProductManager()
+        restored = (restored_pm, UserManager(), OrderManager(restored_pm))
+        started = time.perf_counter()
+        restore_snapshot(snap_path, *restored)
+        snap_restore = time.perf_counter() - started
+
+        print(f"JSON     : save {json_save:6.2f}s  restore {json_restore:6.2f}s  {os.path.getsize(json_path) / 1e6:8.1f} MB", file=out)
+        print(f"Snapshot : save {snap_save:6.2f}s  restore {snap_restore:6.2f}s  {os.path.getsize(snap_path) / 1e6:8.1f} MB ({codec})", file=out)
+        print(f"Restore speedup {json_restore / snap_restore:.1f}x, round trip {(json_save + json_restore) / (snap_save + snap_restore):.1f}x", file=out)
+    return json_restore / snap_restore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="state_snapshot.py", description="Manager state snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench", help="Compare snapshot and JSON save/restore times")
+    bench.add_argument("--orders", type=int, default=200_000)
+    bench.add_argument("--codec", default="zlib", choices=sorted(CODECS))
+    args = parser.parse_args(argv)
+    run_benchmark(args.orders, args.codec)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous audit log
+"""
+
+import os
+import time
+import tempfile
+import cli
+from models import User, Product, ShoppingCart, STATUS_SHIPPED
+from managers import UserManager, ProductManager, OrderManager
+from events import EventBus
+from exceptions import AuthenticationError
+from audit_log import AuditLog, query_audit_log, list_audit_files
+
+def test_audit_trail():
+    """Test that mutations and logins are recorded and can be queried"""
+    print("\n=== Testing Audit Trail ===")
+    directory = tempfile.mkdtemp()
+    event_bus = EventBus()
+    audit_log = AuditLog(directory, batch_size=10, flush_interval=0.05)
+    audit_log.attach(event_bus)
+    user_manager = UserManager(event_bus)
+    user_manager.register(User("admin01", "admin", "admin123", "admin"))
+    product_manager = ProductManager(event_bus)
+    order_manager = OrderManager(product_manager)
+
+    audit_log.actor = user_manager.login("admin", "admin123").user_id
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.0, 5))
+    product_manager.update_product("P001", "Laptop Pro", "Electronics", 1100.0)
+    audit_log.actor = None
+    try:
+        user_manager.login("admin", "wrong")
+    except AuthenticationError:
+        pass
+    cart = ShoppingCart("cust01")
+    cart.add_item(product_manager.products["P001"], 2)
+    order = order_manager.place_order(cart, 2200.0, 0.0, 2200.0, "1 Main St", "PA")
+    order_manager.update_order_status(order.order_id, STATUS_SHIPPED)
+    audit_log.close(event_bus)
+
+    records = list(query_audit_log(directory))
+    assert [r["type"] for r in records] == ["user.logged_in", "product.added", "product.updated", "user.login_failed",
+                                             "stock.changed", "order.placed", "order.status_changed"]
+    assert [r["type"] for r in query_audit_log(directory, actor="admin01")] == ["user.logged_in", "product.added", "product.updated"]
+    assert [r["type"] for r in query_audit_log(directory, entity=order.order_id)] == ["order.placed", "order.status_changed"]
+    assert [r["actor"] for r in query_audit_log(directory, event_type="order.placed")] == ["cust01"]
+    assert list(query_audit_log(directory, since=time.time() + 60)) == []
+    out = os.path.join(tempfile.mkdtemp(), "admin.jsonl")
+    assert cli.main(["audit", directory, "--user", "admin01", "-o", out]) == cli.EXIT_OK
+    with open(out, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+    assert cli.main(["audit", directory, "--since", "yesterday"]) == cli.EXIT_ERROR
+    print(f"✓ PASS: {len(records)} records written off the caller's thread and queried")
+
+def test_rotation():
+    """Test size-based rotation, retention and time-range file skipping"""
+    print("\n=== Testing Audit Rotation ===")
+    directory = tempfile.mkdtemp()
+    audit_log = AuditLog(directory, batch_size=50, max_file_bytes=1, max_files=3)
+    base = 1_700_000_000.0
+    for i in range(500):
+        audit_log.enqueue("stock.changed", base + i, {"product_id": f"P{i % 5}", "quantity": i})
+        if i % 50 == 49:
+            audit_log.flush()
+    audit_log.close()
+    assert len(list_audit_files(directory)) == 3 and audit_log.stats.files >= 10
+    records = list(query_audit_log(directory, since=base + 420, until=base + 440, entity="P0"))
+    assert [r["data"]["quantity"] for r in records] == [420, 425, 430, 435]
+    print("✓ PASS: Files rotated, oldest removed, and range queries filtered")
+
+def main():
+    test_audit_trail()
+    test_rotation()
+    print("\nAll audit log tests passed.")
+
+if __name__ == "__main__":
+    main()
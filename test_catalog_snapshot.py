@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for shared-memory catalog snapshots
+"""
+
+import uuid
+from multiprocessing import Process, Queue
+from models import Product
+from managers import ProductManager
+from catalog_snapshot import CatalogSnapshotPublisher, CatalogSnapshotReader
+
+def _make_catalog():
+    product_manager = ProductManager()
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.00, 10))
+    product_manager.add_product(Product("P002", "Wireless Mouse", "Electronics", 25.00, 100))
+    product_manager.add_product(Product("P003", "Coffee Maker", "Appliances", 75.50, 0))
+    return product_manager
+
+def _reader_process(name, queue):
+    reader = CatalogSnapshotReader(name)
+    queue.put((reader.version, [p.product_id for p in reader.get_products_sorted_by_price()]))
+    reader.close()
+
+def test_reader_sees_published_catalog():
+    """Test search and sort over a published snapshot"""
+    print("\n=== Testing Catalog Snapshot Reads ===")
+    name = f"cat_{uuid.uuid4().hex[:8]}"
+    publisher = CatalogSnapshotPublisher(name)
+    try:
+        product_manager = _make_catalog()
+        assert product_manager.publish_snapshot(publisher) == 1
+        reader = CatalogSnapshotReader(name)
+        assert len(reader) == 3
+        assert [p.product_id for p in reader.get_products_sorted_by_price()] == ["P002", "P003", "P001"]
+        assert [p.name for p in reader.search_product_by_name("MOUSE")] == ["Wireless Mouse"]
+        print("✓ PASS: Snapshot search and price sort match the catalog")
+        reader.close()
+    finally:
+        publisher.close()
+
+def test_new_version_is_picked_up():
+    """Test that readers switch versions only when they refresh"""
+    print("\n=== Testing Catalog Snapshot Versioning ===")
+    name = f"cat_{uuid.uuid4().hex[:8]}"
+    publisher = CatalogSnapshotPublisher(name)
+    try:
+        product_manager = _make_catalog()
+        product_manager.publish_snapshot(publisher)
+        reader = CatalogSnapshotReader(name)
+        product_manager.update_product("P001", "Laptop", "Electronics", 10.0, 10)
+        product_manager.publish_snapshot(publisher)
+        assert reader.get_products_sorted_by_price()[0].product_id == "P002"
+        assert reader.refresh() and reader.version == 2
+        assert reader.get_products_sorted_by_price()[0].product_id == "P001"
+        print("✓ PASS: Reader attached to the new version after refresh")
+        reader.close()
+    finally:
+        publisher.close()
+
+def test_unusual_names():
+    """Test that newlines and very long strings in names do not break search or publishing"""
+    print("\n=== Testing Catalog Snapshot Unusual Names ===")
+    name = f"cat_{uuid.uuid4().hex[:8]}"
+    publisher = CatalogSnapshotPublisher(name)
+    try:
+        product_manager = ProductManager()
+        product_manager.add_product(Product("P001", "Desk\nLamp", "Furniture", 40.00, 3))
+        product_manager.add_product(Product("P002", "Lamp Shade", "Furniture", 15.00, 8))
+        product_manager.add_product(Product("P003", "Rug " + "x" * 70000, "Furniture", 90.00, 1))
+        product_manager.publish_snapshot(publisher)
+        reader = CatalogSnapshotReader(name)
+        assert [p.product_id for p in reader.search_product_by_name("lamp")] == ["P001", "P002"]
+        assert [p.product_id for p in reader.search_product_by_name("shade")] == ["P002"]
+        assert [p.product_id for p in reader.search_product_by_name("k\nl")] == ["P001"]
+        assert reader.search_product_by_name("lamp\nlamp") == []  # Never matches across two names
+        assert [p.product_id for p in reader.search_product_by_name("rug")] == ["P003"]
+        assert len(reader.product(2).name) == 70004
+        print("✓ PASS: Hits map to the right product and long names publish")
+        reader.close()
+    finally:
+        publisher.close()
+
+def test_reader_in_other_process():
+    """Test that a separate process can read the snapshot"""
+    print("\n=== Testing Cross-Process Snapshot Reads ===")
+    name = f"cat_{uuid.uuid4().hex[:8]}"
+    publisher = CatalogSnapshotPublisher(name)
+    try:
+        _make_catalog().publish_snapshot(publisher)
+        queue = Queue()
+        worker = Process(target=_reader_process, args=(name, queue))
+        worker.start()
+        version, ids = queue.get(timeout=30)
+        worker.join()
+        assert version == 1 and ids == ["P002", "P003", "P001"]
+        print("✓ PASS: Worker process read the shared catalog")
+    finally:
+        publisher.close()
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("CATALOG SNAPSHOT TEST SUITE")
+    print("=" * 60)
+    test_reader_sees_published_catalog()
+    test_new_version_is_picked_up()
+    test_unusual_names()
+    test_reader_in_other_process()
+    print("\n" + "=" * 60)
+    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
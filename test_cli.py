@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless administration CLI
+"""
+
+import os
+import csv
+import json
+import tempfile
+from models import ShoppingCart
+from managers import OrderManager
+from order_archive import order_to_dict
+import cli
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def _setup(directory):
+    catalog = os.path.join(directory, "products.csv")
+    _write(catalog, "product_id,name,category,price,quantity\n"
+                    "P001,Laptop,Electronics,1000.00,5\n"
+                    "P002,Mouse,Electronics,20.00,0\n"
+                    "P003,Chair,Furniture,150.00,12\n")
+    product_manager = cli.load_catalog(catalog)
+    order_manager = OrderManager(product_manager)
+    for customer_id, state_code in (("c1", "PA"), ("c2", "CA"), ("c3", "PA")):
+        cart = ShoppingCart(customer_id)
+        cart.add_item(product_manager.products["P003"], 1)
+        order_manager.place_order(cart, 150.0, 10.0, 160.0, "1 Main St", state_code)
+    orders = os.path.join(directory, "orders.jsonl")
+    with open(orders, "w", encoding="utf-8") as out:
+        cli.write_order_records(map(order_to_dict, order_manager.get_all_orders()), out)
+    return catalog, orders, order_manager
+
+def test_catalog_commands():
+    """Test catalog export and bulk stock adjustments"""
+    print("\n=== Testing CLI Catalog Commands ===")
+    with tempfile.TemporaryDirectory() as directory:
+        catalog, _, _ = _setup(directory)
+        out = os.path.join(directory, "out.csv")
+        assert cli.main(["export-catalog", "--catalog", catalog, "--out-of-stock", "-o", out]) == cli.EXIT_OK
+        assert [row["product_id"] for row in _read_csv(out)] == ["P002"]
+
+        adjustments = os.path.join(directory, "adjust.csv")
+        _write(adjustments, "product_id,delta\nP001,-2\nP002,10\nP999,1\nP003,-100\nP003,abc\n")
+        assert cli.main(["adjust-stock", "--catalog", catalog, adjustments, "-o", out]) == cli.EXIT_PARTIAL
+        quantities = {row["product_id"]: int(row["quantity"]) for row in _read_csv(out)}
+        assert quantities == {"P001": 3, "P002": 10, "P003": 12}
+        # Blank and short rows are rejected, not tracebacks
+        _write(adjustments, "product_id,delta\nP001,\nP002,1\n")
+        assert cli.main(["adjust-stock", "--catalog", catalog, adjustments, "-o", out]) == cli.EXIT_PARTIAL
+        _write(adjustments, "product_id,delta,quantity\nP001\nP002,,4\n")
+        assert cli.main(["adjust-stock", "--catalog", catalog, adjustments, "-o", out]) == cli.EXIT_PARTIAL
+        assert {row["product_id"]: int(row["quantity"]) for row in _read_csv(out)}["P002"] == 4
+
+        _write(adjustments, "product_id,quantity\nP001,7\n")
+        assert cli.main(["adjust-stock", "--catalog", catalog, adjustments]) == cli.EXIT_OK
+        assert cli.load_catalog(catalog).products["P001"].quantity == 7
+        assert cli.main(["export-catalog", "--catalog", os.path.join(directory, "missing.csv")]) == cli.EXIT_ERROR
+    print("✓ PASS: Catalog exported and adjusted, with partial failures reported")
+
+def test_order_commands():
+    """Test bulk status transitions and revenue/tax reports"""
+    print("\n=== Testing CLI Order Commands ===")
+    with tempfile.TemporaryDirectory() as directory:
+        _, orders, order_manager = _setup(directory)
+        order_ids = [o.order_id for o in order_manager.get_all_orders()]
+        transitions = os.path.join(directory, "transitions.csv")
+        _write(transitions, f"order_id,status\n{order_ids[0]},shipped\n{order_ids[1]},Lost\nnope,Delivered\n")
+        updated = os.path.join(directory, "updated.jsonl")
+        assert cli.main(["set-status", "--orders", orders, transitions, "-o", updated]) == cli.EXIT_PARTIAL
+        statuses = {r["order_id"]: r["status"] for r in cli.iter_order_records(updated)}
+        assert statuses == {order_ids[0]: "Shipped", order_ids[1]: "Placed", order_ids[2]: "Placed"}
+        assert cli.main(["set-status", "--orders", orders, transitions, "-o", orders]) == cli.EXIT_ERROR
+
+        _write(transitions, f"order_id,status\n{order_ids[2]},Cancelled\n")
+        catalog = os.path.join(directory, "products.csv")
+        assert cli.main(["set-status", "--orders", updated, transitions, "-o", orders, "--catalog", catalog]) == cli.EXIT_OK
+        assert cli.load_catalog(catalog).products["P003"].quantity == 13
+        _write(transitions, f"order_id,status\n{order_ids[2]},Shipped\n")
+        assert cli.main(["set-status", "--orders", orders, transitions, "-o", updated]) == cli.EXIT_PARTIAL
+
+        report = os.path.join(directory, "tax.csv")
+        assert cli.main(["report", "tax", "--orders", orders, "-o", report]) == cli.EXIT_OK
+        rows = {row["state"]: row for row in _read_csv(report)}
+        assert rows["PA"]["orders"] == "2" and rows["PA"]["tax"] == "20.00"
+        assert rows["CA"]["taxable"] == "150.00"
+        assert cli.main(["report", "revenue", "--orders", orders, "--by", "month", "-o", report]) == cli.EXIT_OK
+        rows = _read_csv(report)
+        assert len(rows) == 1 and rows[0]["revenue"] == "480.00"
+
+        saved, summary = os.path.join(directory, "sketch.json"), os.path.join(directory, "summary.json")
+        assert cli.main(["sketch", "--orders", orders, "--save", saved, "-o", summary]) == cli.EXIT_OK
+        assert cli.main(["sketch", "--merge", saved, "--orders", orders, "-o", summary]) == cli.EXIT_OK
+        with open(summary, encoding="utf-8") as f:
+            result = json.load(f)
+        assert result["orders"] == 6 and result["distinct_customers"] == 3
+        assert result["heavy_hitters"] == [["P003", 6]]
+    print("✓ PASS: Status transitions validated, restocked and reports grouped correctly")
+
+def test_malformed_order_records():
+    """Test that order records with missing or mistyped fields are file errors, not crashes"""
+    print("\n=== Testing CLI Malformed Order Records ===")
+    with tempfile.TemporaryDirectory() as directory:
+        _, orders, order_manager = _setup(directory)
+        with open(orders, encoding="utf-8") as f:
+            good = f.readline()
+        transitions = os.path.join(directory, "transitions.csv")
+        _write(transitions, f"order_id,status\n{order_manager.get_all_orders()[0].order_id},Shipped\n")
+        bad = os.path.join(directory, "bad.jsonl")
+        out = os.path.join(directory, "out")
+        for line in ('{"foo":1}\n', '[1, 2]\n', good.replace('"tax":10.0', '"tax":"10"')):
+            _write(bad, good + line)
+            assert cli.main(["report", "revenue", "--orders", bad, "-o", out]) == cli.EXIT_ERROR
+            assert cli.main(["sketch", "--orders", bad, "-o", out]) == cli.EXIT_ERROR
+            assert cli.main(["set-status", "--orders", bad, transitions, "-o", out]) == cli.EXIT_ERROR
+    print("✓ PASS: Incomplete records exit with EXIT_ERROR instead of a traceback")
+
+def main():
+    test_catalog_commands()
+    test_order_commands()
+    test_malformed_order_records()
+    print("\nAll CLI tests passed.")
+
+if __name__ == "__main__":
+    main()
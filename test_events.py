@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the inventory/order event bus
+"""
+
+import os
+import time
+import tempfile
+from models import Product, ShoppingCart
+from managers import ProductManager, OrderManager
+from events import (
+    EventBus,
+    EventLog,
+    read_event_log,
+    PRODUCT_ADDED,
+    PRODUCT_DELETED,
+    STOCK_CHANGED,
+    ORDER_PLACED,
+    ORDER_STATUS_CHANGED
+)
+from forecasting import ReplenishmentForecaster
+
+def test_manager_events():
+    """Test that managers emit typed events for mutations"""
+    print("\n=== Testing Manager Events ===")
+    bus = EventBus()
+    received = []
+    bus.subscribe(received.extend, batch_size=1)
+    product_manager = ProductManager(bus)
+    order_manager = OrderManager(product_manager)
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.0, 2))
+    cart = ShoppingCart("c1")
+    cart.add_item(product_manager.products["P001"], 2)
+    order = order_manager.place_order(cart, 2000.0, 0.0, 2000.0, "1 Main St", "PA")
+    order_manager.update_order_status(order.order_id, "Shipped")
+    product_manager.delete_product("P001")
+    assert [e.type for e in received] == [PRODUCT_ADDED, STOCK_CHANGED, ORDER_PLACED, ORDER_STATUS_CHANGED, PRODUCT_DELETED]
+    assert received[1].data["new_quantity"] == 0
+    assert received[2].data["lines"] == [("P001", "Electronics", 1000.0, 2)]
+    assert [e.sequence for e in received] == [1, 2, 3, 4, 5]
+    print("✓ PASS: Managers emitted events in order")
+
+def test_batching_and_bounds():
+    """Test batched delivery, filtering and bounded queues"""
+    print("\n=== Testing Batching and Bounded Queues ===")
+    bus = EventBus()
+    batches, small = [], []
+    bus.subscribe(batches.append, [STOCK_CHANGED], batch_size=3)
+    bounded = bus.subscribe(small.extend, max_queue=2, batch_size=None)
+    for i in range(7):
+        bus.publish(STOCK_CHANGED, product_id="P001", new_quantity=i)
+    bus.publish(PRODUCT_DELETED, product_id="P001")
+    assert [len(b) for b in batches] == [3, 3]
+    bus.flush()
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert bounded.dropped == 6 and [e.sequence for e in small] == [7, 8]
+    print("✓ PASS: Batches delivered at size and oldest events dropped when full")
+
+def test_failing_subscriber_and_log():
+    """Test that subscriber errors are isolated and the log can be replayed"""
+    print("\n=== Testing Error Isolation and Durable Log ===")
+    path = os.path.join(tempfile.mkdtemp(), "events.log")
+    log = EventLog(path)
+    bus = EventBus(log)
+
+    def broken(events):
+        raise RuntimeError("subscriber bug")
+
+    failing = bus.subscribe(broken, batch_size=1)
+    product_manager = ProductManager(bus)
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.0, 2))
+    product_manager.update_product("P001", "Laptop", "Electronics", 900.0, 5)
+    log.close()
+    assert isinstance(failing.last_error, RuntimeError)
+    replayed = list(read_event_log(path, since_sequence=1))
+    assert [e.type for e in replayed] == ["product.updated", STOCK_CHANGED]
+    assert replayed[1].data["old_quantity"] == 2 and replayed[1].data["new_quantity"] == 5
+    print("✓ PASS: Publisher unaffected by subscriber error; log replayed")
+
+def test_replenishment_forecast():
+    """Test sales velocity and low-stock alert ordering from order events"""
+    print("\n=== Testing Replenishment Forecasting ===")
+    bus = EventBus()
+    product_manager = ProductManager(bus)
+    order_manager = OrderManager(product_manager)
+    forecaster = ReplenishmentForecaster(product_manager, half_life_days=7, alert_days=30)
+    forecaster.attach(bus)
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.0, 30))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 20.0, 500))
+    product_manager.add_product(Product("P003", "Chair", "Furniture", 150.0, 12))
+    for product_id, quantity in (("P001", 10), ("P002", 5), ("P003", 8)):
+        cart = ShoppingCart("c1")
+        cart.add_item(product_manager.products[product_id], quantity)
+        order_manager.place_order(cart, 0.0, 0.0, 0.0, "1 Main St", "PA")
+    alerts = forecaster.get_alerts()
+    assert [a.product_id for a in alerts] == ["P003", "P001"]
+    assert forecaster.days_to_stockout("P003") < forecaster.days_to_stockout("P001")
+    week_later = time.time() + 7 * 86400
+    assert abs(forecaster.velocity("P001", now=week_later) - alerts[1].velocity / 2) < 0.01
+    product_manager.update_product("P003", "Chair", "Furniture", 150.0, 400)
+    assert [a.product_id for a in forecaster.get_alerts()] == ["P001"]
+    print("✓ PASS: Alerts ordered by urgency and updated after restock")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("EVENT BUS TEST SUITE")
+    print("=" * 60)
+    test_manager_events()
+    test_batching_and_bounds()
+    test_failing_subscriber_and_log()
+    test_replenishment_forecast()
+    print("\n" + "=" * 60)
+    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
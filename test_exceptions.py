@@ -9,7 +9,8 @@ from exceptions import (
     AuthenticationError,
     OutOfStockError,
     ProductNotFoundError,
-    InvalidInputError
+    InvalidInputError,
+    ConcurrentModificationError
 )
 
 def test_authentication_errors():
@@ -115,11 +116,72 @@ def test_out_of_stock_errors():
     cart.add_item(product_manager.products["P001"], 5)  # Request 5, but only 3 available
     
     try:
-        order_manager.place_order(cart, 50.0, 0.0, 50.0, "123 Test St")
+        order_manager.place_order(cart, 50.0, 0.0, 50.0, "123 Test St", "PA")
         print("❌ FAIL: Should have raised OutOfStockError")
     except OutOfStockError as e:
         print(f"✓ PASS: OutOfStockError raised: {e}")
 
+def test_concurrent_modification_errors():
+    """Test conditional updates and delta stock adjustments"""
+    print("\n=== Testing ConcurrentModificationError ===")
+    import threading
+    from models import ShoppingCart
+    product_manager = ProductManager()
+    order_manager = OrderManager(product_manager)
+    product_manager.add_product(Product("P001", "Shared Product", "Cat", 10.0, 1000))
+    
+    # An admin opens the product, then a checkout changes it
+    seen_version = product_manager.get_product("P001").version
+    cart = ShoppingCart("customer1")
+    cart.add_item(product_manager.products["P001"], 5)
+    order = order_manager.place_order(cart, 50.0, 0.0, 50.0, "123 Test St", "PA")
+    try:
+        product_manager.update_product("P001", "Renamed", "Cat", 10.0, 1000, expected_version=seen_version)
+        print("❌ FAIL: Should have raised ConcurrentModificationError")
+    except ConcurrentModificationError as e:
+        print(f"✓ PASS: ConcurrentModificationError raised: {e}")
+    assert product_manager.get_product("P001").quantity == 995
+
+    # Checkouts do not count as edits to the details, so the admin's rename still saves
+    # and stock moves by the admin's own change
+    product = product_manager.get_product("P001")
+    seen_details, seen_quantity = product.details_version, product.quantity
+    cart = ShoppingCart("customer1")
+    cart.add_item(product, 5)
+    order_manager.place_order(cart, 50.0, 0.0, 50.0, "123 Test St", "PA")
+    product_manager.update_product("P001", "Renamed", "Cat", 10.0, expected_details_version=seen_details)
+    product_manager.adjust_stock("P001", (seen_quantity + 10) - seen_quantity, reason="update")
+    assert product.name == "Renamed" and product.quantity == 1000
+    try:
+        product_manager.update_product("P001", "Other Name", "Cat", 10.0, expected_details_version=seen_details)
+        print("❌ FAIL: Should have raised ConcurrentModificationError")
+    except ConcurrentModificationError as e:
+        print(f"✓ PASS: ConcurrentModificationError raised for a second details edit: {e}")
+    product_manager.adjust_stock("P001", -5)
+    
+    # Deltas from many threads are never lost, unlike read-modify-write overwrites
+    def restock():
+        for _ in range(200):
+            product_manager.adjust_stock("P001", 1)
+    threads = [threading.Thread(target=restock) for _ in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert product_manager.get_product("P001").quantity == 1795
+    print("✓ PASS: Concurrent stock adjustments all applied")
+    
+    try:
+        product_manager.adjust_stock("P001", -5000)
+        print("❌ FAIL: Should have raised InvalidInputError")
+    except InvalidInputError as e:
+        print(f"✓ PASS: InvalidInputError raised: {e}")
+    try:
+        order_manager.update_order_status(order.order_id, "Shipped", expected_version=order.version + 1)
+        print("❌ FAIL: Should have raised ConcurrentModificationError")
+    except ConcurrentModificationError as e:
+        print(f"✓ PASS: ConcurrentModificationError raised for order: {e}")
+    order_manager.update_order_status(order.order_id, "Shipped", expected_version=order.version)
+    assert order.status == "Shipped" and order.version == 1
+
 def test_successful_operations():
     """Test that valid operations work correctly"""
     print("\n=== Testing Successful Operations ===")
@@ -144,7 +206,7 @@ def test_successful_operations():
     cart = ShoppingCart("customer1")
     cart.add_item(product, 2)
     order_manager = OrderManager(product_manager)
-    order = order_manager.place_order(cart, 179.98, 0.0, 179.98, "456 Valid St, PA")
+    order = order_manager.place_order(cart, 179.98, 0.0, 179.98, "456 Valid St", "PA")
     print(f"✓ PASS: Order placed successfully: {order.order_id}")
 
 def main():
@@ -158,6 +220,7 @@ def main():
         test_product_not_found_errors()
         test_invalid_input_errors()
         test_out_of_stock_errors()
+        test_concurrent_modification_errors()
         test_successful_operations()
         
         print("\n" + "=" * 60)
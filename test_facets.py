@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for facet bitmap indexes
+"""
+
+import random
+
+from models import Product
+from managers import ProductManager
+from facets import Bitmap, FacetIndex, IN_STOCK, OUT_OF_STOCK
+
+def test_bitmap():
+    """Test bitmap set operations across chunk boundaries"""
+    print("\n=== Testing Bitmaps ===")
+    rng = random.Random(3)
+    a_members = set(rng.sample(range(300000), 5000))
+    b_members = set(rng.sample(range(300000), 5000))
+    a, b = Bitmap(), Bitmap()
+    for n in a_members: a.add(n)
+    for n in b_members: b.add(n)
+    assert list(a) == sorted(a_members) and len(a) == len(a_members)
+    assert list(a & b) == sorted(a_members & b_members)
+    assert a.intersection_count(b) == len(a_members & b_members)
+    assert list(a | b) == sorted(a_members | b_members)
+    for n in list(a_members)[:100]:
+        a.discard(n)
+        assert n not in a
+    assert len(a) == len(a_members) - 100
+    empty = Bitmap()
+    empty.add(70000)
+    empty.discard(70000)
+    assert not empty and empty.chunks == {}
+    print("✓ PASS: Intersections, unions, counts and removals match Python sets")
+
+def test_facets_follow_product_manager():
+    """Test that ProductManager keeps facet counts current"""
+    print("\n=== Testing Facet Index Maintenance ===")
+    product_manager = ProductManager()
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.00, 10))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 25.00, 0))
+    product_manager.add_product(Product("P003", "Chair", "Furniture", 150.75, 5))
+    product_manager.add_product(Product("P004", "Mug", "Kitchen", 9.50, 3))
+    facets = product_manager.facets
+
+    counts = facets.counts()
+    assert counts["category"] == {"Electronics": 2, "Furniture": 1, "Kitchen": 1}
+    assert counts["price"] == {"Under $25": 1, "$25 to $100": 1, "$100 to $500": 1, "$500 and up": 1}
+    assert counts["stock"] == {IN_STOCK: 3, OUT_OF_STOCK: 1}
+
+    # Counts for a facet ignore its own selection but apply the others
+    selected = {"category": {"Electronics"}, "stock": {IN_STOCK}}
+    counts = facets.counts(selected)
+    assert counts["category"] == {"Electronics": 1, "Furniture": 1, "Kitchen": 1}
+    assert counts["stock"] == {IN_STOCK: 1, OUT_OF_STOCK: 1}
+    assert facets.product_ids(selected) == ["P001"]
+    assert sorted(facets.product_ids({"category": {"Electronics", "Kitchen"}})) == ["P001", "P002", "P004"]
+
+    product_manager.adjust_stock("P001", -10, reason="sale")
+    product_manager.update_product("P002", "Mouse", "Accessories", 25.00, quantity=4)
+    product_manager.delete_product("P004")
+    counts = facets.counts()
+    assert counts["category"] == {"Accessories": 1, "Electronics": 1, "Furniture": 1}
+    assert counts["stock"] == {IN_STOCK: 2, OUT_OF_STOCK: 1}
+    assert "Under $25" not in counts["price"]
+
+    product_manager.add_product(Product("P005", "Lamp", "Furniture", 40.00, 2))
+    assert facets._slots["P005"] == 3  # The deleted product's slot is reused
+    assert facets.product_ids({"category": {"Furniture"}, "price": {"$25 to $100"}}) == ["P005"]
+    print("✓ PASS: Adds, edits, stock changes and deletions update the facet bitmaps")
+
+def test_large_catalog():
+    """Test facet counts over a large catalog against a direct scan"""
+    print("\n=== Testing Facets on a Large Catalog ===")
+    rng = random.Random(11)
+    facets = FacetIndex()
+    products = []
+    for i in range(100000):
+        product = Product(f"P{i:06d}", f"Item {i}", f"Cat{rng.randrange(20)}", round(rng.uniform(1, 900), 2), rng.choice((0, 5)))
+        facets.index(product)
+        products.append(product)
+    selected = {"category": {"Cat1", "Cat2"}, "stock": {IN_STOCK}}
+    expected = sum(1 for p in products if p.category in ("Cat1", "Cat2") and p.quantity > 0)
+    assert len(facets.matching(selected)) == expected
+    expected_bands = sum(1 for p in products if p.category in ("Cat1", "Cat2") and p.quantity > 0 and p.price >= 500)
+    assert facets.counts(selected)["price"]["$500 and up"] == expected_bands
+    print(f"✓ PASS: {expected} of {len(facets)} products match, same as a full scan")
+
+def main():
+    test_bitmap()
+    test_facets_follow_product_manager()
+    test_large_catalog()
+    print("\nAll facet tests passed.")
+
+if __name__ == "__main__":
+    main()
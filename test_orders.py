@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Test script for order processing features in OrderManager
+"""
+
+import os
+import math
+import datetime
+import tempfile
+from models import Product, ShoppingCart
+from managers import ProductManager, OrderManager, ALLOCATION_PRIORITY
+from order_archive import OrderArchive, order_to_dict, order_from_dict
+from order_file import OrderFileWriter, OrderFileReader
+from parallel_reports import order_file_report
+from models import Order, LineItem, ProductSnapshots
+from exceptions import OutOfStockError, ProductNotFoundError, InvalidInputError, InvalidStatusTransitionError
+
+def _setup():
+    product_manager = ProductManager()
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.0, 3))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 20.0, 50))
+    return product_manager, OrderManager(product_manager)
+
+def _request(product_manager, customer_id, lines, priority=0, state_code="PA", address="1 Main St"):
+    cart = ShoppingCart(customer_id)
+    for product_id, quantity in lines.items():
+        product = product_manager.products.get(product_id) or Product(product_id, "Ghost", "None", 1.0, 0)
+        cart.add_item(product, quantity)
+    return {"cart": cart, "subtotal": 0.0, "tax": 0.0, "final_total": 0.0,
+            "address": address, "state_code": state_code, "priority": priority}
+
+def test_batch_fifo_allocation():
+    """Test that scarce stock goes to earlier requests under FIFO"""
+    print("\n=== Testing Batch Orders (FIFO) ===")
+    product_manager, order_manager = _setup()
+    requests = [
+        _request(product_manager, "c1", {"P001": 2, "P002": 1}),
+        _request(product_manager, "c2", {"P001": 2}),
+        _request(product_manager, "c3", {"P002": 5}),
+        _request(product_manager, "c4", {"P999": 1}),
+        _request(product_manager, "c5", {"P002": 1}, address=""),
+    ]
+    results = order_manager.place_orders_batch(requests)
+    assert [r.success for r in results] == [True, False, True, False, False]
+    assert isinstance(results[1].error, OutOfStockError)
+    assert isinstance(results[3].error, ProductNotFoundError)
+    assert isinstance(results[4].error, InvalidInputError)
+    assert product_manager.products["P001"].quantity == 1
+    assert product_manager.products["P002"].quantity == 44
+    assert [o.customer_id for o in order_manager.get_all_orders()] == ["c1", "c3"]
+
+    # Imported lines with non-positive or fractional quantities never touch stock
+    bad = [_request(product_manager, "c6", {"P002": 1}) for _ in range(3)]
+    for request, quantity in zip(bad, (-3, 0, 1.5)):
+        request["cart"].items["P002"] = quantity
+    results = order_manager.place_orders_batch(bad)
+    assert not any(r.success for r in results) and all(isinstance(r.error, InvalidInputError) for r in results)
+    assert product_manager.products["P002"].quantity == 44
+    print("✓ PASS: FIFO batch allocated stock and reported per-order failures")
+
+def test_batch_priority_allocation():
+    """Test that higher-priority requests win scarce stock"""
+    print("\n=== Testing Batch Orders (Priority) ===")
+    product_manager, order_manager = _setup()
+    requests = [
+        _request(product_manager, "c1", {"P001": 2}, priority=1),
+        _request(product_manager, "c2", {"P001": 3}, priority=5),
+    ]
+    results = order_manager.place_orders_batch(requests, policy=ALLOCATION_PRIORITY)
+    assert [r.success for r in results] == [False, True]
+    assert product_manager.products["P001"].quantity == 0
+    print("✓ PASS: Priority policy allocated stock to the urgent order")
+
+def _place(order_manager, product_manager, customer_id, quantity=1):
+    request = _request(product_manager, customer_id, {"P002": quantity})
+    return order_manager.place_order(request["cart"], 20.0, 0.0, 20.0, "1 Main St", "PA")
+
+def test_bulk_status_transitions():
+    """Test lifecycle validation and aggregated restock on cancellation"""
+    print("\n=== Testing Bulk Status Transitions ===")
+    product_manager, order_manager = _setup()
+    first, second, third = [_place(order_manager, product_manager, f"c{i}") for i in range(3)]
+    assert product_manager.products["P002"].quantity == 47
+    results = order_manager.update_order_statuses([
+        (first.order_id, "Processing"),
+        (first.order_id, "shipped"),
+        (second.order_id, "Cancelled"),
+        (third.order_id, "Cancelled"),
+        (second.order_id, "Delivered"),
+        ("missing", "Shipped"),
+        (third.order_id, "Lost"),
+    ])
+    assert [r.success for r in results] == [True, True, True, True, False, False, False]
+    assert first.status == "Shipped" and second.status == "Cancelled"
+    assert isinstance(results[4].error, InvalidStatusTransitionError)
+    assert isinstance(results[5].error, ProductNotFoundError)
+    assert isinstance(results[6].error, InvalidInputError)
+    assert product_manager.products["P002"].quantity == 49
+    try:
+        order_manager.update_order_status(first.order_id, "Placed")
+        assert False, "Moving back to Placed should fail"
+    except InvalidStatusTransitionError:
+        pass
+    print("✓ PASS: Valid transitions applied, invalid ones rejected per item, stock returned")
+
+def test_order_pagination():
+    """Test cursor pagination over a customer's orders"""
+    print("\n=== Testing Order Pagination ===")
+    product_manager, order_manager = _setup()
+    placed = [_place(order_manager, product_manager, "c1") for _ in range(5)]
+    _place(order_manager, product_manager, "c2")
+    seen, cursor = [], None
+    while True:
+        page, cursor = order_manager.get_orders_page("c1", cursor, limit=2)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert sorted(o.order_id for o in seen) == sorted(o.order_id for o in placed)
+    assert all(a.timestamp >= b.timestamp for a, b in zip(seen, seen[1:]))
+    assert len(order_manager.get_orders_page(limit=10)[0]) == 6
+    print("✓ PASS: Pages returned every order newest first without repeats")
+
+def test_order_archival():
+    """Test moving finished orders to the archive and reading them back"""
+    print("\n=== Testing Order Archival ===")
+    path = os.path.join(tempfile.mkdtemp(), "orders.archive")
+    product_manager = _setup()[0]
+    order_manager = OrderManager(product_manager, archive=OrderArchive(path), archive_after_days=30)
+    placed = [_place(order_manager, product_manager, "c1", quantity=i + 1) for i in range(4)]
+    order_manager.update_order_status(placed[0].order_id, "Delivered")
+    order_manager.update_order_status(placed[1].order_id, "Cancelled")
+    later = datetime.datetime.now() + datetime.timedelta(days=31)
+    assert order_manager.archive_orders(now=later) == 2
+    assert len(order_manager.orders) == 2 and len(order_manager.archive) == 2
+    assert order_manager.get_total_orders_placed() == 4
+    assert abs(order_manager.get_total_revenue() - 80.0) < 1e-9
+    page, cursor = order_manager.get_orders_page("c1", limit=10)
+    assert sorted(o.order_id for o in page) == sorted(o.order_id for o in placed) and cursor is None
+    order_manager.archive.close()
+
+    reopened = OrderArchive(path)
+    assert reopened.get_order(placed[0].order_id).status == "Delivered"
+    assert reopened.item_quantities["P002"] == 3
+    assert reopened.get_order(placed[0].order_id).items[0].name == "Mouse"
+    totals = (len(reopened), reopened.total_revenue, dict(reopened.item_quantities))
+    reopened.close()
+
+    # Totals come from the sidecar; without it they are rebuilt from the orders
+    os.remove(path + ".totals")
+    rebuilt = OrderArchive(path)
+    assert (len(rebuilt), rebuilt.total_revenue, dict(rebuilt.item_quantities)) == totals
+    assert [o.order_id for _, o in rebuilt.iter_orders("c1")] == [placed[1].order_id, placed[0].order_id]
+    rebuilt.close()
+    assert os.path.exists(path + ".totals")
+    print("✓ PASS: Archived orders left memory but remain queryable")
+
+def test_order_file_range_scan():
+    """Test block skipping and range scans over an order file"""
+    print("\n=== Testing Order File Format ===")
+    path = os.path.join(tempfile.mkdtemp(), "orders.ordf")
+    base = datetime.datetime(2025, 1, 1)
+    mouse = ProductSnapshots().intern("P002", "Mouse", "Electronics")
+    orders = [Order.restore(f"O{i:04d}", f"c{i % 3}", [LineItem("P002", 20.0, 1 + i % 2, mouse)], 20.0 + i, 1.0,
+                            "1 Main St", "PA", base + datetime.timedelta(hours=i), "Delivered")
+              for i in range(300)]
+    with OrderFileWriter(path, block_rows=64) as writer:
+        writer.extend(orders[:200])
+    with OrderFileWriter(path) as writer:  # Reopen and append
+        writer.extend(orders[200:])
+
+    with OrderFileReader(path) as reader:
+        assert len(reader) == 300 and len(reader.blocks) == 6
+        start, end = base + datetime.timedelta(hours=50), base + datetime.timedelta(hours=250)
+        views = list(reader.scan(start, end))
+        assert [v.order_id for v in views] == [o.order_id for o in orders[50:250]]
+        assert views[0].items == [LineItem("P002", 20.0, 1, mouse)] and views[0].customer_id == "c2"
+        assert views[0].items[0].snapshot is views[1].items[0].snapshot
+        assert reader.total_revenue(start, end) == sum(o.total_price for o in orders[50:250])
+
+    # Strings longer than 64 KiB fit the 32-bit length fields
+    long_path = os.path.join(tempfile.mkdtemp(), "long.ordf")
+    address = "x" * 70000
+    with OrderFileWriter(long_path) as writer:
+        writer.append(Order.restore("O9999", "c1", [LineItem("P002", 20.0, 1, mouse)], 20.0, 1.0,
+                                    address, "PA", base, "Delivered"))
+    with OrderFileReader(long_path) as reader:
+        assert next(reader.scan()).address == address
+    print("✓ PASS: Range scan returned exactly the orders in the window")
+
+def test_line_items_survive_renames():
+    """Test that order lines keep their historical names and reports group by product ID"""
+    print("\n=== Testing Line Item Snapshots ===")
+    product_manager, order_manager = _setup()
+    first = _place(order_manager, product_manager, "c1", quantity=2)
+    product_manager.update_product("P002", "Wireless Mouse", "Electronics", 25.0)
+    second = _place(order_manager, product_manager, "c2", quantity=1)
+    assert first.items[0].name == "Mouse" and second.items[0].name == "Wireless Mouse"
+    assert first.items[0].product_id == second.items[0].product_id == "P002"
+    assert [s.name for s in product_manager.snapshots.history("P002")] == ["Mouse", "Wireless Mouse"]
+    assert order_manager.get_most_frequently_ordered_product() == "Wireless Mouse"
+
+    restored = order_from_dict(order_to_dict(first))
+    assert restored.items == first.items and restored.items[0].category == "Electronics"
+    legacy = order_from_dict(dict(order_to_dict(first), items=[["Mouse", 20.0, 2]]))
+    assert legacy.items[0].product_id is None and legacy.items[0].key == "Mouse"
+    print("✓ PASS: Renamed products keep historical names and aggregate under one ID")
+
+def test_parallel_order_file_report():
+    """Test that partitioned reports match a sequential scan"""
+    print("\n=== Testing Parallel Order File Reports ===")
+    path = os.path.join(tempfile.mkdtemp(), "orders.ordf")
+    base = datetime.datetime(2025, 1, 1)
+    snapshots = ProductSnapshots()
+    names = [snapshots.intern(f"P{i}", name) for i, name in enumerate(["Mouse", "Chair", "Lamp", "Desk"])]
+    orders = [Order.restore(f"O{i:04d}", "c1", [LineItem(names[i % 4].product_id, 9.99, 1 + i % 3, names[i % 4]),
+                                                LineItem(names[i % 3].product_id, 0.1, 1, names[i % 3])],
+                            0.1 * i + 19.99, 1.0, "1 Main St", "PA", base + datetime.timedelta(hours=i), "Delivered")
+              for i in range(1000)]
+    with OrderFileWriter(path, block_rows=50) as writer:
+        writer.extend(orders)
+
+    order_manager = OrderManager(ProductManager())
+    order_manager.orders = orders
+    order_manager.product_manager.snapshots = snapshots
+    for workers in (1, 3):
+        totals = order_file_report(path, workers=workers, partitions_per_worker=2)
+        assert totals.orders == 1000
+        assert totals.revenue == math.fsum(o.total_price for o in orders)
+        assert abs(totals.revenue - order_manager.get_total_revenue()) < 1e-6
+        assert totals.most_ordered_product() == order_manager.get_most_frequently_ordered_product()
+    window = order_file_report(path, base + datetime.timedelta(hours=125), base + datetime.timedelta(hours=610), workers=2)
+    assert window.orders == 485 and window.revenue == math.fsum(o.total_price for o in orders[125:610])
+    print("✓ PASS: Parallel totals equal the sequential scan for any worker count")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("ORDER PROCESSING TEST SUITE")
+    print("=" * 60)
+    test_batch_fifo_allocation()
+    test_batch_priority_allocation()
+    test_bulk_status_transitions()
+    test_order_pagination()
+    test_order_archival()
+    test_line_items_survive_renames()
+    test_order_file_range_scan()
+    test_parallel_order_file_report()
+    print("\n" + "=" * 60)
+    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for price history and scheduled price changes
+"""
+
+import os
+import datetime
+import tempfile
+
+from models import Product
+from managers import ProductManager
+from events import EventBus, PRODUCT_UPDATED
+from exceptions import ECommerceError, InvalidInputError
+from pricing import PriceHistory, PriceScheduler, APPLIED, CANCELLED, FAILED
+from state_snapshot import save_snapshot, restore_snapshot
+
+class FakeClock:
+    """Settable clock in epoch seconds."""
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def _catalog(clock):
+    product_manager = ProductManager()
+    product_manager.price_history = PriceHistory(clock)
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.00, 10))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 25.00, 100))
+    product_manager.add_product(Product("P003", "Chair", "Furniture", 150.75, 5))
+    return product_manager
+
+def test_price_history():
+    """Test as-of lookups over a product's recorded prices"""
+    print("\n=== Testing Price History ===")
+    clock = FakeClock()
+    product_manager = _catalog(clock)
+    history = product_manager.price_history
+    start = clock.now
+    for i in range(1, 1001):
+        clock.now = start + i * 60
+        product_manager.update_product("P002", "Mouse", "Electronics", 25.00 + i)
+    product_manager.update_product("P002", "Mouse", "Electronics", 1025.00)  # Same price, nothing recorded
+
+    assert history.price_at("P002", start - 1) is None  # Before the product existed
+    assert history.price_at("P002", start) == 25.00
+    assert history.price_at("P002", start + 59) == 25.00
+    assert history.price_at("P002", start + 500 * 60) == 525.00
+    assert history.price_at("P002", start + 500 * 60 + 30) == 525.00
+    assert history.price_at("P002", datetime.datetime.fromtimestamp(start + 10**6)) == 1025.00
+    assert history.price_at("P999", start) is None
+    assert len(history) == 3 + 1000
+
+    window = history.history("P002", start + 100 * 60 + 1, start + 103 * 60)
+    assert [price for _, price in window] == [125.00, 126.00, 127.00]  # Starts with the price in effect
+    assert isinstance(window[0][0], datetime.datetime)
+    print("✓ PASS: As-of lookups and ranges return the price in effect at each time")
+
+def test_scheduler():
+    """Test that scheduled changes apply when due, in order"""
+    print("\n=== Testing Price Scheduler ===")
+    clock = FakeClock()
+    product_manager = _catalog(clock)
+    scheduler = PriceScheduler(product_manager, clock)
+    start = clock.now
+    later = scheduler.schedule_price("P001", 999.99, start + 7200)
+    sale = scheduler.schedule_reprice("Electronics", -10, start + 3600)
+    dropped = scheduler.schedule_price("P003", 100.00, start + 3600)
+    doomed = scheduler.schedule_price("P003", 90.00, start + 5400)
+    assert [c.change_id for c in scheduler.pending("P001")] == [sale.change_id, later.change_id]
+    assert scheduler.next_due() == start + 3600
+
+    # Future prices account for pending changes, in order
+    assert scheduler.price_at("P001", start + 3600) == 1080.00
+    assert scheduler.price_at("P001", start + 9000) == 999.99
+    assert scheduler.price_at("P001", start) == 1200.00
+
+    scheduler.cancel(dropped.change_id)
+    assert dropped.status == CANCELLED
+    try:
+        scheduler.cancel(dropped.change_id)
+        assert False, "Cancelled a change twice"
+    except InvalidInputError:
+        pass
+
+    assert scheduler.run_due() == []
+    clock.now = start + 3600
+    assert scheduler.run_due() == [sale] and sale.status == APPLIED
+    assert product_manager.products["P001"].price == 1080.00
+    assert product_manager.products["P002"].price == 22.50
+    assert product_manager.products["P003"].price == 150.75
+
+    product_manager.delete_product("P003")
+    clock.now = start + 8000
+    assert scheduler.run_due() == [doomed, later]
+    assert doomed.status == FAILED and later.status == APPLIED
+    assert product_manager.products["P001"].price == 999.99
+    assert scheduler.pending() == [] and scheduler.next_due() is None
+
+    # The past is answered from history
+    assert scheduler.price_at("P001", start + 3599) == 1200.00
+    assert scheduler.price_at("P001", start + 3600) == 1080.00
+    assert scheduler.price_at("P001", start + 8000) == 999.99
+
+    for bad in (lambda: scheduler.schedule_price("P999", 5, start),
+                lambda: scheduler.schedule_price("P001", -5, start),
+                lambda: scheduler.schedule_reprice("Electronics", -100, start)):
+        try:
+            bad()
+            assert False, "Accepted an invalid price change"
+        except ECommerceError:
+            pass
+    print("✓ PASS: Due changes apply in order; cancelled ones are skipped and deleted products fail")
+
+def test_reprice_category():
+    """Test that bulk repricing updates prices, indexes and listeners in one pass"""
+    print("\n=== Testing Category Repricing ===")
+    clock = FakeClock()
+    event_bus = EventBus()
+    product_manager = ProductManager(event_bus)
+    product_manager.price_history = PriceHistory(clock)
+    for i in range(200):
+        category = "Electronics" if i % 2 else "Furniture"
+        product_manager.add_product(Product(f"P{i:03d}", f"Item {i}", category, 20.00 + i, 5))
+    updates = []
+    event_bus.subscribe(lambda events: updates.extend(e.data for e in events), [PRODUCT_UPDATED], batch_size=1)
+    price_version = product_manager.price_version
+    before = {p.product_id: p.price for p in product_manager.products.values()}
+    clock.now += 60
+
+    assert product_manager.reprice_category("Electronics", 25) == 100
+    assert product_manager.price_version == price_version + 1
+    for product in product_manager.products.values():
+        expected = round(before[product.product_id] * 1.25, 2) if product.category == "Electronics" else before[product.product_id]
+        assert product.price == expected
+    assert sorted(u["product_id"] for u in updates) == sorted(pid for pid, p in product_manager.products.items()
+                                                               if p.category == "Electronics")
+    assert product_manager.price_history.price_at("P001", clock.now - 1) == 21.00
+    assert product_manager.price_history.price_at("P001", clock.now) == 26.25
+    # P001 moved from the "Under $25" band to "$25 to $100"
+    assert "P001" in product_manager.facets.product_ids({"price": {"$25 to $100"}})
+
+    assert product_manager.reprice_category("Toys", 10) == 0
+    assert product_manager.price_version == price_version + 1
+    print("✓ PASS: One category repriced with a single price_version bump and an event per product")
+
+def test_scheduled_changes_survive_snapshot():
+    """Test that pending changes are saved and restored with the catalog"""
+    print("\n=== Testing Scheduled Changes in Snapshots ===")
+    clock = FakeClock()
+    product_manager = _catalog(clock)
+    scheduler = PriceScheduler(product_manager, clock)
+    start = clock.now
+    scheduler.schedule_price("P001", 999.99, start + 7200)
+    scheduler.schedule_reprice("Electronics", -10, start + 3600)
+    scheduler.cancel(scheduler.schedule_price("P003", 100.00, start + 60).change_id)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.snap")
+        assert save_snapshot(path, product_manager, price_scheduler=scheduler)["scheduled_prices"] == 2
+        restored_manager = ProductManager()
+        restored = PriceScheduler(restored_manager, clock)
+        assert restore_snapshot(path, restored_manager, price_scheduler=restored)["scheduled_prices"] == 2
+    assert [c.describe() for c in restored.pending()] == [c.describe() for c in scheduler.pending()]
+    clock.now = start + 7200
+    assert [c.status for c in restored.run_due()] == [APPLIED, APPLIED]
+    assert restored_manager.products["P001"].price == 999.99
+    assert restored_manager.products["P002"].price == 22.50
+    print("✓ PASS: Pending changes restored and applied when due; cancelled ones are not saved")
+
+def main():
+    test_price_history()
+    test_scheduler()
+    test_reprice_category()
+    test_scheduled_changes_survive_snapshot()
+    print("\nAll pricing tests passed.")
+
+if __name__ == "__main__":
+    main()
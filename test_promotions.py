@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for the promotions engine and cart pricing
+"""
+
+import datetime
+from models import Product, ShoppingCart
+from promotions import (
+    PromotionEngine,
+    PercentOffPromotion,
+    TieredPromotion,
+    BuyXGetYPromotion,
+    DEFAULT_PROMOTIONS
+)
+from managers import ProductManager, OrderManager
+from cart_pricing import CartPricing
+from exceptions import InvalidInputError
+
+def _catalog():
+    return {
+        "P001": Product("P001", "Laptop", "Electronics", 1000.0, 10),
+        "P002": Product("P002", "Mouse", "Electronics", 20.0, 100),
+        "P003": Product("P003", "Desk Chair", "Furniture", 150.0, 10),
+    }
+
+def _cart(products, lines):
+    cart = ShoppingCart("cust01")
+    for product_id, quantity in lines.items():
+        cart.add_item(products[product_id], quantity)
+    return cart
+
+def test_default_code():
+    """Test that DISCOUNT10 still gives 10% off the whole cart"""
+    print("\n=== Testing Default Discount Code ===")
+    products = _catalog()
+    engine = PromotionEngine(DEFAULT_PROMOTIONS)
+    cart = _cart(products, {"P001": 1, "P002": 5})
+    assert engine.evaluate(cart, products).discount == 0
+    result = engine.evaluate(cart, products, codes=["discount10"])
+    assert abs(result.discount - 110.0) < 1e-9
+    assert engine.get_code_promotion("BOGUS") is None
+    print("✓ PASS: DISCOUNT10 applied 10% and unknown codes were rejected")
+
+def test_rule_types_and_stacking():
+    """Test category, BOGO, tiered and state promotions together"""
+    print("\n=== Testing Promotion Rule Types ===")
+    products = _catalog()
+    engine = PromotionEngine([
+        PercentOffPromotion("FURN15", "15% Off Furniture", 15, categories=["Furniture"]),
+        BuyXGetYPromotion("MOUSEBOGO", "Buy 1 Get 1 Mouse", 1, 1, product_ids=["P002"]),
+        TieredPromotion("SPEND", "Spend More Save More", [(100, 5), (1000, 8)]),
+        PercentOffPromotion("PA20", "PA Special", 20, states=["PA"]),
+    ])
+    cart = _cart(products, {"P001": 1, "P002": 3, "P003": 2})
+    result = engine.evaluate(cart, products, state_code="CA")
+    # Lines: chair 300 * 15% = 45, mouse 1 free = 20; remaining 1295 -> 8% tier
+    assert abs(result.line_discounts["P003"] - 45.0) < 1e-9
+    assert abs(result.line_discounts["P002"] - 20.0) < 1e-9
+    assert result.cart_promotion.promo_id == "SPEND"
+    assert abs(result.cart_discount - 1295.0 * 0.08) < 1e-9
+    assert engine.evaluate(cart, products, state_code="PA").cart_promotion.promo_id == "PA20"
+    print("✓ PASS: Best line and cart discounts were selected")
+
+def test_time_window_and_memo():
+    """Test time-windowed rules and memoization per cart version"""
+    print("\n=== Testing Time Windows and Memoization ===")
+    products = _catalog()
+    start = datetime.datetime(2025, 11, 28)
+    engine = PromotionEngine([
+        PercentOffPromotion("BF", "Black Friday", 25, start=start, end=start + datetime.timedelta(days=1)),
+    ])
+    cart = _cart(products, {"P002": 1})
+    before = engine.evaluate(cart, products, now=start - datetime.timedelta(hours=1))
+    during = engine.evaluate(cart, products, now=start + datetime.timedelta(hours=1))
+    assert before.discount == 0 and abs(during.discount - 5.0) < 1e-9
+    assert engine.evaluate(cart, products, now=start + datetime.timedelta(hours=2)) is during
+    cart.add_item(products["P002"], 1)
+    assert abs(engine.evaluate(cart, products, now=start + datetime.timedelta(hours=2)).discount - 10.0) < 1e-9
+    print("✓ PASS: Windows respected and results cached until the cart changed")
+
+def test_hot_swap():
+    """Test swapping rule sets"""
+    print("\n=== Testing Rule Set Hot Swap ===")
+    products = _catalog()
+    engine = PromotionEngine(DEFAULT_PROMOTIONS)
+    cart = _cart(products, {"P002": 1})
+    assert engine.evaluate(cart, products, codes=["DISCOUNT10"]).discount > 0
+    engine.load_rules([])
+    assert engine.evaluate(cart, products, codes=["DISCOUNT10"]).discount == 0
+    try:
+        engine.load_rules([PercentOffPromotion("A", "A", 5), PercentOffPromotion("A", "B", 5)])
+        print("❌ FAIL: Should have raised InvalidInputError for duplicate IDs")
+        assert False
+    except InvalidInputError as e:
+        print(f"✓ PASS: InvalidInputError raised for duplicate promotion: {e}")
+    assert engine.evaluate(cart, products).discount == 0
+    print("✓ PASS: New rules took effect and a bad rule set was rejected")
+
+def test_cart_pricing_headless_checkout():
+    """Test incremental cart totals, change events and headless checkout"""
+    print("\n=== Testing Cart Pricing ===")
+    product_manager = ProductManager()
+    for product in _catalog().values():
+        product_manager.add_product(product)
+    order_manager = OrderManager(product_manager)
+    cart = ShoppingCart("cust01")
+    pricing = CartPricing(cart, order_manager)
+    events = []
+    pricing.subscribe(lambda event, payload: events.append((event, payload)))
+
+    cart.add_item(product_manager.products["P002"], 2)
+    cart.add_item(product_manager.products["P003"], 1)
+    cart.add_item(product_manager.products["P002"], 1)
+    cart.remove_item("P003")
+    assert [e for e in events if e[0] != "totals"] == [("row", "P002"), ("row", "P003"), ("row", "P002"), ("row_removed", "P003")]
+    assert abs(cart.subtotal - 60.0) < 1e-9
+
+    pricing.apply_code("DISCOUNT10")
+    pricing.set_state("CA")
+    totals = events[-1][1]
+    assert abs(totals.discounted_subtotal - 54.0) < 1e-9
+    assert abs(totals.tax - 54.0 * 0.0725) < 1e-9
+    try:
+        pricing.apply_code("DISCOUNT10")
+        print("❌ FAIL: Should have raised InvalidInputError for a repeated code")
+        assert False
+    except InvalidInputError as e:
+        print(f"✓ PASS: InvalidInputError raised for repeated code: {e}")
+
+    order = pricing.checkout("1 Main St")
+    assert abs(order.total_price - totals.total) < 1e-9
+    assert not cart.items and pricing.state_code is None and not pricing.codes
+    assert product_manager.products["P002"].quantity == 97
+    print("✓ PASS: Headless checkout used the incrementally priced totals")
+
+def test_price_change_before_checkout():
+    """Test that a price change while items sit in the cart reaches both the totals and the order lines"""
+    print("\n=== Testing Price Change Before Checkout ===")
+    product_manager = ProductManager()
+    for product in _catalog().values():
+        product_manager.add_product(product)
+    order_manager = OrderManager(product_manager)
+    cart = ShoppingCart("cust01")
+    pricing = CartPricing(cart, order_manager)
+    rows = []
+    pricing.subscribe(lambda event, payload: rows.append(payload) if event == "row" else None)
+    product = product_manager.products["P002"]
+    cart.add_item(product, 2)
+    old_price = product.price
+    product_manager.update_product(product.product_id, product.name, product.category, old_price / 2)
+
+    pricing.set_state("CA")
+    totals = pricing.totals()
+    assert abs(totals.subtotal - old_price) < 1e-9
+    assert cart.unit_prices["P002"] == old_price / 2 and rows[-1] == "P002"
+    order = pricing.checkout("1 Main St")
+    assert [(item.price, item.quantity) for item in order.items] == [(old_price / 2, 2)]
+    assert abs(order.total_price - totals.total) < 1e-9
+    assert abs(order.total_price - sum(item.price * item.quantity for item in order.items) * 1.0725) < 1e-9
+    print("✓ PASS: Cart totals and order lines both use the new price")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("PROMOTIONS ENGINE TEST SUITE")
+    print("=" * 60)
+    test_default_code()
+    test_rule_types_and_stacking()
+    test_time_window_and_memo()
+    test_hot_swap()
+    test_cart_pricing_headless_checkout()
+    test_price_change_before_checkout()
+    print("\n" + "=" * 60)
+    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
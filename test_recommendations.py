@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for co-purchase recommendations
+"""
+
+import random
+
+from models import Product, ShoppingCart
+from managers import ProductManager, OrderManager
+from events import EventBus
+from recommendations import CoPurchaseIndex
+
+def _place(order_manager, product_manager, product_ids):
+    cart = ShoppingCart("c1")
+    for product_id in product_ids:
+        cart.add_item(product_manager.products[product_id])
+    subtotal = sum(product_manager.products[pid].price for pid in product_ids)
+    return order_manager.place_order(cart, subtotal, 0.0, subtotal, "1 Main St", "PA")
+
+def test_recommendations_from_orders():
+    """Test that placed orders update the index and match an offline rebuild"""
+    print("\n=== Testing Co-Purchase Recommendations ===")
+    event_bus = EventBus()
+    product_manager = ProductManager(event_bus)
+    for i in range(1, 6):
+        product_manager.add_product(Product(f"P00{i}", f"Item {i}", "General", 10.0 * i, 100))
+    order_manager = OrderManager(product_manager)
+    index = CoPurchaseIndex(product_manager)
+    index.attach(event_bus)
+    for product_ids in (["P001", "P002"], ["P001", "P002", "P003"], ["P001", "P004"], ["P002", "P003"]):
+        _place(order_manager, product_manager, product_ids)
+
+    assert index.orders == 4 and index.co_count("P001", "P002") == 2
+    assert index.recommend("P001") == ["P002", "P003", "P004"]
+    assert index.recommend("P005") == []
+    # P002 then P003 are bought with the cart's items most often; cart items are never suggested
+    assert index.recommend_for_cart(["P001", "P004"]) == ["P002", "P003"]
+
+    rebuilt = CoPurchaseIndex(product_manager)
+    rebuilt.rebuild(order_manager.get_all_orders())
+    for product_id in product_manager.products:
+        assert rebuilt.neighbors(product_id) == index.neighbors(product_id)
+    print("✓ PASS: Incremental index matches a rebuild from order history")
+
+    product_manager.update_product("P002", "Item 2", "General", 20.0, quantity=0)
+    product_manager.delete_product("P003")
+    assert index.recommend("P001") == ["P004"]
+    assert index.recommend("P001", in_stock_only=False) == ["P002", "P004"]
+    print("✓ PASS: Deleted and out-of-stock products are not recommended")
+
+def test_top_k_bound():
+    """Test that neighbor lists stay bounded and hold the true top K"""
+    print("\n=== Testing Top-K Neighbor Lists ===")
+    rng = random.Random(7)
+    products = [f"P{i:03d}" for i in range(60)]
+    history = [rng.sample(products, rng.randint(2, 6)) for _ in range(2000)]
+    index = CoPurchaseIndex(k=5)
+    for product_ids in history:
+        index.record(product_ids)
+    for product_id in products:
+        neighbors = index._neighbors[product_id]
+        assert len(neighbors) == 5
+        best = sorted(index._counts[product_id].values(), reverse=True)[:5]
+        assert sorted(neighbors.values(), reverse=True) == best
+    print("✓ PASS: Every product keeps exactly its 5 most co-purchased neighbors")
+
+def main():
+    test_recommendations_from_orders()
+    test_top_k_bound()
+    print("\nAll recommendation tests passed.")
+
+if __name__ == "__main__":
+    main()
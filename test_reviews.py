@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the product review store
+"""
+
+from models import Product
+from managers import ProductManager
+from exceptions import ProductNotFoundError, InvalidInputError
+
+def _setup():
+    product_manager = ProductManager()
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.0, 10))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 25.0, 100))
+    return product_manager
+
+def test_pagination_and_summary():
+    """Test cursor pagination and running aggregates"""
+    print("\n=== Testing Review Pagination ===")
+    product_manager = _setup()
+    for i in range(7):
+        product_manager.add_review_to_product("P001", f"user{i}", f"Review number {i}", rating=(i % 5) + 1 if i % 2 == 0 else None)
+    product_manager.add_review_to_product("P002", "alice", "Great mouse")
+    seen, cursor = [], None
+    while True:
+        page, cursor = product_manager.get_review_page("P001", cursor, limit=3)
+        seen.extend(r.username for r in page)
+        if cursor is None:
+            break
+    assert seen == [f"user{i}" for i in reversed(range(7))]
+    count, average = product_manager.get_review_summary("P001")
+    assert count == 7 and abs(average - (1 + 3 + 5 + 2) / 4) < 1e-9
+    assert product_manager.get_review_summary("P002") == (1, None)
+    print("✓ PASS: Reviews paged newest first with correct aggregates")
+
+def test_search():
+    """Test token search over review text"""
+    print("\n=== Testing Review Search ===")
+    product_manager = _setup()
+    product_manager.add_review_to_product("P001", "alice", "Battery life is excellent")
+    product_manager.add_review_to_product("P001", "bob", "Screen is excellent, battery is weak")
+    product_manager.add_review_to_product("P002", "carol", "Excellent battery in this mouse")
+    assert [r.username for r in product_manager.search_reviews("excellent BATTERY")] == ["carol", "bob", "alice"]
+    assert [r.username for r in product_manager.search_reviews("battery weak", "P001")] == ["bob"]
+    assert product_manager.search_reviews("keyboard") == []
+    assert product_manager.search_reviews("battery", "P003") == []
+    print("✓ PASS: Search matched all query words")
+
+def test_review_errors():
+    """Test review validation errors"""
+    print("\n=== Testing Review Errors ===")
+    product_manager = _setup()
+    try:
+        product_manager.add_review_to_product("P999", "alice", "Nice")
+        print("❌ FAIL: Should have raised ProductNotFoundError")
+        assert False
+    except ProductNotFoundError as e:
+        print(f"✓ PASS: ProductNotFoundError raised for missing product: {e}")
+    try:
+        product_manager.add_review_to_product("P001", "alice", "Nice", rating=9)
+        print("❌ FAIL: Should have raised InvalidInputError for rating")
+        assert False
+    except InvalidInputError as e:
+        print(f"✓ PASS: InvalidInputError raised for bad rating: {e}")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("REVIEW STORE TEST SUITE")
+    print("=" * 60)
+    test_pagination_and_summary()
+    test_search()
+    test_review_errors()
+    print("\n" + "=" * 60)
+    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
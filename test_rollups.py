@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for time-bucketed sales rollups
+"""
+
+from models import Product, ShoppingCart
+from managers import ProductManager, OrderManager
+from events import EventBus
+from rollups import SalesRollups
+
+DAY = 86400
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_rollups_from_orders():
+    """Test that placed orders are rolled up by product, category and state"""
+    print("\n=== Testing Sales Rollups ===")
+    event_bus = EventBus()
+    product_manager = ProductManager(event_bus)
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 300.00, 10))
+    product_manager.add_product(Product("P002", "Chair", "Furniture", 100.00, 10))
+    order_manager = OrderManager(product_manager)
+    rollups = SalesRollups()
+    rollups.attach(event_bus)
+    for state_code, lines in (("PA", {"P001": 1, "P002": 1}), ("CA", {"P002": 2})):
+        cart = ShoppingCart("c1")
+        for product_id, quantity in lines.items():
+            cart.add_item(product_manager.products[product_id], quantity)
+        tax = 40.0 if state_code == "PA" else 0.0
+        order = order_manager.place_order(cart, 400.0 if state_code == "PA" else 200.0, tax,
+                                          440.0 if state_code == "PA" else 200.0, "1 Main St", state_code)
+    now = order.timestamp.timestamp()
+
+    overall = rollups.totals(now - 3600, now + 60)
+    assert overall.orders == 2 and overall.units == 4 and abs(overall.revenue - 640.0) < 1e-9
+    laptop = rollups.totals(now - 3600, now + 60, "product", "P001")
+    assert abs(laptop.revenue - 330.0) < 1e-9 and abs(laptop.tax - 30.0) < 1e-9 and laptop.units == 1
+    assert rollups.totals(now - 3600, now + 60, "state", "CA").orders == 1
+    assert [name for name, _ in rollups.top("category", now - 3600, now + 60)] == ["Electronics", "Furniture"]
+    assert rollups.totals(now + 60, now + 3600).orders == 0
+    print("✓ PASS: Orders rolled up overall and by product, category and state")
+
+def test_compaction():
+    """Test that old buckets are compacted while range totals stay exact"""
+    print("\n=== Testing Rollup Compaction ===")
+    start = 100 * DAY
+    clock = _Clock(start)
+    rollups = SalesRollups(clock=clock)
+    for minute in range(60 * 24 * 10):  # One order a minute for ten days
+        clock.now = start + minute * 60
+        rollups.record(clock.now, "PA", 10.0, 1.0, [("P001", "Electronics", 9.0, 1)])
+    counts = rollups.bucket_counts()
+    assert counts["minute"] <= 3 * 60 and counts["hour"] <= 8 * 24 and counts["day"] >= 2
+    assert rollups.totals(start, start + 10 * DAY).orders == 60 * 24 * 10
+    assert abs(rollups.totals(start + DAY, start + 2 * DAY, "state", "PA").revenue - 14400.0) < 1e-6
+    hourly = rollups.series(clock.now - 3 * 3600 + 60, clock.now + 60, 3600)
+    assert [totals.orders for _, totals in hourly] == [60, 60, 60]
+    print(f"✓ PASS: {counts} buckets hold ten days of per-minute orders")
+
+def main():
+    test_rollups_from_orders()
+    test_compaction()
+    print("\nAll rollup tests passed.")
+
+if __name__ == "__main__":
+    main()
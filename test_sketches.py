@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for approximate analytics sketches
+"""
+
+import random
+from sketches import HyperLogLog, CountMinTopK, TDigest, OrderSketches
+
+def test_sketch_accuracy():
+    """Test that each sketch stays within its documented error"""
+    print("\n=== Testing Sketch Accuracy ===")
+    hll = HyperLogLog()
+    for i in range(50000):
+        hll.add(f"cust{i % 20000}")
+    assert abs(hll.count() - 20000) <= 4 * hll.standard_error * 20000
+
+    rng = random.Random(7)
+    cms = CountMinTopK(width=512, depth=4, k=5)
+    exact = {}
+    for _ in range(20000):
+        item = f"P{min(int(rng.paretovariate(1.2)), 500):03d}"
+        cms.add(item)
+        exact[item] = exact.get(item, 0) + 1
+    for item, count in exact.items():
+        assert count <= cms.estimate(item) <= count + cms.error_bound
+    expected = sorted(exact, key=exact.get, reverse=True)[:3]
+    assert [item for item, _ in cms.heavy_hitters(3)] == expected
+
+    digest = TDigest()
+    values = [rng.lognormvariate(4, 1) for _ in range(20000)]
+    for value in values:
+        digest.add(value)
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        exact_rank = sum(1 for v in values if v <= digest.quantile(q)) / len(values)
+        assert abs(exact_rank - q) < 0.01, (q, exact_rank)
+    assert len(digest.centroids) <= digest.compression
+    print(f"✓ PASS: HLL {hll.count()} of 20000, heavy hitters {expected}, {len(digest.centroids)} centroids")
+
+def test_merge_and_round_trip():
+    """Test that sketches built separately merge to the same answers as one sketch"""
+    print("\n=== Testing Sketch Merging ===")
+    combined, left, right = OrderSketches(), OrderSketches(), OrderSketches()
+    for i in range(4000):
+        args = (f"cust{i % 1500}", "PA" if i % 3 else "CA", 10.0 + i % 100, [(f"P{i % 7}", 1 + i % 2)])
+        combined.record(*args)
+        (left if i % 2 else right).record(*args)
+    left.merge(OrderSketches.from_dict(right.to_dict()))
+    assert left.orders == combined.orders == 4000
+    assert left.distinct_customers() == combined.distinct_customers()
+    assert left.distinct_customers("CA") == combined.distinct_customers("CA")
+    assert left.heavy_hitters(3) == combined.heavy_hitters(3)
+    assert abs(left.order_value_percentile(50) - combined.order_value_percentile(50)) < 2.0
+    print("✓ PASS: Merged sketches match a single sketch over the same orders")
+
+def main():
+    test_sketch_accuracy()
+    test_merge_and_round_trip()
+    print("\nAll sketch tests passed.")
+
+if __name__ == "__main__":
+    main()
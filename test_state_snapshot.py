@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for binary state snapshots
+"""
+
+import os
+import tempfile
+
+from models import Product, User, ShoppingCart
+from managers import ProductManager, UserManager, OrderManager
+from exceptions import InvalidInputError
+from warehouses import Warehouse, WarehouseNetwork
+from state_snapshot import save_snapshot, restore_snapshot, read_header, CODECS
+
+def _build_state():
+    product_manager = ProductManager()
+    user_manager = UserManager()
+    order_manager = OrderManager(product_manager)
+    user_manager.register(User("admin01", "admin", "admin123", "admin"))
+    user_manager.register(User("cust01", "alice", "alice123", "customer"))
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1200.00, 10))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 25.00, 100))
+    product_manager.add_product(Product("P003", "Chair", "Furniture", 150.75, 0))
+    product_manager.add_review_to_product("P001", "alice", "Fast and light.", 5)
+    product_manager.add_review_to_product("P002", "alice", "No rating, just words.")
+    for i in range(30):
+        cart = ShoppingCart("cust01")
+        cart.add_item(product_manager.products["P002"], 1 + i % 2)
+        if i % 3 == 0:
+            cart.add_item(product_manager.products["P001"])
+        subtotal = sum(product_manager.products[pid].price * qty for pid, qty in cart.items.items())
+        order = order_manager.place_order(cart, subtotal, 0.0, subtotal, f"{i} Main St", "PA")
+        order.fulfillment = {"WH-EAST": dict(cart.items)}
+    order_manager.update_order_status(order.order_id, "Shipped")
+    product_manager.update_product("P002", "Wireless Mouse", "Electronics", 22.00)  # Orders keep the old name and price
+    return product_manager, user_manager, order_manager
+
+def _restored(path):
+    product_manager = ProductManager()
+    user_manager = UserManager()
+    order_manager = OrderManager(product_manager)
+    counts = restore_snapshot(path, product_manager, user_manager, order_manager)
+    return counts, product_manager, user_manager, order_manager
+
+def test_round_trip():
+    """Test that every codec restores identical manager state"""
+    print("\n=== Testing Snapshot Round Trip ===")
+    product_manager, user_manager, order_manager = _build_state()
+    with tempfile.TemporaryDirectory() as directory:
+        for codec in CODECS:
+            path = os.path.join(directory, f"state-{codec}.snap")
+            # Tiny chunks exercise records and string tables spread over many chunks
+            saved = save_snapshot(path, product_manager, user_manager, order_manager, codec=codec, chunk_records=7)
+            assert read_header(path)[1] == codec
+            counts, pm, um, om = _restored(path)
+            assert counts == saved == {"users": 2, "products": 3, "prices": 4, "reviews": 2, "orders": 30, "warehouse_stock": 0,
+                                        "scheduled_prices": 0}
+
+            assert {u: vars(user) for u, user in um.users.items()} == {u: vars(user) for u, user in user_manager.users.items()}
+            for pid, product in product_manager.products.items():
+                assert vars(pm.products[pid]) == vars(product)
+            assert pm.get_review_summary("P001") == (1, 5.0)
+            assert [r.text for r in pm.search_reviews("words")] == ["No rating, just words."]
+            assert pm.facets.counts() == product_manager.facets.counts()
+            assert list(pm.price_history.entries()) == list(product_manager.price_history.entries())
+
+            for original, copy in zip(order_manager.get_all_orders(), om.get_all_orders()):
+                assert (copy.order_id, copy.status, copy.version, copy.timestamp, copy.total_price) == \
+                       (original.order_id, original.status, original.version, original.timestamp, original.total_price)
+                assert copy.items == original.items
+                assert copy.stock_allocations == original.stock_allocations and copy.fulfillment == original.fulfillment
+            assert om.get_all_orders()[0].items[0].name == "Mouse"
+            page, _ = om.get_orders_page("cust01", limit=5)
+            assert [o.order_id for o in page] == [o.order_id for o in order_manager.get_orders_page("cust01", limit=5)[0]]
+    print(f"✓ PASS: State restored identically with codecs {', '.join(CODECS)}")
+
+def _network(product_manager):
+    return WarehouseNetwork(product_manager, [Warehouse("EAST", "East", "NJ"), Warehouse("WEST", "West", "CA")])
+
+def test_warehouse_stock():
+    """Test that stock per warehouse survives a restore, so nearest-first fulfillment keeps working"""
+    print("\n=== Testing Warehouse Stock Snapshot ===")
+    product_manager = ProductManager()
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.00, 6))
+    network = _network(product_manager)
+    network.assign("P001", "WEST", 4)
+    network.assign("P001", "EAST", 1)
+    order_manager = OrderManager(product_manager, warehouses=network)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.snap")
+        assert save_snapshot(path, product_manager, None, order_manager)["warehouse_stock"] == 2
+        pm = ProductManager()
+        restored = _network(pm)
+        om = OrderManager(pm, warehouses=restored)
+        assert restore_snapshot(path, pm, None, om)["warehouse_stock"] == 2
+    assert restored.locations("P001") == {"WEST": 4, "EAST": 1, "UNASSIGNED": 1}
+    cart = ShoppingCart("cust01")
+    cart.add_item(pm.products["P001"], 2)
+    order = om.place_order(cart, 2000.0, 0.0, 2000.0, "1 Main St", "CA")
+    assert order.fulfillment == {"WEST": {"P001": 2}}
+    print("✓ PASS: Warehouse stock restored and used by the next order")
+
+def test_rejects_bad_input():
+    """Test that damaged files and non-empty managers are rejected"""
+    print("\n=== Testing Snapshot Validation ===")
+    product_manager, user_manager, order_manager = _build_state()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.snap")
+        save_snapshot(path, product_manager, user_manager, order_manager, codec="none")
+        try:
+            restore_snapshot(path, product_manager)
+            assert False, "Restored into a non-empty manager"
+        except InvalidInputError:
+            pass
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:len(data) // 2])
+        try:
+            _restored(path)
+            assert False, "Restored a truncated file"
+        except InvalidInputError:
+            pass
+        with open(path, "wb") as f:
+            f.write(b"not a snapshot")
+        try:
+            read_header(path)
+            assert False, "Read a file that is not a snapshot"
+        except InvalidInputError:
+            pass
+    print("✓ PASS: Truncated files, foreign files and non-empty managers are rejected")
+
+def main():
+    test_round_trip()
+    test_warehouse_stock()
+    test_rejects_bad_input()
+    print("\nAll snapshot tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned product view cache
+"""
+
+from models import Product, ShoppingCart
+from managers import ProductManager, OrderManager
+from view_cache import ViewCache
+
+def _setup(**options):
+    product_manager = ProductManager()
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.0, 5))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 20.0, 50))
+    product_manager.add_product(Product("P003", "Gaming Mouse", "Electronics", 60.0, 8))
+    return product_manager, ViewCache(product_manager, **options)
+
+def test_rows_invalidated_by_version():
+    """Test that rows are re-rendered only for products that changed"""
+    print("\n=== Testing View Cache Rows ===")
+    product_manager, cache = _setup()
+    assert cache.all_rows()[0] == ("P001", "Laptop", "Electronics", "1000.00", 5)
+    cache.all_rows()
+    assert cache.row_stats.hits == 3 and cache.row_stats.misses == 3
+
+    cart = ShoppingCart("c1")
+    cart.add_item(product_manager.products["P002"], 2)
+    OrderManager(product_manager).place_order(cart, 40.0, 0.0, 40.0, "1 Main St", "PA")
+    product_manager.update_product("P001", "Laptop Pro", "Electronics", 1100.0, 5)
+    rows = {row[0]: row for row in cache.all_rows()}
+    assert rows["P002"][4] == 48 and rows["P001"][1:4] == ("Laptop Pro", "Electronics", "1100.00")
+    assert cache.row_stats.misses == 5
+
+    product_manager.delete_product("P003")
+    product_manager.add_product(Product("P003", "Trackball", "Electronics", 45.0, 3))
+    assert cache.row("P003")[1] == "Trackball"
+    print("✓ PASS: Only changed, deleted or re-added products were re-rendered")
+
+def test_results_and_eviction():
+    """Test search/sort result caching and LRU eviction"""
+    print("\n=== Testing View Cache Results ===")
+    product_manager, cache = _setup(max_rows=2)
+    assert cache.search_ids("mouse") == ["P002", "P003"]
+    assert cache.sorted_by_price_ids() == ["P002", "P003", "P001"]
+    product_manager.update_product("P002", "Mouse", "Electronics", 20.0, 0)  # Stock only
+    assert cache.search_ids("MOUSE") == ["P002", "P003"]
+    assert cache.sorted_by_price_ids() == ["P002", "P003", "P001"]
+    assert cache.result_stats.hits == 2
+    product_manager.update_product("P002", "Mouse", "Electronics", 90.0, 0)
+    assert cache.sorted_by_price_ids() == ["P003", "P002", "P001"]
+    assert cache.search_ids("mouse") == ["P002", "P003"]  # Names unchanged, still cached
+    assert cache.result_stats.hits == 3
+
+    cache.all_rows()
+    assert len(cache._rows.entries) == 2 and cache.row_stats.evictions == 1
+    assert 0.0 < cache.result_stats.hit_rate < 1.0
+    print("✓ PASS: Results invalidated only by relevant changes; rows evicted LRU")
+
+def main():
+    test_rows_invalidated_by_version()
+    test_results_and_eviction()
+    print("\nAll view cache tests passed.")
+
+if __name__ == "__main__":
+    main()
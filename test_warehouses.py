@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-warehouse stock and nearest-fulfillment allocation
+"""
+
+from models import Product, ShoppingCart, STATUS_CANCELLED
+from managers import ProductManager, OrderManager
+from events import EventBus
+from warehouses import Warehouse, WarehouseNetwork, UNASSIGNED, state_distance_km
+
+def _setup():
+    event_bus = EventBus()
+    product_manager = ProductManager(event_bus)
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.00, 0))
+    product_manager.add_product(Product("P002", "Mouse", "Electronics", 20.00, 4))
+    network = WarehouseNetwork(product_manager, [Warehouse("EAST", "East", "NJ"), Warehouse("WEST", "West", "CA")])
+    network.attach(event_bus)
+    network.receive("P001", "EAST", 3)
+    network.receive("P001", "WEST", 2)
+    return product_manager, network, OrderManager(product_manager, warehouses=network)
+
+def _order(order_manager, product_manager, state_code, **lines):
+    cart = ShoppingCart("c1")
+    for product_id, quantity in lines.items():
+        cart.add_item(product_manager.products[product_id], quantity)
+    return order_manager.place_order(cart, 0.0, 0.0, 0.0, "1 Main St", state_code)
+
+def test_nearest_allocation():
+    """Test nearest-first routing, split shipments and unassigned stock"""
+    print("\n=== Testing Nearest-Fulfillment Allocation ===")
+    product_manager, network, order_manager = _setup()
+    assert product_manager.products["P001"].quantity == 5
+    assert network.nearest["OR"] == ["WEST", "EAST"]
+    assert state_distance_km("NY", "NJ") < state_distance_km("NY", "CA")
+
+    order = _order(order_manager, product_manager, "OR", P001=1)
+    assert order.fulfillment == {"WEST": {"P001": 1}}
+    # West has 1 left, so a 2-unit order from Oregon ships whole from East
+    order = _order(order_manager, product_manager, "OR", P001=2)
+    assert order.fulfillment == {"EAST": {"P001": 2}}
+    order = _order(order_manager, product_manager, "NY", P001=2, P002=1)
+    assert order.fulfillment == {"EAST": {"P001": 1}, "WEST": {"P001": 1}, UNASSIGNED: {"P002": 1}}
+    assert network.locations("P001") == {} and network.locations("P002") == {UNASSIGNED: 3}
+    print("✓ PASS: Orders ship from the nearest warehouse that can fill them, then split")
+
+def test_cancel_and_delete():
+    """Test that cancellations return stock to its source and deletions clear it"""
+    print("\n=== Testing Warehouse Release ===")
+    product_manager, network, order_manager = _setup()
+    network.assign("P002", "WEST", 4)
+    order = _order(order_manager, product_manager, "FL", P001=4, P002=1)
+    assert order.fulfillment == {"EAST": {"P001": 3}, "WEST": {"P001": 1, "P002": 1}}
+    order_manager.update_order_status(order.order_id, STATUS_CANCELLED)
+    assert network.locations("P001") == {"EAST": 3, "WEST": 2}
+    assert product_manager.products["P001"].quantity == 5
+
+    product_manager.delete_product("P001")
+    product_manager.add_product(Product("P001", "Laptop", "Electronics", 1000.00, 2))
+    assert network.locations("P001") == {UNASSIGNED: 2}
+    print("✓ PASS: Cancelled stock returned to its warehouses; deleted products forgotten")
+
+def test_manual_decreases():
+    """Test that stock removed outside checkout leaves the warehouses too"""
+    print("\n=== Testing Manual Stock Decreases ===")
+    product_manager, network, order_manager = _setup()
+    network.assign("P002", "WEST", 2)
+    product_manager.adjust_stock("P002", -1)  # Unassigned stock goes first
+    assert network.locations("P002") == {"WEST": 2, UNASSIGNED: 1}
+    product_manager.adjust_stock("P002", -2)
+    assert network.locations("P002") == {"WEST": 1}
+    product_manager.update_product("P002", "Mouse", "Electronics", 20.00, quantity=0)
+    assert network.locations("P002") == {}
+
+    assert network.locations("P001") == {"EAST": 3, "WEST": 2}
+    product_manager.adjust_stock("P001", -2)  # Largest holding gives way first
+    assert network.locations("P001") == {"EAST": 1, "WEST": 2}
+    order = _order(order_manager, product_manager, "NY", P001=3)
+    assert network.locations("P001") == {} and product_manager.products["P001"].quantity == 0
+    assert order.fulfillment == {"EAST": {"P001": 1}, "WEST": {"P001": 2}}
+    print("✓ PASS: Located stock never exceeds the product's quantity")
+
+def main():
+    test_nearest_allocation()
+    test_cancel_and_delete()
+    test_manual_decreases()
+    print("\nAll warehouse tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# view_cache.py
+
+"""
+View Cache
+----------
+Read-through cache for what the GUI shows about products, so refreshing a
+list does not re-format every row or re-run every search.
+
+- Rendered rows are cached per product together with the product's version
+  (Product.version, bumped by ProductManager on update, stock change and
+  order placement). A row is re-rendered only when its product changed, and
+  dropped when the product is deleted.
+- Search and sort results are cached as lists of product IDs, tagged with
+  ProductManager.name_version / price_version, so stock changes never
+  invalidate them; only adding, deleting, renaming or re-pricing does.
+- Both caches are LRU-bounded and count hits, misses and evictions.
+"""
+
+from collections import OrderedDict
+
+from exceptions import InvalidInputError
+
+
+def render_product_row(product):
+    """The Treeview row for a product: (id, name, category, price, quantity)."""
+    return (product.product_id, product.name, product.category, f"{product.price:.2f}", product.quantity)
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for one cache."""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, hit_rate={self.hit_rate:.1%})"
+
+
+class _LRU:
+    def __init__(self, max_size):
+        if max_size <= 0:
+            raise InvalidInputError("Cache size must be positive.")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+        self.stats.misses += 1
+        return None
+
+    def put(self, key, version, value):
+        self.entries[key] = (version, value)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+
+class ViewCache:
+    """Versioned cache of rendered product rows and search/sort results."""
+    def __init__(self, product_manager, max_rows=10000, max_results=256, render=render_product_row):
+        self.product_manager = product_manager
+        self.render = render
+        self._rows = _LRU(max_rows)
+        self._results = _LRU(max_results)
+
+    @property
+    def row_stats(self):
+        return self._rows.stats
+
+    @property
+    def result_stats(self):
+        return self._results.stats
+
+    def row(self, product_id):
+        """Rendered row for a product, or None if it no longer exists."""
+        product = self.product_manager.products.get(product_id)
+        if product is None:
+            self._rows.discard(product_id)
+            return None
+        # The product object is part of the version so a deleted and re-added ID never matches
+        version = (product, product.version)
+        row = self._rows.get(product_id, version)
+        if row is None:
+            row = self.render(product)
+            self._rows.put(product_id, version, row)
+        return row
+
+    def iter_rows(self, product_ids):
+        """Rendered rows for existing products, in the given order, rendered as they are consumed."""
+        for product_id in product_ids:
+            row = self.row(product_id)
+            if row is not None:
+                yield row
+
+    def rows(self, product_ids):
+        return list(self.iter_rows(product_ids))
+
+    def _result(self, key, version, compute):
+        ids = self._results.get(key, version)
+        if ids is None:
+            ids = [p.product_id for p in compute()]
+            self._results.put(key, version, ids)
+        return ids
+
+    def all_product_ids(self):
+        pm = self.product_manager
+        return self._result(("all",), pm.name_version, pm.get_all_products)
+
+    def search_ids(self, query):
+        pm = self.product_manager
+        return self._result(("search", query.lower()), pm.name_version, lambda: pm.search_product_by_name(query))
+
+    def sorted_by_price_ids(self):
+        pm = self.product_manager
+        return self._result(("price",), pm.price_version, pm.get_products_sorted_by_price)
+
+    def all_rows(self):
+        return self.rows(self.all_product_ids())
+
+    def search_rows(self, query):
+        return self.rows(self.search_ids(query))
+
+    def sorted_by_price_rows(self):
+        return self.rows(self.sorted_by_price_ids())
+
+    def clear(self):
+        self._rows.entries.clear()
+        self._results.entries.clear()
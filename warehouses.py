@@ -0,0 +1,217 @@
+# warehouses.py
+
+"""
+Multi-Warehouse Inventory
+-------------------------
+Tracks stock per warehouse and decides where each order ships from.
+
+- Every state has a precomputed list of warehouses ordered by distance
+  (great-circle distance between state centroids), built once when the
+  network is created, so allocation never computes distances at checkout.
+- An order ships from the nearest warehouse that can fill it completely;
+  otherwise each line is split across warehouses nearest-first.
+- Product.quantity stays the aggregate available-to-sell count. Stock that
+  was never received into a specific warehouse (e.g. set directly with
+  ProductManager.update_product) is "unassigned" and is used last.
+- Manual decreases (adjust_stock, quantity edits) come out of unassigned
+  stock first; whatever is left over is taken from the warehouses holding
+  the most, so located stock never exceeds Product.quantity.
+- Per-product located totals are maintained incrementally, so availability
+  checks are O(1).
+"""
+
+import math
+from collections import defaultdict
+
+from events import PRODUCT_DELETED
+from exceptions import InvalidInputError, ProductNotFoundError
+from state_tax_rates import is_valid_state
+
+UNASSIGNED = "UNASSIGNED"  # Pseudo-warehouse for stock not received into a location
+
+# Approximate geographic centers (latitude, longitude)
+STATE_CENTROIDS = {
+    "AL": (32.8, -86.8), "AK": (61.4, -152.3), "AZ": (34.2, -111.7), "AR": (34.9, -92.4),
+    "CA": (36.8, -119.4), "CO": (39.0, -105.5), "CT": (41.6, -72.7), "DE": (39.0, -75.5),
+    "DC": (38.9, -77.0), "FL": (28.6, -82.4), "GA": (32.7, -83.4), "HI": (20.8, -156.3),
+    "ID": (44.4, -114.6), "IL": (40.0, -89.2), "IN": (39.9, -86.3), "IA": (42.1, -93.5),
+    "KS": (38.5, -98.4), "KY": (37.5, -85.3), "LA": (31.1, -92.0), "ME": (45.4, -69.2),
+    "MD": (39.0, -76.8), "MA": (42.3, -71.8), "MI": (44.3, -85.4), "MN": (46.3, -94.3),
+    "MS": (32.7, -89.7), "MO": (38.4, -92.5), "MT": (47.0, -109.6), "NE": (41.5, -99.8),
+    "NV": (39.3, -116.6), "NH": (43.7, -71.6), "NJ": (40.2, -74.7), "NM": (34.4, -106.1),
+    "NY": (42.9, -75.5), "NC": (35.6, -79.4), "ND": (47.5, -100.5), "OH": (40.3, -82.8),
+    "OK": (35.6, -97.5), "OR": (43.9, -120.6), "PA": (40.9, -77.8), "RI": (41.7, -71.5),
+    "SC": (33.9, -80.9), "SD": (44.4, -100.2), "TN": (35.9, -86.4), "TX": (31.5, -99.3),
+    "UT": (39.3, -111.7), "VT": (44.1, -72.7), "VA": (37.5, -78.9), "WA": (47.4, -120.5),
+    "WV": (38.6, -80.6), "WI": (44.6, -89.9), "WY": (43.0, -107.6),
+}
+
+
+def state_distance_km(state_a, state_b):
+    """Great-circle distance between two state centroids."""
+    lat1, lon1 = map(math.radians, STATE_CENTROIDS[state_a])
+    lat2, lon2 = map(math.radians, STATE_CENTROIDS[state_b])
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+class Warehouse:
+    """A fulfillment location."""
+    def __init__(self, warehouse_id, name, state_code):
+        if not warehouse_id or not isinstance(warehouse_id, str) or warehouse_id == UNASSIGNED:
+            raise InvalidInputError("Warehouse ID must be a non-empty string.")
+        if not is_valid_state(state_code):
+            raise InvalidInputError(f"Invalid state code: '{state_code}'")
+        self.warehouse_id = warehouse_id
+        self.name = name
+        self.state_code = state_code.upper()
+
+
+class WarehouseNetwork:
+    """Per-warehouse stock and nearest-first allocation for a ProductManager's catalog."""
+    def __init__(self, product_manager, warehouses):
+        self.product_manager = product_manager
+        self.warehouses = {}
+        for warehouse in warehouses:
+            if warehouse.warehouse_id in self.warehouses:
+                raise InvalidInputError(f"Duplicate warehouse ID '{warehouse.warehouse_id}'.")
+            self.warehouses[warehouse.warehouse_id] = warehouse
+        if not self.warehouses:
+            raise InvalidInputError("A warehouse network needs at least one warehouse.")
+        self._stock = defaultdict(dict)     # product_id -> {warehouse_id: quantity}
+        self._located = defaultdict(int)    # product_id -> total quantity held in warehouses
+        # state -> warehouse IDs, nearest first
+        self.nearest = {
+            state: sorted(self.warehouses, key=lambda wid: (state_distance_km(state, self.warehouses[wid].state_code), wid))
+            for state in STATE_CENTROIDS
+        }
+
+    # --- Stock Levels ---
+    def stock_at(self, product_id, warehouse_id):
+        if warehouse_id == UNASSIGNED:
+            return self.unassigned(product_id)
+        self.reconcile(product_id)
+        return self._stock.get(product_id, {}).get(warehouse_id, 0)
+
+    def unassigned(self, product_id):
+        product = self.product_manager.products.get(product_id)
+        self.reconcile(product_id)
+        return max(product.quantity - self._located.get(product_id, 0), 0) if product else 0
+
+    def locations(self, product_id):
+        """{warehouse_id: quantity} for a product, including unassigned stock."""
+        self.reconcile(product_id)
+        stock = {wid: qty for wid, qty in self._stock.get(product_id, {}).items() if qty}
+        if unassigned := self.unassigned(product_id):
+            stock[UNASSIGNED] = unassigned
+        return stock
+
+    def receive(self, product_id, warehouse_id, quantity):
+        """Adds received stock to a warehouse and to the product's available-to-sell count."""
+        if warehouse_id not in self.warehouses:
+            raise InvalidInputError(f"Unknown warehouse '{warehouse_id}'.")
+        if int(quantity) <= 0:
+            raise InvalidInputError("Received quantity must be positive.")
+        with self.product_manager._lock:
+            self.product_manager.adjust_stock(product_id, quantity, reason="receive")
+            self._add(product_id, warehouse_id, int(quantity))
+
+    def assign(self, product_id, warehouse_id, quantity):
+        """Moves unassigned stock (e.g. the opening balance) into a warehouse."""
+        if warehouse_id not in self.warehouses:
+            raise InvalidInputError(f"Unknown warehouse '{warehouse_id}'.")
+        with self.product_manager._lock:
+            if product_id not in self.product_manager.products:
+                raise ProductNotFoundError(f"Product with ID '{product_id}' not found.")
+            if not 0 < int(quantity) <= self.unassigned(product_id):
+                raise InvalidInputError(f"Only {self.unassigned(product_id)} unassigned units of '{product_id}'.")
+            self._add(product_id, warehouse_id, int(quantity))
+
+    def reconcile(self, product_id=None):
+        """
+        Takes stock removed outside checkout out of the warehouses.
+
+        Unassigned units absorb a decrease first; any excess of located stock
+        over Product.quantity is then taken from the largest holdings.
+
+        Args:
+            product_id (str): Product to check, or None for every located product
+        """
+        with self.product_manager._lock:
+            for pid in [product_id] if product_id is not None else list(self._located):
+                product = self.product_manager.products.get(pid)
+                excess = self._located.get(pid, 0) - (product.quantity if product else 0)
+                if excess <= 0:
+                    continue
+                stock = self._stock[pid]
+                for warehouse_id in sorted(stock, key=lambda wid: (-stock[wid], wid)):
+                    take = min(excess, stock[warehouse_id])
+                    stock[warehouse_id] -= take
+                    self._located[pid] -= take
+                    excess -= take
+                    if not excess:
+                        break
+
+    def _add(self, product_id, warehouse_id, quantity):
+        stock = self._stock[product_id]
+        stock[warehouse_id] = stock.get(warehouse_id, 0) + quantity
+        self._located[product_id] += quantity
+
+    # --- Allocation ---
+    def plan(self, lines, state_code):
+        """
+        Chooses where each line ships from, without changing stock.
+
+        Args:
+            lines (dict): product_id -> quantity (already checked against Product.quantity)
+            state_code (str): Shipping state
+
+        Returns:
+            dict: warehouse_id -> {product_id: quantity}; more than one key means a split shipment
+        """
+        order = self.nearest.get((state_code or "").upper()) or sorted(self.warehouses)
+        # Prefer a single warehouse that can ship the whole order
+        for warehouse_id in order:
+            if all(self.stock_at(pid, warehouse_id) >= qty for pid, qty in lines.items()):
+                return {warehouse_id: dict(lines)}
+        plan = defaultdict(dict)
+        for product_id, quantity in lines.items():
+            needed = quantity
+            for warehouse_id in order + [UNASSIGNED]:
+                take = min(needed, self.stock_at(product_id, warehouse_id))
+                if take > 0:
+                    plan[warehouse_id][product_id] = take
+                    needed -= take
+                    if not needed:
+                        break
+            if needed:
+                raise InvalidInputError(f"Warehouse stock for '{product_id}' is short by {needed}.")
+        return dict(plan)
+
+    def commit(self, plan):
+        """Takes planned stock out of the warehouses. Call before Product.quantity is reduced."""
+        for warehouse_id, lines in plan.items():
+            if warehouse_id == UNASSIGNED:
+                continue
+            for product_id, quantity in lines.items():
+                self._stock[product_id][warehouse_id] -= quantity
+                self._located[product_id] -= quantity
+
+    def release(self, plan):
+        """Returns stock from a cancelled shipment plan to the warehouses it came from."""
+        for warehouse_id, lines in plan.items():
+            if warehouse_id == UNASSIGNED or warehouse_id not in self.warehouses:
+                continue
+            for product_id, quantity in lines.items():
+                if product_id in self.product_manager.products:
+                    self._add(product_id, warehouse_id, quantity)
+
+    def forget(self, product_id):
+        """Drops warehouse stock for a deleted product."""
+        self._stock.pop(product_id, None)
+        self._located.pop(product_id, None)
+
+    def attach(self, event_bus):
+        """Forgets warehouse stock when products are deleted through the given EventBus."""
+        return event_bus.subscribe(lambda events: [self.forget(e.data["product_id"]) for e in events],
+                                   [PRODUCT_DELETED], batch_size=1)